@@ -0,0 +1 @@
+# Analysis package initialization
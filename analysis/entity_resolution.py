@@ -0,0 +1,246 @@
+from typing import List, Dict, Optional, Iterable, Tuple, Set, Any, Mapping, Union
+from collections import defaultdict, Counter
+from itertools import chain
+from pathlib import Path
+import argparse
+import hashlib
+import zlib
+import json
+import re
+
+import numpy as np
+
+from config.entities import ENTITY_MATCH_THRESHOLD, ENTITY_MAX_EDITS, ENTITY_REGISTRY
+from analysis.search_index import edit_distance
+from models.product import Product, parse_volume
+from utils.result_writer import results_path, safe_filename, write_results_json
+
+# Остатки объема в очищенном названии ("0 45л") не должны влиять на сходство
+_VOLUME_TOKEN_RE = re.compile(r'\b\d+(?:[\s.,]\d+)?\s*(?:мл|л|ml|l)\b')
+_NON_WORD_RE = re.compile(r'[^\w№]+')
+_NUMBER_RE = re.compile(r'\d+')
+
+ProductLike = Union[Product, Dict[str, Any]]
+
+BUCKET_REPRESENTATIVES = 16
+
+def normalize_name(name: str) -> str:
+    """Name for matching: lowercase, ё folded, volume and punctuation removed"""
+    name = _VOLUME_TOKEN_RE.sub(' ', name.lower().replace('ё', 'е'))
+    return " ".join(_NON_WORD_RE.sub(' ', name).split())
+
+def numbers(name: str) -> List[str]:
+    """Numeric tokens of the name ("№9", "Балтика 7"), order independent"""
+    return sorted(_NUMBER_RE.findall(name))
+
+def shingles(name: str) -> List[int]:
+    """Hashed character trigrams of the normalized name"""
+    padded = f" {name} "
+    return sorted({zlib.crc32(padded[i:i + 3].encode("utf-8")) for i in range(max(len(padded) - 2, 1))})
+
+def jaccard(a: List[int], b: List[int]) -> float:
+    sa, sb = set(a), set(b)
+    return len(sa & sb) / len(sa | sb) if sa or sb else 1.0
+
+def _field(product: ProductLike, name: str) -> Any:
+    return product.get(name) if isinstance(product, dict) else getattr(product, name)
+
+class _DisjointSet:
+    def __init__(self, size: int) -> None:
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+class MinHasher:
+    """MinHash signatures with fixed seeds, so signatures are the same in every run"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        # Хеширование умножением со сдвигом: (a * x + b) mod 2^64 >> 32, a нечетное
+        self.a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_hashes: List[int]) -> np.ndarray:
+        values = np.array(shingle_hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            hashed = (self.a[:, None] * values[None, :] + self.b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1)
+
+class EntityResolver:
+    """Cross-store product identity: blocking by volume and ABV, exact normalized names,
+    then MinHash/LSH over name shingles with Jaccard verification"""
+
+    def __init__(
+        self,
+        registry_path: Optional[Path] = None,
+        threshold: float = ENTITY_MATCH_THRESHOLD,
+        max_edits: int = ENTITY_MAX_EDITS,
+        num_perm: int = 64,
+        bands: int = 32
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.registry_path = registry_path
+        self.threshold = threshold
+        self.max_edits = max_edits
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        # Ключ варианта названия -> идентификатор товара; сохраняется между запусками
+        self.registry: Dict[str, str] = {}
+        if registry_path is not None and registry_path.exists():
+            with open(registry_path, encoding='utf-8') as f:
+                self.registry = json.load(f)
+
+    @staticmethod
+    def block_key(product: ProductLike) -> Tuple[Any, ...]:
+        """Candidates are compared only within the same type, volume and ABV"""
+        volume_ml = _field(product, "volume_ml")
+        if volume_ml is None:
+            volume_ml = parse_volume(_field(product, "volume"))
+        abv = _field(product, "alcohol_percentage")
+        return (_field(product, "type"), volume_ml, None if abv is None else round(abv, 1))
+
+    @staticmethod
+    def _variant_key(block: Tuple[Any, ...], name: str) -> str:
+        return "|".join(str(part) for part in (*block, name))
+
+    def _clusters(self, variants: List[Tuple[Tuple[Any, ...], str]]) -> List[int]:
+        """Cluster root of every (block, normalized name) variant"""
+        clusters = _DisjointSet(len(variants))
+        shingle_sets = [shingles(name) for _, name in variants]
+        buckets: Dict[Tuple[Any, ...], List[int]] = defaultdict(list)
+        for idx, (block, _) in enumerate(variants):
+            signature = self.hasher.signature(shingle_sets[idx])
+            for band in range(self.bands):
+                band_key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+                buckets[(block, band, band_key)].append(idx)
+
+        rejected: Set[Tuple[int, int]] = set()
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            # Каждый элемент корзины сравнивается с представителями уже найденных в ней кластеров,
+            # а не со всеми парами: проверок не больше BUCKET_REPRESENTATIVES на элемент
+            representatives = [members[0]]
+            for other in members[1:]:
+                for head in representatives:
+                    if clusters.find(head) == clusters.find(other):
+                        break
+                    # Одна и та же пара попадает в несколько полос, проверяется один раз
+                    if (head, other) in rejected:
+                        continue
+                    if self._same_product(variants[head][1], variants[other][1], shingle_sets[head], shingle_sets[other]):
+                        clusters.union(head, other)
+                        break
+                    rejected.add((head, other))
+                else:
+                    if len(representatives) < BUCKET_REPRESENTATIVES:
+                        representatives.append(other)
+        return [clusters.find(idx) for idx in range(len(variants))]
+
+    def _same_product(self, a: str, b: str, shingles_a: List[int], shingles_b: List[int]) -> bool:
+        """Verify LSH candidates: the same numbers, similar shingles and only a few character edits apart.
+        Volume and ABV need no check here: candidates share the block, so they are equal or absent in both"""
+        # "№9" и "№7" отличаются одной правкой, но это разные товары
+        if numbers(a) != numbers(b):
+            return False
+        if jaccard(shingles_a, shingles_b) < self.threshold:
+            return False
+        # Короткие названия допускают меньше правок
+        length = max(len(a), len(b))
+        limit = 0 if length < 5 else min(self.max_edits, 1 + length // 12)
+        return edit_distance(a, b, limit) <= limit
+
+    def _cluster_id(self, keys: List[str]) -> str:
+        """Reuse the id the registry already has for the cluster, otherwise derive it from the smallest key"""
+        known = Counter(self.registry[key] for key in keys if key in self.registry)
+        if known:
+            return min(known, key=lambda product_id: (-known[product_id], product_id))
+        return "p" + hashlib.sha1(min(keys).encode("utf-8")).hexdigest()[:12]
+
+    def resolve(self, products: Iterable[ProductLike]) -> Dict[str, int]:
+        """Assign product_id to every product; returns product counts per id"""
+        products = list(products)
+        variant_ids: Dict[Tuple[Tuple[Any, ...], str], int] = {}
+        product_variants = []
+        # Одинаковые названия в одном блоке сливаются сразу, MinHash считается по уникальным вариантам
+        for product in products:
+            variant = (self.block_key(product), normalize_name(_field(product, "name") or ""))
+            product_variants.append(variant_ids.setdefault(variant, len(variant_ids)))
+        variants = list(variant_ids)
+        roots = self._clusters(variants)
+
+        members: Dict[int, List[str]] = defaultdict(list)
+        for idx, (block, name) in enumerate(variants):
+            members[roots[idx]].append(self._variant_key(block, name))
+        cluster_ids = {root: self._cluster_id(keys) for root, keys in members.items()}
+        for root, keys in members.items():
+            for key in keys:
+                self.registry[key] = cluster_ids[root]
+
+        counts: Dict[str, int] = Counter()
+        for product, variant in zip(products, product_variants):
+            product_id = cluster_ids[roots[variant]]
+            if isinstance(product, dict):
+                product["product_id"] = product_id
+            else:
+                product.product_id = product_id
+            counts[product_id] += 1
+        return dict(counts)
+
+    def resolve_catalogs(self, catalogs: Mapping[str, Iterable[ProductLike]]) -> Dict[str, int]:
+        """Resolve products of many stores together"""
+        return self.resolve(chain.from_iterable(catalogs.values()))
+
+    def save(self) -> None:
+        if self.registry_path is None:
+            return
+        self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.registry_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.registry, f, ensure_ascii=False)
+        tmp_path.replace(self.registry_path)
+
+def save_product_ids(results: Mapping[str, Dict[str, Any]], results_dir: Optional[Path] = None) -> List[Path]:
+    """Rewrite the results files of the stores with the assigned product ids"""
+    directory = results_dir or results_path()
+    paths = []
+    for address, data in results.items():
+        path = directory / f"lenta_products_{safe_filename(address)}_{data['timestamp']}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            products = [Product.from_dict(record) for record in data["products"]]
+            write_results_json(f, address, data["timestamp"], products, data.get("failed_pages") or [])
+        tmp_path.replace(path)
+        paths.append(path)
+    return paths
+
+if __name__ == "__main__":
+    from analysis.ranking import latest_results
+
+    arg_parser = argparse.ArgumentParser(description="Assign cross-store product ids to the latest parser results")
+    arg_parser.add_argument("--dir", type=Path, help="results directory (default: results/)")
+    arg_parser.add_argument("--registry", type=Path, help=f"id registry (default: results/{ENTITY_REGISTRY})")
+    arg_parser.add_argument("--threshold", type=float, default=ENTITY_MATCH_THRESHOLD, help="name shingle Jaccard threshold")
+    args = arg_parser.parse_args()
+
+    results = latest_results(args.dir)
+    catalogs = {address: data["products"] for address, data in results.items()}
+    resolver = EntityResolver(args.registry or (args.dir or results_path()) / ENTITY_REGISTRY, threshold=args.threshold)
+    counts = resolver.resolve_catalogs(catalogs)
+    resolver.save()
+    save_product_ids(results, args.dir)
+    total = sum(counts.values())
+    shared = sum(1 for count in counts.values() if count > 1)
+    print(f"Stores: {len(catalogs)}, products: {total}, distinct products: {len(counts)}, seen in several offers: {shared}")
@@ -0,0 +1,286 @@
+from typing import List, Dict, Optional, Iterable, Union, Any, Mapping, Callable
+from itertools import chain
+from pathlib import Path
+import argparse
+import heapq
+import json
+
+import numpy as np
+
+from models.product import Product, parse_price, parse_volume
+from utils.result_writer import results_path
+from utils.delta import load_snapshot
+
+# Категориальные атрибуты кодируются целыми числами со словарем значений
+CATEGORICAL = ("type", "color", "filtering", "pasteurization", "sweetness", "packaging", "clarification", "category")
+METRICS = ("price", "price_per_litre", "price_per_alcohol", "alcohol_percentage")
+
+FilterValue = Union[str, Iterable[str], None]
+
+# Числовые столбцы, сохраняемые CatalogFrame.save
+_ARRAYS = (
+    "store", "price", "volume_ml", "alcohol_percentage", "is_alcoholic",
+    "product_key", "price_per_litre", "price_per_alcohol"
+)
+
+def _getter(product: Union[Product, Mapping[str, Any]]) -> Callable[..., Any]:
+    """Field reader of a product object or a serialized record"""
+    if isinstance(product, Product):
+        return lambda field, default=None: getattr(product, field, default)
+    return product.get
+
+class CatalogFrame:
+    """Columnar NumPy view of products of one or many stores for filtering and ranking"""
+
+    def __init__(self, catalogs: Mapping[str, Iterable[Union[Product, Mapping[str, Any]]]]) -> None:
+        self.stores: List[str] = []
+        self.names: List[str] = []
+        self.volumes: List[Optional[str]] = []
+        self.vocab: Dict[str, Dict[Optional[str], int]] = {column: {} for column in CATEGORICAL}
+        product_keys: Dict[tuple, int] = {}
+        store_codes, price, volume_ml, abv, alcoholic, keys = [], [], [], [], [], []
+        codes: Dict[str, List[int]] = {column: [] for column in CATEGORICAL}
+
+        for store_code, (store, products) in enumerate(catalogs.items()):
+            self.stores.append(store)
+            for product in products:
+                get = _getter(product)
+                kopecks = get("price_kopecks")
+                if kopecks is None:
+                    kopecks = parse_price(get("price"))
+                ml = get("volume_ml")
+                if ml is None:
+                    ml = parse_volume(get("volume"))
+                percentage = get("alcohol_percentage")
+
+                store_codes.append(store_code)
+                self.names.append(get("name", ""))
+                self.volumes.append(get("volume"))
+                price.append(np.nan if kopecks is None else kopecks / 100)
+                volume_ml.append(np.nan if not ml else ml)
+                abv.append(np.nan if percentage is None else percentage)
+                alcoholic.append(bool(get("is_alcoholic", True)))
+                for column in CATEGORICAL:
+                    vocab = self.vocab[column]
+                    value = get(column)
+                    codes[column].append(vocab.setdefault(value, len(vocab)))
+                # Идентификатор из analysis/entity_resolution.py точнее совпадения названий
+                key = get("product_id") or (get("type"), " ".join(str(get("name", "")).lower().split()), ml)
+                keys.append(product_keys.setdefault(key, len(product_keys)))
+
+        self.store = np.array(store_codes, dtype=np.int32)
+        self.price = np.array(price, dtype=np.float64)
+        self.volume_ml = np.array(volume_ml, dtype=np.float64)
+        self.alcohol_percentage = np.array(abv, dtype=np.float64)
+        self.is_alcoholic = np.array(alcoholic, dtype=bool)
+        self.codes = {column: np.array(values, dtype=np.int32) for column, values in codes.items()}
+        self.labels = {column: list(vocab) for column, vocab in self.vocab.items()}
+        # Один и тот же товар в разных магазинах получает общий ключ
+        self.product_key = np.array(keys, dtype=np.int64)
+
+        volume_l = self.volume_ml / 1000
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.price_per_litre = self.price / volume_l
+            # Цена литра чистого спирта; у безалкогольных товаров не определена
+            self.price_per_alcohol = self.price / (volume_l * self.alcohol_percentage / 100)
+        self.price_per_alcohol[~np.isfinite(self.price_per_alcohol)] = np.nan
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_results(cls, directory: Optional[Path] = None) -> "CatalogFrame":
+        """Frame of the latest results file of every store"""
+        return cls(load_latest_catalogs(directory))
+
+    def save(self, directory: Path) -> None:
+        """Save columns as .npy files and labels as JSON"""
+        directory.mkdir(parents=True, exist_ok=True)
+        for column in _ARRAYS:
+            np.save(directory / f"{column}.npy", getattr(self, column))
+        for column, codes in self.codes.items():
+            np.save(directory / f"code_{column}.npy", codes)
+        with open(directory / "frame.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "stores": self.stores, "names": self.names, "volumes": self.volumes, "labels": self.labels
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "CatalogFrame":
+        """Load saved frame; with mmap the columns are memory-mapped instead of read"""
+        mmap_mode = "r" if mmap else None
+        frame = cls.__new__(cls)
+        with open(directory / "frame.json", encoding="utf-8") as f:
+            data = json.load(f)
+        frame.stores, frame.names, frame.volumes, frame.labels = data["stores"], data["names"], data["volumes"], data["labels"]
+        frame.vocab = {column: {value: code for code, value in enumerate(labels)} for column, labels in frame.labels.items()}
+        for column in _ARRAYS:
+            setattr(frame, column, np.load(directory / f"{column}.npy", mmap_mode=mmap_mode))
+        frame.codes = {column: np.load(directory / f"code_{column}.npy", mmap_mode=mmap_mode) for column in CATEGORICAL}
+        return frame
+
+    def _codes_of(self, column: str, value: FilterValue) -> np.ndarray:
+        values = [value] if value is None or isinstance(value, str) else list(value)
+        vocab = self.vocab[column]
+        return np.array([vocab[v] for v in values if v in vocab], dtype=np.int32)
+
+    def mask(
+        self,
+        stores: Optional[Iterable[str]] = None,
+        is_alcoholic: Optional[bool] = None,
+        min_abv: Optional[float] = None,
+        max_abv: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_volume_ml: Optional[float] = None,
+        max_volume_ml: Optional[float] = None,
+        name: Optional[str] = None,
+        **attributes: FilterValue
+    ) -> np.ndarray:
+        """Boolean row mask; categorical attributes accept a value or a list of values"""
+        mask = np.ones(len(self), dtype=bool)
+        if stores is not None:
+            wanted = [code for code, store in enumerate(self.stores) if store in set(stores)]
+            mask &= np.isin(self.store, wanted)
+        if is_alcoholic is not None:
+            mask &= self.is_alcoholic == is_alcoholic
+        for column, value in attributes.items():
+            if column not in self.codes:
+                raise ValueError(f"Unknown attribute: {column}")
+            mask &= np.isin(self.codes[column], self._codes_of(column, value))
+        with np.errstate(invalid="ignore"):
+            if min_abv is not None:
+                mask &= self.alcohol_percentage >= min_abv
+            if max_abv is not None:
+                mask &= self.alcohol_percentage <= max_abv
+            if max_price is not None:
+                mask &= self.price <= max_price
+            if min_volume_ml is not None:
+                mask &= self.volume_ml >= min_volume_ml
+            if max_volume_ml is not None:
+                mask &= self.volume_ml <= max_volume_ml
+        if name:
+            query = name.lower()
+            mask &= np.fromiter((query in n.lower() for n in self.names), dtype=bool, count=len(self))
+        return mask
+
+    def column(self, metric: str) -> np.ndarray:
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        return getattr(self, metric)
+
+    def top_k_rows(
+        self,
+        k: int,
+        by: str = "price_per_litre",
+        descending: bool = False,
+        distinct: bool = False,
+        **filters: Any
+    ) -> np.ndarray:
+        """Row indices of the k best rows by the metric; distinct keeps the best store offer of each product"""
+        values = self.column(by)
+        rows = np.flatnonzero(self.mask(**filters) & ~np.isnan(values))
+        if not len(rows) or k <= 0:
+            return rows[:0]
+        keys = -values[rows] if descending else values[rows]
+
+        if distinct:
+            # Сортировка по (товар, значение): первая строка каждого товара - лучшее предложение
+            order = np.lexsort((keys, self.product_key[rows]))
+            _, first = np.unique(self.product_key[rows][order], return_index=True)
+            rows, keys = rows[order][first], keys[order][first]
+
+        if len(rows) > k:
+            # Выбор k лучших за O(n), сортируются только они; из равных k-му значению берутся первые по порядку строк
+            kth = np.partition(keys, k - 1)[k - 1]
+            better = np.flatnonzero(keys < kth)
+            selected = np.sort(np.concatenate((better, np.flatnonzero(keys == kth)[:k - len(better)])))
+            rows, keys = rows[selected], keys[selected]
+        return rows[np.argsort(keys, kind="stable")]
+
+    def row(self, idx: int) -> Dict[str, Any]:
+        """Ranked row as a dictionary"""
+        def value(array: np.ndarray) -> Optional[float]:
+            return None if np.isnan(array[idx]) else round(float(array[idx]), 2)
+
+        return {
+            "store": self.stores[self.store[idx]],
+            "name": self.names[idx],
+            "volume": self.volumes[idx],
+            "price": value(self.price),
+            "alcohol_percentage": value(self.alcohol_percentage),
+            "price_per_litre": value(self.price_per_litre),
+            "price_per_alcohol": value(self.price_per_alcohol),
+            **{column: self.labels[column][self.codes[column][idx]] for column in CATEGORICAL},
+        }
+
+    def top_k(self, k: int, by: str = "price_per_litre", **options: Any) -> List[Dict[str, Any]]:
+        """The k best value products matching the filters"""
+        return [self.row(idx) for idx in self.top_k_rows(k, by, **options)]
+
+def top_k_across(
+    frames: Iterable[CatalogFrame],
+    k: int,
+    by: str = "price_per_litre",
+    descending: bool = False,
+    **options: Any
+) -> List[Dict[str, Any]]:
+    """Merge top-k of separately loaded frames (e.g. a shard per store) with a heap"""
+    candidates = chain.from_iterable(frame.top_k(k, by, descending=descending, **options) for frame in frames)
+    select = heapq.nlargest if descending else heapq.nsmallest
+    return select(k, candidates, key=lambda row: row[by])
+
+def latest_results(directory: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+    """Latest results (address, timestamp, failed_pages, products) of every store: full JSON results file
+    with the later delta files applied"""
+    directory = directory or results_path()
+    latest: Dict[str, Dict[str, Any]] = {}
+    for path in directory.glob("lenta_products_*.json"):
+        if path.name.endswith(".checkpoint.json"):
+            continue
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        address = data.setdefault("address", path.stem)
+        data.setdefault("timestamp", "")
+        data["products"] = data.get("products") or []
+        if address not in latest or data["timestamp"] > latest[address]["timestamp"]:
+            latest[address] = data
+    for address, data in latest.items():
+        snapshot = load_snapshot(address, directory, full=True)
+        if snapshot is not None and snapshot[0] > data["timestamp"]:
+            # Неудачные страницы дельтой не записываются
+            timestamp, records = snapshot
+            latest[address] = {"address": address, "timestamp": timestamp, "failed_pages": [], "products": list(records.values())}
+    return latest
+
+def load_latest_catalogs(directory: Optional[Path] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Products of the latest results of every store"""
+    return {address: data["products"] for address, data in latest_results(directory).items()}
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Rank products of the latest parser results by value")
+    arg_parser.add_argument("--dir", type=Path, help="results directory (default: results/)")
+    arg_parser.add_argument("-k", type=int, default=20, help="number of products")
+    arg_parser.add_argument("--by", choices=METRICS, default="price_per_litre", help="ranking metric")
+    arg_parser.add_argument("--desc", action="store_true", help="largest values first")
+    arg_parser.add_argument("--distinct", action="store_true", help="best store offer of every product only")
+    arg_parser.add_argument("--store", action="append", help="store address (repeatable)")
+    arg_parser.add_argument("--name", help="substring of the product name")
+    arg_parser.add_argument("--alcoholic", choices=["yes", "no"], help="alcoholic or non-alcoholic only")
+    arg_parser.add_argument("--min-abv", type=float)
+    arg_parser.add_argument("--max-abv", type=float)
+    arg_parser.add_argument("--max-price", type=float, help="price limit in rubles")
+    for column in CATEGORICAL:
+        arg_parser.add_argument(f"--{column}", action="append", help=f"{column} value (repeatable)")
+    args = arg_parser.parse_args()
+
+    frame = CatalogFrame.from_results(args.dir)
+    filters = {column: getattr(args, column) for column in CATEGORICAL if getattr(args, column)}
+    rows = frame.top_k(
+        args.k, args.by, descending=args.desc, distinct=args.distinct,
+        stores=args.store, name=args.name,
+        is_alcoholic=None if args.alcoholic is None else args.alcoholic == "yes",
+        min_abv=args.min_abv, max_abv=args.max_abv, max_price=args.max_price,
+        **filters
+    )
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
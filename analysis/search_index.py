@@ -0,0 +1,250 @@
+from typing import List, Dict, Optional, Iterable, Tuple, Any, Mapping, Union
+from collections import defaultdict
+from bisect import bisect_left
+from pathlib import Path
+import argparse
+import json
+import re
+
+import numpy as np
+
+from analysis.ranking import CatalogFrame, CATEGORICAL, load_latest_catalogs
+from models.product import Product
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Вес совпадения токена запроса: точное, по префиксу, с опечатками (минус штраф за каждую)
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.7
+TYPO_PENALTY = 0.15
+
+def normalize(text: str) -> str:
+    """Lowercase text with ё folded into е"""
+    return text.lower().replace('ё', 'е')
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+def trigrams(token: str) -> List[str]:
+    """Character trigrams of the token padded at both ends"""
+    padded = f"^{token}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+def max_typos(token: str) -> int:
+    """Typos tolerated in the query token: none for short tokens"""
+    if len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 7 else 2
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein distance (adjacent transpositions) capped at limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    # Общие начало и конец на расстояние не влияют
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a or not b:
+        return min(max(len(a), len(b)), limit + 1)
+
+    big = limit + 1
+    previous2: List[int] = []
+    previous = [j if j <= limit else big for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        # Считается только полоса |i - j| <= limit, остальные клетки заведомо больше предела
+        current = [big] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return big
+        previous2, previous = previous, current
+    return min(previous[-1], big)
+
+def _csr(groups: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack lists of ids into offsets and one flat array"""
+    offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(group) for group in groups])
+    flat = np.fromiter((i for group in groups for i in group), dtype=np.int32, count=int(offsets[-1]))
+    return offsets, flat
+
+class SearchIndex:
+    """Inverted index over cleaned product names: token postings and character trigrams of the vocabulary"""
+
+    def __init__(self, frame: CatalogFrame) -> None:
+        self.frame = frame
+        postings: Dict[str, List[int]] = defaultdict(list)
+        # Одни и те же названия повторяются во всех магазинах, токены считаются один раз
+        name_tokens: Dict[str, List[str]] = {}
+        for doc, name in enumerate(frame.names):
+            tokens = name_tokens.get(name)
+            if tokens is None:
+                tokens = name_tokens[name] = list(dict.fromkeys(tokenize(name)))
+            for token in tokens:
+                postings[token].append(doc)
+        # Словарь отсортирован: поиск по префиксу - бинарный поиск диапазона
+        self.tokens: List[str] = sorted(postings)
+        self.token_offsets, self.postings = _csr([postings[token] for token in self.tokens])
+
+        gram_tokens: Dict[str, List[int]] = defaultdict(list)
+        for token_id, token in enumerate(self.tokens):
+            for gram in dict.fromkeys(trigrams(token)):
+                gram_tokens[gram].append(token_id)
+        self.grams: List[str] = sorted(gram_tokens)
+        self.gram_offsets, self.gram_token_ids = _csr([gram_tokens[gram] for gram in self.grams])
+        self._prepare()
+
+    def _prepare(self) -> None:
+        self._token_ids = {token: token_id for token_id, token in enumerate(self.tokens)}
+        self._gram_ids = {gram: gram_id for gram_id, gram in enumerate(self.grams)}
+        self._token_lengths = np.fromiter(map(len, self.tokens), dtype=np.int64, count=len(self.tokens))
+        doc_freq = np.diff(self.token_offsets)
+        self.idf = np.log1p(len(self.frame) / np.maximum(doc_freq, 1))
+
+    @classmethod
+    def from_catalogs(cls, catalogs: Mapping[str, Iterable[Union[Product, Mapping[str, Any]]]]) -> "SearchIndex":
+        return cls(CatalogFrame(catalogs))
+
+    @classmethod
+    def from_results(cls, directory: Optional[Path] = None) -> "SearchIndex":
+        """Index of the latest results file of every store"""
+        return cls.from_catalogs(load_latest_catalogs(directory))
+
+    def _postings(self, token_id: int) -> np.ndarray:
+        return self.postings[self.token_offsets[token_id]:self.token_offsets[token_id + 1]]
+
+    def _prefix_matches(self, prefix: str) -> range:
+        start = bisect_left(self.tokens, prefix)
+        end = bisect_left(self.tokens, prefix + "\uffff", start)
+        return range(start, end)
+
+    def _fuzzy_matches(self, token: str, typos: int) -> Dict[int, int]:
+        """Vocabulary tokens within the typo limit: trigram candidates verified by edit distance"""
+        grams = list(dict.fromkeys(trigrams(token)))
+        # Правка портит до трех триграмм, перестановка соседних букв - до четырех
+        required = max(0, len(grams) - 4 * typos)
+        if required:
+            counts: Dict[int, int] = defaultdict(int)
+            for gram in grams:
+                gram_id = self._gram_ids.get(gram)
+                if gram_id is None:
+                    continue
+                for token_id in self.gram_token_ids[self.gram_offsets[gram_id]:self.gram_offsets[gram_id + 1]].tolist():
+                    counts[token_id] += 1
+            candidates = [token_id for token_id, shared in counts.items() if shared >= required]
+        else:
+            # Короткий токен с опечаткой может не разделить ни одной триграммы: кандидаты отбираются по длине
+            candidates = np.flatnonzero(np.abs(self._token_lengths - len(token)) <= typos).tolist()
+        matches = {}
+        for token_id in candidates:
+            distance = edit_distance(token, self.tokens[token_id], typos)
+            if distance <= typos:
+                matches[token_id] = distance
+        return matches
+
+    def _token_weights(self, token: str, prefix: bool) -> Dict[int, float]:
+        """Matching vocabulary tokens of the query token with their match weight"""
+        weights: Dict[int, float] = {}
+        token_id = self._token_ids.get(token)
+        if token_id is not None:
+            weights[token_id] = EXACT_WEIGHT
+        if prefix:
+            for token_id in self._prefix_matches(token):
+                weights.setdefault(token_id, PREFIX_WEIGHT)
+        typos = max_typos(token)
+        if typos:
+            for token_id, distance in self._fuzzy_matches(token, typos).items():
+                weights.setdefault(token_id, FUZZY_WEIGHT - TYPO_PENALTY * (distance - 1))
+        return weights
+
+    def search_rows(self, query: str, limit: int = 20, prefix: bool = True, **filters: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """Row indices and scores of the best matches; every query token has to match"""
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        size = len(self.frame)
+        total = np.zeros(size)
+        matched = self.frame.mask(**filters) if filters else np.ones(size, dtype=bool)
+        for position, token in enumerate(query_tokens):
+            # Префикс учитывается у последнего токена: его пользователь еще набирает
+            weights = self._token_weights(token, prefix and position == len(query_tokens) - 1)
+            scores = np.zeros(size)
+            for token_id, weight in weights.items():
+                # Документы в списке токена не повторяются
+                docs = self._postings(token_id)
+                scores[docs] = np.maximum(scores[docs], weight * self.idf[token_id])
+            matched &= scores > 0
+            total += scores
+
+        rows = np.flatnonzero(matched)
+        if len(rows) > limit:
+            rows = rows[np.argpartition(-total[rows], limit - 1)[:limit]]
+        rows = rows[np.argsort(-total[rows], kind="stable")]
+        return rows, total[rows]
+
+    def search(self, query: str, limit: int = 20, prefix: bool = True, **filters: Any) -> List[Dict[str, Any]]:
+        """Products matching the query (prefix and typo tolerant) and the structured filters"""
+        rows, scores = self.search_rows(query, limit, prefix, **filters)
+        return [{**self.frame.row(row), "score": round(float(score), 3)} for row, score in zip(rows, scores)]
+
+    def save(self, directory: Path) -> None:
+        """Save the index with its catalog frame"""
+        self.frame.save(directory / "frame")
+        for name in ("token_offsets", "postings", "gram_offsets", "gram_token_ids"):
+            np.save(directory / f"{name}.npy", getattr(self, name))
+        with open(directory / "vocabulary.json", "w", encoding="utf-8") as f:
+            json.dump({"tokens": self.tokens, "grams": self.grams}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "SearchIndex":
+        """Load saved index; with mmap postings are paged in on demand"""
+        mmap_mode = "r" if mmap else None
+        index = cls.__new__(cls)
+        index.frame = CatalogFrame.load(directory / "frame", mmap=mmap)
+        for name in ("token_offsets", "postings", "gram_offsets", "gram_token_ids"):
+            setattr(index, name, np.load(directory / f"{name}.npy", mmap_mode=mmap_mode))
+        with open(directory / "vocabulary.json", encoding="utf-8") as f:
+            vocabulary = json.load(f)
+        index.tokens, index.grams = vocabulary["tokens"], vocabulary["grams"]
+        index._prepare()
+        return index
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Search products of the latest parser results")
+    arg_parser.add_argument("query", nargs="?", help="search query")
+    arg_parser.add_argument("--dir", type=Path, help="results directory (default: results/)")
+    arg_parser.add_argument("--index", type=Path, help="saved index directory")
+    arg_parser.add_argument("--build", action="store_true", help="rebuild the index from results and save it to --index")
+    arg_parser.add_argument("-n", "--limit", type=int, default=20, help="number of results")
+    arg_parser.add_argument("--store", action="append", help="store address (repeatable)")
+    arg_parser.add_argument("--max-price", type=float, help="price limit in rubles")
+    for column in CATEGORICAL:
+        arg_parser.add_argument(f"--{column}", action="append", help=f"{column} value (repeatable)")
+    args = arg_parser.parse_args()
+
+    if args.index and not args.build and args.index.exists():
+        index = SearchIndex.load(args.index)
+    else:
+        index = SearchIndex.from_results(args.dir)
+        if args.index:
+            args.index.mkdir(parents=True, exist_ok=True)
+            index.save(args.index)
+            print(f"Index saved to {args.index}: {len(index.frame)} products, {len(index.tokens)} tokens")
+    if args.query:
+        filters: Dict[str, Any] = {column: getattr(args, column) for column in CATEGORICAL if getattr(args, column)}
+        if args.store:
+            filters["stores"] = args.store
+        if args.max_price is not None:
+            filters["max_price"] = args.max_price
+        for row in index.search(args.query, args.limit, **filters):
+            print(json.dumps(row, ensure_ascii=False))
@@ -0,0 +1,80 @@
+from typing import List
+import random
+
+# Названия в том виде, в каком они приходят из карточек каталога
+NAMES = [
+    "Пиво светлое ЖИГУЛЕВСКОЕ БАРНОЕ фильтрованное пастеризованное 4%, 0.45л",
+    "Пиво светлое BALTIKA №7 Экспортное фильтрованное пастеризованное 5,4%, ж/б 0.45л",
+    "Пиво светлое BALTIKA №3 Классическое пастеризованное 4,8%, 0.47л",
+    "Пиво темное BALTIKA №6 Портер пастеризованное 7%, 0.45л",
+    "Пиво светлое ОХОТА Крепкое фильтрованное пастеризованное 8,1%, ж/б 0.45л",
+    "Пиво светлое ZATECKY GUS фильтрованное пастеризованное 4,6%, пэт 1.35л",
+    "Пиво светлое ZATECKY GUS фильтрованное пастеризованное 4,6%, ж/б 0.45л",
+    "Пиво светлое KRUSOVICE Imperial фильтрованное пастеризованное 5%, 0.45л",
+    "Пиво темное KRUSOVICE Cerne фильтрованное пастеризованное 3,8%, ж/б 0.45л",
+    "Пиво светлое STELLA ARTOIS фильтрованное пастеризованное 5%, 0.44л",
+    "Пиво светлое BUD фильтрованное пастеризованное 5%, ж/б 0.45л",
+    "Пиво безалкогольное BUD светлое фильтрованное пастеризованное 0%, ж/б 0.45л",
+    "Пиво безалкогольное BALTIKA №0 Пшеничное нефильтрованное 0,5%, ж/б 0.45л",
+    "Пиво светлое ЧЕШСКИЙ МЕДВЕДЬ неосветленное нефильтрованное непастеризованное 4,5%, пэт 1.35л",
+    "Пиво светлое ЛЕНТА Живое нефильтрованное непастеризованное 4,5%, пэт 1.5л",
+    "Пиво светлое ВОЛКОВСКАЯ ПИВОВАРНЯ Пшеничное нефильтрованное 5,1%, ж/б 0.45л",
+    "Пиво светлое AFANASY Домашнее нефильтрованное пастеризованное 4%, пэт 1.3л",
+    "Пиво светлое ХАМОВНИКИ Венское фильтрованное пастеризованное 4,5%, 0.47л",
+    "Пиво темное ХАМОВНИКИ Мюнхенское фильтрованное пастеризованное 4,5%, 0.47л",
+    "Пиво светлое ТРИ МЕДВЕДЯ фильтрованное пастеризованное 4,5%, ж/б 0.45л",
+    "Пиво светлое БАГБИР фильтрованное пастеризованное 4,9%, пэт 2.5л",
+    "Пиво светлое ESSA Ананас и грейпфрут пастеризованное 6,5%, 0.45л",
+    "Пиво светлое BADEN BADEN Баден-Баден пшеничное нефильтрованное непастеризованное 4,5%, 0.5л",
+    "Пиво светлое PAULANER Hefe-Weissbier нефильтрованное пастеризованное 5,5%, ж/б 0.5л",
+    "Пиво светлое ERDINGER Weissbier нефильтрованное пастеризованное 5,3%, 0.5л",
+    "Пиво темное GUINNESS Draught фильтрованное пастеризованное 4,2%, ж/б 0.44л",
+    "Пиво светлое HEINEKEN фильтрованное пастеризованное 4,8%, 0.47л",
+    "Пиво светлое AMSTEL Premium Pilsener фильтрованное пастеризованное 4,8%, ж/б 0.45л",
+    "Пиво светлое CORONA EXTRA фильтрованное пастеризованное 4,5%, 0.355л",
+    "Пиво светлое ГОССЕР фильтрованное пастеризованное 4,7%, пэт 1.3л",
+    "Напиток пивной HOEGAARDEN Белое нефильтрованный пастеризованный 4,9%, 0.44л",
+    "Напиток пивной BLANCHE DE BRUXELLES нефильтрованный 4,5%, 0.33л",
+    "Напиток пивной ESSA Апельсин пастеризованный 6,5%, 0.45л",
+    "Напиток медовый МЕДОВАРНЯ Клюква газированный 5,5%, 0.45л",
+    "Сидр ЧЕСТНЫЙ СИДР Яблочный полусладкий газированный 6%, 0.5л",
+    "Сидр ЧЕСТНЫЙ СИДР Груша сладкий газированный 5,5%, ж/б 0.45л",
+    "Сидр STRONGBOW Gold Apple сладкий 4,5%, ж/б 0.45л",
+    "Сидр MAGNERS Original полусухой 4,5%, 0.568л",
+    "Сидр ЯБЛОЧНЫЙ СПАС сухой газированный 5,7%, 0.75л",
+    "Сидр ЛЕНТА Классический полусладкий 5%, пэт 1.5л",
+    "Медовуха ВЕЛИКИЙ УСТЮГ Классическая сладкая 5,5%, 0.5л",
+    "Медовуха СУЗДАЛЬСКАЯ Крепкая полусладкая не менее 7%, 0.5л",
+    "Медовуха ЛЕДЯНАЯ Вишня 5%, 0.33л",
+    "Набор подарочный BALTIKA 3 бутылки и бокал",
+    "Пиво разливное Светлое 4,5% 1л",
+]
+
+_BRANDS = [
+    "BALTIKA", "ЖИГУЛЕВСКОЕ", "ОХОТА", "ZATECKY GUS", "KRUSOVICE", "ХАМОВНИКИ", "ЧЕШСКИЙ МЕДВЕДЬ",
+    "ВОЛКОВСКАЯ ПИВОВАРНЯ", "AFANASY", "PAULANER", "ERDINGER", "HEINEKEN", "ESSA", "БАГБИР", "ЛЕНТА",
+]
+_STYLES = ["Классическое", "Пшеничное", "Портер", "Лагер", "IPA", "Светлое", "Бархатное", "Эль", "Стаут", ""]
+_TYPES = ["Пиво светлое", "Пиво темное", "Пиво", "Пиво безалкогольное", "Напиток пивной", "Сидр", "Медовуха"]
+_ATTRIBUTES = [
+    "фильтрованное", "нефильтрованное", "пастеризованное", "непастеризованное",
+    "осветленное", "неосветленное", "полусладкий", "сухой", "",
+]
+_STRENGTHS = ["0%", "0,5%", "4%", "4,5%", "4,7%", "5%", "5,4%", "6,5%", "8%", "не менее 7%", "от 4%", "до 6%"]
+_PACKAGES = ["0.45л", "ж/б 0.45л", "ж/б 0.5л", "пэт 1.35л", "пэт 1.5л", "0.33л", "с/б 0.5л"]
+
+def generate_names(count: int, seed: int = 42) -> List[str]:
+    """Generate catalog-like product names: the real samples mixed with synthetic combinations"""
+    rng = random.Random(seed)
+    names = []
+    while len(names) < count:
+        if rng.random() < 0.3:
+            names.append(rng.choice(NAMES))
+            continue
+        parts = [
+            rng.choice(_TYPES), rng.choice(_BRANDS), rng.choice(_STYLES),
+            rng.choice(_ATTRIBUTES), rng.choice(_ATTRIBUTES),
+        ]
+        name = " ".join(part for part in parts if part)
+        names.append(f"{name} {rng.choice(_STRENGTHS)}, {rng.choice(_PACKAGES)}")
+    return names
@@ -0,0 +1,235 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Optional, Tuple, Iterable
+from urllib.parse import urlsplit, parse_qs, unquote
+from email.utils import formatdate
+from html import escape
+import threading
+import json
+import hashlib
+import random
+import struct
+import zlib
+
+from benchmarks.corpus import generate_names
+
+PAGE_SIZE = 40
+# Разных изображений меньше, чем карточек: одинаковые снимки под разными URL
+IMAGE_VARIANTS = 16
+IMAGE_LAST_MODIFIED = formatdate(1_700_000_000, usegmt=True)
+
+# Разметка повторяет селекторы из config/selectors.py
+MAIN_PAGE = """<!DOCTYPE html>
+<html lang="ru"><head><meta charset="utf-8"><title>Лента</title></head><body>
+<div class="address-block ng-star-inserted" id="address">__ADDRESS__</div>
+<form class="ng-untouched ng-pristine ng-valid" id="address-form" style="display:none">
+  <input class="p-element p-autocomplete-input p-inputtext p-component ng-star-inserted" id="address-input">
+  <ul id="address-list"></ul>
+  <button type="button" class="p-element p-button p-button-primary large w-100 p-component ng-star-inserted" id="confirm">Подтвердить</button>
+</form>
+<lu-catalog-button class="ng-star-inserted"><button class="p-button p-button-tertiary catalog-button" id="catalog">Каталог</button></lu-catalog-button>
+<div id="menu" style="display:none">
+  <a href="https://lenta.com/catalog/alkogolnye-napitki" onclick="event.preventDefault(); location.href='/catalog/alko'">Алкогольные напитки</a>
+</div>
+<script>
+const address = document.getElementById('address');
+const form = document.getElementById('address-form');
+const input = document.getElementById('address-input');
+const list = document.getElementById('address-list');
+address.onclick = () => { form.style.display = 'block'; };
+input.oninput = () => {
+  if (list.firstChild) return;
+  const item = document.createElement('li');
+  item.className = 'p-ripple p-element p-autocomplete-item ng-star-inserted';
+  item.textContent = 'Лента';
+  list.appendChild(item);
+};
+document.getElementById('confirm').onclick = () => {
+  document.cookie = 'store=' + encodeURIComponent(input.value) + '; path=/';
+  address.textContent = input.value;
+  form.style.display = 'none';
+};
+document.getElementById('catalog').onclick = () => { document.getElementById('menu').style.display = 'block'; };
+</script>
+</body></html>"""
+
+ALCOHOL_PAGE = """<!DOCTYPE html>
+<html lang="ru"><head><meta charset="utf-8"><title>Алкоголь</title></head><body>
+<div class="product-categories-chips ng-star-inserted">
+__CHIPS__
+</div>
+</body></html>"""
+
+CHIP = """  <a href="https://lenta.com/catalog/{slug}" onclick="event.preventDefault(); location.href='/catalog/{slug}'">{slug}</a>"""
+
+CARD = """<div class="lu-grid__item ng-star-inserted"><div class="lu-product-card">
+<img class="lu-product-card-image" src="/images/{page}-{idx}.png" width="160" height="160" alt="">
+<div class="card-name"><span class="card-name_content">{name}</span><p class="card-name_package">{volume}</p></div>
+<div class="card-prices"><span class="main-price __accent">{price} ₽</span></div>
+</div></div>"""
+
+def render_image(variant: int, size: int = 64) -> bytes:
+    """Solid color PNG of the image variant"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rng = random.Random(variant)
+    row = b"\x00" + bytes(rng.randrange(256) for _ in range(3)) * size
+    return b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(row * size)),
+        chunk(b"IEND", b""),
+    ))
+
+def card_values(names: List[str], page: int, seed: int = 7) -> List[Tuple[str, str, int]]:
+    """Cards of the catalog page: (name, volume, price in kopecks)"""
+    rng = random.Random(seed * 1000 + page)
+    cards = []
+    for name in names:
+        rubles = rng.randint(49, 399)
+        volume = rng.choice(["0,45 л", "0,5 л", "0,33 л", "1,35 л"])
+        cards.append((name, volume, rubles * 100 + rng.randint(0, 99)))
+    return cards
+
+def render_catalog_page(names: List[str], page: int, total_pages: int, seed: int = 7, path: str = "/catalog/pivo") -> str:
+    """Render catalog page HTML with product cards and pagination"""
+    cards = [
+        CARD.format(page=page, idx=idx, name=escape(name), volume=volume, price=f"{kopecks // 100},{kopecks % 100:02d}")
+        for idx, (name, volume, kopecks) in enumerate(card_values(names, page, seed))
+    ]
+    pagination = "".join(
+        f'<li><a aria-label="перейти на страницу {n}" href="{path}?page={n}">{n}</a></li>'
+        for n in range(1, total_pages + 1)
+    )
+    return (
+        '<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8"><title>Каталог</title></head><body>'
+        f'<div class="lu-grid">{"".join(cards)}</div>'
+        f'<nav class="ng-star-inserted"><ul class="pagination">{pagination}</ul></nav>'
+        '</body></html>'
+    )
+
+def render_catalog_json(names: List[str], page: int, total_items: int, page_size: int, seed: int = 7) -> str:
+    """Render catalog API response of the page (pagination given by total and limit)"""
+    items = [
+        {"name": name, "package": volume, "prices": {"price": kopecks}, "images": [{"url": f"/images/{page}-{idx}.png"}]}
+        for idx, (name, volume, kopecks) in enumerate(card_values(names, page, seed))
+    ]
+    return json.dumps({"items": items, "pagination": {"page": page, "total": total_items, "limit": page_size}}, ensure_ascii=False)
+
+class MockStorefront:
+    """Local HTTP stand-in of the store: address selection, catalog menu, paginated category catalogs
+    (HTML under /catalog/<slug>, JSON API under /api/catalog/<slug>) and card images answering conditional requests"""
+
+    def __init__(self, total_pages: int = 5, page_size: int = PAGE_SIZE, seed: int = 7, categories: Iterable[str] = ("pivo",)) -> None:
+        self.total_pages = total_pages
+        # Товары каждой категории свои; первая категория совпадает с прежним единственным каталогом
+        self.catalogs: Dict[str, List[str]] = {
+            slug: generate_names(total_pages * page_size, seed=seed + idx) for idx, slug in enumerate(categories)
+        }
+        self.names = [name for names in self.catalogs.values() for name in names]
+        self.page_size = page_size
+        self.seed = seed
+        self.requests = 0
+        self.image_requests = 0
+        self.not_modified = 0
+        self.images = [render_image(variant) for variant in range(IMAGE_VARIANTS)]
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_names(self, page: int, slug: str = "pivo") -> List[str]:
+        start = (page - 1) * self.page_size
+        return self.catalogs[slug][start:start + self.page_size]
+
+    def _handler(self):
+        storefront = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8") -> None:
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_image(self, name: str) -> None:
+                storefront.image_requests += 1
+                try:
+                    page, idx = map(int, name.removesuffix(".png").split("-"))
+                except ValueError:
+                    self._send(404, "not found", "text/plain")
+                    return
+                data = storefront.images[(page * storefront.page_size + idx) % IMAGE_VARIANTS]
+                etag = '"' + hashlib.sha1(data).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    storefront.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", IMAGE_LAST_MODIFIED)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                storefront.requests += 1
+                parts = urlsplit(self.path)
+                if parts.path == "/":
+                    cookies = dict(
+                        c.strip().split("=", 1) for c in self.headers.get("Cookie", "").split(";") if "=" in c
+                    )
+                    address = unquote(cookies.get("store", "")) or "Выберите адрес доставки"
+                    self._send(200, MAIN_PAGE.replace("__ADDRESS__", escape(address)))
+                elif parts.path == "/catalog/alko":
+                    chips = "\n".join(CHIP.format(slug=slug) for slug in storefront.catalogs)
+                    self._send(200, ALCOHOL_PAGE.replace("__CHIPS__", chips))
+                elif parts.path.startswith("/images/"):
+                    self._send_image(parts.path[len("/images/"):])
+                elif parts.path.startswith(("/catalog/", "/api/catalog/")):
+                    slug = parts.path.rsplit("/", 1)[1]
+                    page = int(parse_qs(parts.query).get("page", ["1"])[0])
+                    names = storefront.catalogs.get(slug)
+                    if names is None or not 1 <= page <= storefront.total_pages:
+                        self._send(404, "not found", "text/plain")
+                    elif parts.path.startswith("/api/"):
+                        self._send(200, render_catalog_json(
+                            storefront.page_names(page, slug), page, len(names), storefront.page_size, storefront.seed
+                        ), "application/json; charset=utf-8")
+                    else:
+                        self._send(200, render_catalog_page(
+                            storefront.page_names(page, slug), page, storefront.total_pages, storefront.seed, parts.path
+                        ))
+                else:
+                    self._send(404, "not found", "text/plain")
+
+        return Handler
+
+    def start(self) -> "MockStorefront":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockStorefront":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
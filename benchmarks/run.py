@@ -0,0 +1,237 @@
+from typing import List, Dict, Callable, Optional, Any
+from datetime import datetime
+from pathlib import Path
+import subprocess
+import tempfile
+import statistics
+import argparse
+import platform
+import asyncio
+import time
+import json
+import sys
+
+from benchmarks.corpus import generate_names
+from benchmarks.mock_store import MockStorefront, render_catalog_page
+from parsers.html_catalog import parse_catalog_html
+from models.page_key import PageKey
+from utils.name_processor import process_product_name, process_many
+from utils.name_cache import NameCache
+
+SUITES = ("names", "html", "ranking", "images", "dom", "e2e")
+
+def _summary(timings: List[float], items: int) -> Dict[str, Any]:
+    median = statistics.median(timings)
+    return {
+        "unit": "s",
+        "runs": len(timings),
+        "items": items,
+        "min": min(timings),
+        "median": median,
+        "mean": statistics.fmean(timings),
+        "max": max(timings),
+        "items_per_sec": items / median if median else None,
+    }
+
+def measure(func: Callable[[], Any], items: int, repeat: int = 5) -> Dict[str, Any]:
+    """Time a synchronous callable"""
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return _summary(timings, items)
+
+async def measure_async(func: Callable[[], Any], items: int, repeat: int = 5) -> Dict[str, Any]:
+    """Time a coroutine function"""
+    await func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - start)
+    return _summary(timings, items)
+
+def bench_names(count: int) -> Dict[str, Dict]:
+    """Name normalization microbenchmarks"""
+    names = generate_names(count)
+    cache = NameCache(maxsize=count)
+    return {
+        "names.process_product_name": measure(lambda: [process_product_name(n) for n in names], len(names)),
+        "names.process_many": measure(lambda: process_many(names), len(names)),
+        # Повторные прогоны попадают в прогретый LRU, как ежедневный обход тех же магазинов
+        "names.cached_warm": measure(lambda: cache.process_many(names), len(names)),
+    }
+
+def bench_html(pages: int) -> Dict[str, Dict]:
+    """Catalog HTML parsing without a browser"""
+    names = generate_names(40)
+    html = render_catalog_page(names, 1, pages)
+    return {
+        "html.parse_catalog_html": measure(lambda: parse_catalog_html(html), len(names), repeat=20),
+    }
+
+def bench_ranking(count: int, stores: int = 20) -> Dict[str, Dict]:
+    """Vectorized filtering and top-k over catalogs of many stores"""
+    import random
+    from analysis.ranking import CatalogFrame
+
+    rng = random.Random(42)
+    names = generate_names(count // stores)
+    processed = process_many(names)
+    catalogs = {}
+    for store in range(stores):
+        catalogs[f"store {store}"] = [{
+            "name": name, "type": product_type, "color": color, "is_alcoholic": is_alcoholic,
+            "filtering": filtering, "pasteurization": pasteurization, "alcohol_percentage": abv,
+            "sweetness": sweetness, "packaging": packaging, "clarification": clarification,
+            "volume": rng.choice(["0,45 л", "0,5 л", "1,35 л"]), "price_kopecks": rng.randint(4900, 39900),
+        } for product_type, name, color, is_alcoholic, filtering, pasteurization, abv, sweetness, packaging, clarification in processed]
+    frame = CatalogFrame(catalogs)
+    return {
+        "ranking.build": measure(lambda: CatalogFrame(catalogs), len(frame), repeat=3),
+        "ranking.top_k": measure(lambda: frame.top_k(20, color="Светлое", packaging="ж/б"), len(frame)),
+        "ranking.top_k_distinct": measure(lambda: frame.top_k(20, by="price_per_alcohol", distinct=True), len(frame)),
+    }
+
+async def bench_dom(pages: int) -> Dict[str, Dict]:
+    """DOM card extraction in Chromium: batch evaluate vs per-element queries"""
+    from playwright.async_api import async_playwright
+    from parsers.lenta_parser import AsyncLentaProductParse, browser_launch_settings
+
+    names = generate_names(40)
+    html = render_catalog_page(names, 1, pages)
+    parser = AsyncLentaProductParse("benchmark", use_session_cache=False)
+    results = {}
+    async with async_playwright() as p:
+        async with await p.chromium.launch(**browser_launch_settings()) as browser:
+            page = await browser.new_page()
+            await page.set_content(html)
+            results["dom.batch_extraction"] = await measure_async(lambda: parser._extract_cards(page), len(names))
+            results["dom.per_element_extraction"] = await measure_async(
+                lambda: parser._extract_cards_per_element(page, PageKey("beer", 1)), len(names)
+            )
+    return results
+
+async def bench_e2e(pages: int) -> Dict[str, Dict]:
+    """Full parser run against the local mock storefront"""
+    import parsers.lenta_parser as lenta_parser
+
+    results = {}
+    with MockStorefront(total_pages=pages) as storefront:
+        lenta_parser.BASE_URL = storefront.url
+        expected = len(storefront.names)
+        for concurrency in (1, 4):
+            async def run() -> None:
+                parser = lenta_parser.AsyncLentaProductParse(
+                    "Москва, Тестовая ул., 1", page_concurrency=concurrency, use_session_cache=False
+                )
+                catalog = await parser.parse()
+                if catalog is None or len(catalog) != expected:
+                    raise RuntimeError(f"expected {expected} products, got {None if catalog is None else len(catalog)}")
+            results[f"e2e.parse.concurrency_{concurrency}"] = await measure_async(run, expected, repeat=3)
+    return results
+
+async def bench_images(pages: int) -> Dict[str, Dict]:
+    """Image cache against the local mock storefront: cold download, conditional revalidation, cache hits"""
+    from utils.image_cache import ImageFetcher
+
+    results = {}
+    with MockStorefront(total_pages=pages) as storefront, tempfile.TemporaryDirectory() as directory:
+        images = [f"/images/{page}-{idx}.png" for page in range(1, pages + 1) for idx in range(storefront.page_size)]
+
+        async def fetch_all(cache_dir: Path, revalidate_hours: float) -> None:
+            fetcher = ImageFetcher(cache_dir, revalidate_hours=revalidate_hours, base_url=storefront.url)
+            try:
+                paths = await asyncio.gather(*(fetcher.fetch(image) for image in images))
+            finally:
+                await fetcher.close()
+            if None in paths:
+                raise RuntimeError(f"{paths.count(None)} images not loaded")
+
+        runs = iter(range(1_000_000))
+        results["images.cold"] = await measure_async(
+            lambda: fetch_all(Path(directory) / f"cold_{next(runs)}", 24), len(images), repeat=3
+        )
+        warm = Path(directory) / "warm"
+        await fetch_all(warm, 24)
+        results["images.revalidate"] = await measure_async(lambda: fetch_all(warm, 0), len(images), repeat=3)
+        results["images.cached"] = await measure_async(lambda: fetch_all(warm, 24), len(images))
+    return results
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).parent.parent, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> bool:
+    """Print median ratios against the baseline, returns False on regressions"""
+    ok = True
+    for name, result in sorted(current["benchmarks"].items()):
+        base = baseline["benchmarks"].get(name)
+        if not base:
+            print(f"{name:45s} {result['median'] * 1000:10.2f} ms   (new)")
+            continue
+        ratio = result["median"] / base["median"]
+        mark = "REGRESSION" if ratio > threshold else ""
+        ok = ok and ratio <= threshold
+        print(f"{name:45s} {result['median'] * 1000:10.2f} ms   x{ratio:5.2f} {mark}")
+    return ok
+
+def run(suites: List[str], names: int, pages: int) -> Dict:
+    benchmarks = {}
+    if "names" in suites:
+        benchmarks.update(bench_names(names))
+    if "html" in suites:
+        benchmarks.update(bench_html(pages))
+    if "ranking" in suites:
+        try:
+            benchmarks.update(bench_ranking(names * 10))
+        except ImportError as e:
+            print(f"Skipping ranking benchmarks: {e}", file=sys.stderr)
+    for suite, bench in (("images", bench_images), ("dom", bench_dom), ("e2e", bench_e2e)):
+        if suite not in suites:
+            continue
+        try:
+            benchmarks.update(asyncio.run(bench(pages)))
+        except ImportError as e:
+            print(f"Skipping {suite} benchmarks: {e}", file=sys.stderr)
+    return {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "benchmarks": benchmarks,
+    }
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Offline parser benchmarks")
+    arg_parser.add_argument("--suite", default=",".join(SUITES), help=f"comma separated suites: {', '.join(SUITES)}")
+    arg_parser.add_argument("--names", type=int, default=20000, help="name corpus size")
+    arg_parser.add_argument("--pages", type=int, default=5, help="catalog pages of the mock storefront")
+    arg_parser.add_argument("--output", type=Path, help="write JSON results to the file")
+    arg_parser.add_argument("--compare", type=Path, help="baseline JSON results to compare with")
+    arg_parser.add_argument("--threshold", type=float, default=1.10, help="median ratio treated as a regression")
+    args = arg_parser.parse_args()
+
+    suites = [s.strip() for s in args.suite.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        arg_parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    report = run(suites, args.names, args.pages)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if not compare(report, baseline, args.threshold):
+            sys.exit(1)
+    else:
+        print(json.dumps(report, indent=2))
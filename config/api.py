@@ -0,0 +1,19 @@
+# Catalog API responses captured by the network engine
+CATALOG_RESPONSE_PATTERN = r"/api-gateway/v\d+/catalog/items"
+
+# Field paths in the catalog API JSON (dot separated, numbers index lists).
+# The first path that resolves to a value is used.
+API_FIELDS = {
+    "items": ["items", "products", "data.items"],
+    "name": ["name", "title"],
+    "volume": ["weight.package", "package", "volume"],
+    "price": ["prices.price", "prices.cost", "price"],
+    "image": ["images.0.url", "image.url", "image"],
+    # Пагинация ответа: число страниц, иначе всего товаров и размер страницы
+    "pages": ["pagination.pages", "pagination.totalPages", "totalPages", "pages", "meta.pages"],
+    "total": ["total", "totalCount", "pagination.total", "pagination.totalCount", "meta.total"],
+    "limit": ["limit", "pageSize", "pagination.limit", "pagination.pageSize", "meta.limit"],
+}
+
+# Raw price units per ruble (100 - price is given in kopecks)
+API_PRICE_DIVISOR = 100
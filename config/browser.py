@@ -42,4 +42,86 @@ USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
 BASE_URL = "https://lenta.com"
 TIMEOUT = 30000
 LOG_MAX_SIZE_MB = 1
-RESULTS_DIR = "results"
\ No newline at end of file
+# Log rotation: "size" (LOG_MAX_SIZE_MB per file) or "time" (LOG_ROTATION_WHEN), rotated files kept
+LOG_ROTATION = "size"
+LOG_ROTATION_WHEN = "midnight"
+LOG_BACKUP_COUNT = 5
+LOG_LEVEL = "INFO"
+# Write log records through a queue listener thread so file I/O does not block the event loop
+LOG_QUEUE = True
+RESULTS_DIR = "results"
+# Extract all product cards of a page in one DOM round trip (False - per-element queries)
+BATCH_EXTRACTION = True
+# Number of catalog pages parsed concurrently in tabs of one store context (1 - sequential clicks)
+PAGE_CONCURRENCY = 4
+# Catalog page readiness: card count and texts unchanged for READY_QUIET_MS, gives up after READY_TIMEOUT (ms)
+READY_QUIET_MS = 250
+READY_TIMEOUT = 15000
+# Catalog categories crawled in one store visit: name -> catalog URL or slug (start of the path after /catalog/).
+# Slug URLs are looked up in the catalog menu once and cached with the store session, then opened directly
+CATALOG_CATEGORIES: Dict[str, str] = {
+    "beer": "pivo",
+    "cider": "sidr",
+    "mead": "medovuha",
+}
+# Query parameter used to open a catalog page directly
+PAGE_QUERY_PARAM = "page"
+# Number of stores parsed at once by the multi-store runner
+STORE_CONCURRENCY = 3
+
+# Request routing profile: "none", "images" or "aggressive"
+ROUTING_PROFILE = "images"
+ROUTING_PROFILES: Dict[str, Dict[str, Any]] = {
+    "none": {"resource_types": [], "block_domains": False},
+    "images": {"resource_types": ["image", "media", "font"], "block_domains": True},
+    "aggressive": {
+        "resource_types": ["image", "media", "font", "stylesheet", "texttrack", "eventsource", "manifest", "other"],
+        "block_domains": True
+    },
+}
+# Resource types counted by the per-host request rate limit of the refresh scheduler
+RATE_LIMITED_TYPES = ("document", "xhr", "fetch")
+# Third-party domains (with subdomains) blocked by the routing profiles
+BLOCKED_DOMAINS = [
+    "mc.yandex.ru",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "top-fwz1.mail.ru",
+    "vk.com",
+    "mytarget.ru",
+    "criteo.com",
+    "flocktory.com",
+]
+# Average size of a blocked resource, used to estimate saved traffic
+ESTIMATED_RESOURCE_BYTES = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 60_000,
+    "stylesheet": 30_000,
+    "script": 80_000,
+}
+DEFAULT_RESOURCE_BYTES = 5_000
+
+# Store session cache (Playwright storage_state saved after store selection)
+SESSION_CACHE_ENABLED = True
+SESSION_CACHE_DIR = "sessions"
+SESSION_CACHE_TTL_HOURS = 12
+
+# Product extraction engine: "dom" (rendered cards) or "network" (catalog API responses)
+EXTRACTION_ENGINE = "dom"
+
+# Per-phase timings and round-trip counters of parser runs (disabled hooks are no-ops)
+METRICS_ENABLED = False
+
+# Warm browser pool daemon (python -m parsers.browser_pool): lease endpoint and CDP ports of the browsers
+USE_BROWSER_POOL = False
+BROWSER_POOL_HOST = "127.0.0.1"
+BROWSER_POOL_PORT = 9400
+BROWSER_POOL_CDP_PORT = 9410
+BROWSER_POOL_SIZE = 2
+# A browser is relaunched after this many leases or when its processes use more memory (MB); 0 disables the limit
+BROWSER_POOL_MAX_USES = 50
+BROWSER_POOL_MAX_RSS_MB = 1500
+# Seconds between health checks of idle browsers
+BROWSER_POOL_HEALTH_INTERVAL = 30
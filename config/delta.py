@@ -0,0 +1,2 @@
+# Delta crawl: stop paging after this many consecutive pages matching the previous snapshot (0: parse all pages)
+DELTA_UNCHANGED_PAGES = 3
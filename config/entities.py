@@ -0,0 +1,5 @@
+# Cross-store entity resolution: name shingle Jaccard threshold and the product id registry (inside RESULTS_DIR)
+ENTITY_MATCH_THRESHOLD = 0.4
+# Differences allowed between matched names (typos, dropped letters); variants like "Эль" vs "Стаут" stay apart
+ENTITY_MAX_EDITS = 2
+ENTITY_REGISTRY = "product_ids.json"
@@ -0,0 +1,2 @@
+# Connection pool size of the browser-free HTTP engine
+HTTP_POOL_SIZE = 8
@@ -0,0 +1,6 @@
+# Product image download (utils/image_cache.py): content-addressed cache directory, parallel downloads
+FETCH_IMAGES = False
+IMAGE_CACHE_DIR = "cache/images"
+IMAGE_FETCH_CONCURRENCY = 8
+# Hours a cached image is used without asking the server whether it changed
+IMAGE_REVALIDATE_HOURS = 24
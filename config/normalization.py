@@ -0,0 +1,9 @@
+# Name normalization cache: in-process LRU size and the on-disk store (keyed by the rule tables hash)
+NAME_CACHE_SIZE = 50_000
+NAME_CACHE_DISK = True
+NAME_CACHE_PATH = "cache/names.sqlite3"
+
+# Pipelined crawl: extracted pages waiting for normalization (browser tabs pause when full)
+PIPELINE_QUEUE_SIZE = 8
+# Name normalization processes; 0 normalizes in the event loop
+NORMALIZE_WORKERS = 0
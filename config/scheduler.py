@@ -0,0 +1,16 @@
+# Refresh scheduler: a (store, category) job is due once the age of its data exceeds
+# SCHEDULER_REFRESH_HOURS / (1 + SCHEDULER_CHANGE_WEIGHT * share of products changed in its recent runs)
+SCHEDULER_REFRESH_HOURS = 24
+SCHEDULER_CHANGE_WEIGHT = 4
+# Jobs running at once: in total and against one host
+SCHEDULER_CONCURRENCY = 3
+SCHEDULER_HOST_CONCURRENCY = 2
+# Page and API requests per second to one host across all running jobs
+SCHEDULER_REQUESTS_PER_SECOND = 5
+# Retry delay of a failed job (seconds): doubles with each consecutive failure up to the maximum
+SCHEDULER_RETRY_BASE = 60
+SCHEDULER_RETRY_MAX = 3600
+# Job queue state (inside RESULTS_DIR)
+SCHEDULER_STATE = "scheduler_state.json"
+# After this many delta files on top of the full results of a store its merged snapshot is saved as a full results file
+SCHEDULER_SNAPSHOT_EVERY = 10
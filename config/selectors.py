@@ -7,7 +7,8 @@ SELECTORS = {
     "confirm_button": "button.p-element.p-button.p-button-primary.large.w-100.p-component.ng-star-inserted",
     "catalog_button": "lu-catalog-button.ng-star-inserted",
     "alcohol_category": "a[href^='https://lenta.com/catalog/alko']",
-    "beer_category": "a[href^='https://lenta.com/catalog/pivo']",
+    "category_chips": "div[class='product-categories-chips ng-star-inserted']",
+    "category_link": "a[href^='https://lenta.com/catalog/']",
     "product_grid": "div.lu-grid",
     "product_item": "div[class='lu-grid__item ng-star-inserted']",
     "product_name": "span.card-name_content",
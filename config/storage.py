@@ -0,0 +1,2 @@
+# SQLite database of ingested results (inside RESULTS_DIR)
+RESULTS_DB = "results.sqlite3"
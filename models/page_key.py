@@ -0,0 +1,22 @@
+from typing import NamedTuple, Sequence, Union
+
+# Категория страниц, записанных одним номером: тогда обходилось только пиво
+LEGACY_CATEGORY = "beer"
+
+class PageKey(NamedTuple):
+    """Run-wide catalog page key used by the pipeline, the sink and the delta tracker:
+    category name and page number within the category. The name, unlike the position
+    in the crawl, does not depend on the categories selected for the run"""
+    category: str
+    page: int
+
+    def __str__(self) -> str:
+        return f"{self.category}:{self.page}"
+
+    @classmethod
+    def parse(cls, value: Union[Sequence[Union[str, int]], int]) -> "PageKey":
+        """Key from its JSON form [category, page]; plain page numbers of older files belong to the beer catalog"""
+        if isinstance(value, int):
+            return cls(LEGACY_CATEGORY, value)
+        category, page = value
+        return cls(category, page)
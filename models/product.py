@@ -1,7 +1,59 @@
-from typing import Optional
-from dataclasses import dataclass
+from typing import Optional, Dict, Any
+from dataclasses import dataclass, field
+import json
+from json.encoder import encode_basestring
+import sys
+import re
 
-@dataclass
+_PRICE_RE = re.compile(r'(\d+)(?:[,.](\d{1,2}))?')
+_VOLUME_RE = re.compile(r'(\d+(?:[,.]\d+)?)\s*(мл|ml|л|l)(?![а-яa-z])', re.IGNORECASE)
+
+EMPTY_IMAGE = "https://sitecdn.api.lenta.com/assets-ng/empty-image.svg"
+PRICE_NOT_SPECIFIED = "Price not specified"
+
+def format_price(kopecks: int) -> str:
+    """Format price in kopecks the way it is shown on the site"""
+    return f"{kopecks // 100},{kopecks % 100:02d} ₽"
+
+def parse_price(value: Optional[str]) -> Optional[int]:
+    """Parse displayed price ("123,45 ₽") into kopecks"""
+    if not value:
+        return None
+    # Разделитель разрядов бывает любым пробелом Unicode: U+00A0, U+202F, U+2009...
+    match = _PRICE_RE.search("".join(value.split()))
+    if not match:
+        return None
+    rubles, kopecks = match.groups()
+    return int(rubles) * 100 + int((kopecks or "0").ljust(2, "0"))
+
+def parse_volume(value: Optional[str]) -> Optional[int]:
+    """Parse displayed volume ("0,45 л", "450 мл") into millilitres"""
+    if not value:
+        return None
+    match = _VOLUME_RE.search(value)
+    if not match:
+        return None
+    amount = float(match.group(1).replace(",", "."))
+    return round(amount if match.group(2).lower() in ("мл", "ml") else amount * 1000)
+
+# Повторяющиеся значения (тип, цвет, упаковка...) хранятся в одном экземпляре
+_INTERNED_FIELDS = ("type", "color", "filtering", "pasteurization", "sweetness", "packaging", "clarification", "volume", "category")
+
+_json_cache: Dict[tuple, str] = {}
+
+def _json_value(value: Any) -> str:
+    """JSON encoding of a repeated value, cached"""
+    # Ключ с типом: True, 1 и 1.0 равны как ключи словаря, но кодируются по-разному
+    key = (type(value), value)
+    try:
+        return _json_cache[key]
+    except KeyError:
+        encoded = json.dumps(value, ensure_ascii=False)
+        if len(_json_cache) < 10000:
+            _json_cache[key] = encoded
+        return encoded
+
+@dataclass(slots=True)
 class Product:
     name: str
     type: str
@@ -14,8 +66,52 @@ class Product:
     packaging: str = "с/б"
     clarification: Optional[str] = None
     volume: str = "0.33L"
-    price: str = "0.00 ₽"
-    image: str = "https://sitecdn.api.lenta.com/assets-ng/empty-image.svg"
+    price_kopecks: Optional[int] = 0
+    image: Optional[str] = EMPTY_IMAGE
+    # Путь к загруженной копии изображения (utils/image_cache.py)
+    image_path: Optional[str] = None
+    # Категория каталога, в которой найден товар (config.browser.CATALOG_CATEGORIES)
+    category: Optional[str] = None
+    # Идентификатор товара, общий для всех магазинов (analysis/entity_resolution.py)
+    product_id: Optional[str] = None
+    volume_ml: Optional[int] = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        for name in _INTERNED_FIELDS:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
+        self.volume_ml = parse_volume(self.volume)
+
+    @property
+    def price(self) -> str:
+        """Displayed price"""
+        return format_price(self.price_kopecks) if self.price_kopecks is not None else PRICE_NOT_SPECIFIED
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Product":
+        """Create product from a serialized record (also the layout with a displayed price only)"""
+        price_kopecks = data.get("price_kopecks")
+        if price_kopecks is None:
+            price_kopecks = parse_price(data.get("price"))
+        return cls(
+            name=data["name"],
+            type=data["type"],
+            color=data.get("color"),
+            is_alcoholic=data.get("is_alcoholic", True),
+            filtering=data.get("filtering"),
+            pasteurization=data.get("pasteurization"),
+            alcohol_percentage=data.get("alcohol_percentage"),
+            sweetness=data.get("sweetness"),
+            packaging=data.get("packaging", "с/б"),
+            clarification=data.get("clarification"),
+            volume=data.get("volume", "0.33L"),
+            price_kopecks=price_kopecks,
+            image=data.get("image"),
+            image_path=data.get("image_path"),
+            category=data.get("category"),
+            product_id=data.get("product_id")
+        )
 
     def to_dict(self) -> dict:
         """Convert product to dictionary"""
@@ -31,6 +127,35 @@ class Product:
             "packaging": self.packaging,
             "clarification": self.clarification,
             "volume": self.volume,
+            "volume_ml": self.volume_ml,
             "price": self.price,
-            "image": self.image
-        } 
\ No newline at end of file
+            "price_kopecks": self.price_kopecks,
+            "image": self.image,
+            "image_path": self.image_path,
+            "category": self.category,
+            "product_id": self.product_id
+        }
+
+    def to_json(self) -> str:
+        """Serialize product to a JSON object (same layout as to_dict) without building a dict"""
+        return "".join((
+            '{"name": ', encode_basestring(self.name),
+            ', "type": ', _json_value(self.type),
+            ', "color": ', _json_value(self.color),
+            ', "is_alcoholic": ', _json_value(self.is_alcoholic),
+            ', "filtering": ', _json_value(self.filtering),
+            ', "pasteurization": ', _json_value(self.pasteurization),
+            ', "alcohol_percentage": ', _json_value(self.alcohol_percentage),
+            ', "sweetness": ', _json_value(self.sweetness),
+            ', "packaging": ', _json_value(self.packaging),
+            ', "clarification": ', _json_value(self.clarification),
+            ', "volume": ', _json_value(self.volume),
+            ', "volume_ml": ', _json_value(self.volume_ml),
+            ', "price": ', _json_value(self.price) if self.price_kopecks is None else '"' + format_price(self.price_kopecks) + '"',
+            ', "price_kopecks": ', _json_value(self.price_kopecks),
+            ', "image": ', encode_basestring(self.image) if self.image is not None else "null",
+            ', "image_path": ', encode_basestring(self.image_path) if self.image_path is not None else "null",
+            ', "category": ', _json_value(self.category),
+            ', "product_id": ', encode_basestring(self.product_id) if self.product_id is not None else "null",
+            '}'
+        ))
@@ -0,0 +1,81 @@
+from typing import List, Dict, Optional, Any
+import math
+
+from config.api import API_FIELDS, API_PRICE_DIVISOR
+
+def _get_path(obj: Any, path: str) -> Any:
+    """Resolve dot separated path in decoded JSON"""
+    for key in path.split("."):
+        if isinstance(obj, dict):
+            obj = obj.get(key)
+        elif isinstance(obj, list) and key.isdigit() and int(key) < len(obj):
+            obj = obj[int(key)]
+        else:
+            return None
+        if obj is None:
+            return None
+    return obj
+
+def _get_field(obj: Any, field: str) -> Any:
+    for path in API_FIELDS[field]:
+        value = _get_path(obj, path)
+        if value is not None:
+            return value
+    return None
+
+def _to_kopecks(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.replace(" ", "").replace(",", ".")
+    try:
+        return round(float(value) * 100 / API_PRICE_DIVISOR)
+    except (TypeError, ValueError):
+        return None
+
+def _to_count(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    try:
+        count = int(value)
+    except (TypeError, ValueError):
+        return None
+    return count if count >= 0 else None
+
+def decode_page_count(payload: Any, page_items: int) -> Optional[int]:
+    """Number of catalog pages from the pagination fields of the response; page_items is the size of the page
+    used when the response has the total without the page size. None when the response has no pagination"""
+    if not isinstance(payload, dict):
+        return None
+    pages = _to_count(_get_field(payload, "pages"))
+    if pages:
+        return pages
+    total = _to_count(_get_field(payload, "total"))
+    if total is None:
+        return None
+    limit = _to_count(_get_field(payload, "limit")) or page_items
+    return max(1, math.ceil(total / limit)) if limit else 1
+
+def decode_catalog_payload(payload: Any) -> List[Dict[str, Any]]:
+    """Decode catalog API response into raw card records"""
+    items = _get_field(payload, "items") if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        return []
+
+    records = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        name = _get_field(item, "name")
+        if not name:
+            continue
+        volume = _get_field(item, "volume")
+        image = _get_field(item, "image")
+        records.append({
+            "name": str(name),
+            "volume": str(volume) if volume is not None else "Not specified",
+            "price": "Not specified",
+            "price_value": _to_kopecks(_get_field(item, "price")),
+            "image": image if isinstance(image, str) else None
+        })
+    return records
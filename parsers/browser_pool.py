@@ -0,0 +1,334 @@
+"""Warm browser pool: a daemon keeps pre-launched Chromium instances and leases whole browsers over CDP.
+A lease hands out a warm browser, not a ready context: the storage_state of a run (store cookies) belongs to the
+parser process and is only known once it starts, and a context created by the daemon's Playwright client cannot
+be adopted with its state by another client. The client opens a fresh context in the leased browser instead;
+creating a context takes milliseconds, the Chromium launch is what the pool saves."""
+from playwright.async_api import async_playwright, Playwright, Browser, BrowserContext, Error as PlaywrightError
+from typing import List, Dict, Optional, Set, Any
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import time
+import os
+
+from config.browser import (
+    BROWSER_POOL_HOST,
+    BROWSER_POOL_PORT,
+    BROWSER_POOL_CDP_PORT,
+    BROWSER_POOL_SIZE,
+    BROWSER_POOL_MAX_USES,
+    BROWSER_POOL_MAX_RSS_MB,
+    BROWSER_POOL_HEALTH_INTERVAL,
+    TIMEOUT
+)
+from utils.logging import setup_logging
+
+def process_tree_rss(port: int) -> Optional[int]:
+    """Resident memory (bytes) of the Chromium listening on the debugging port with all its child processes.
+    Linux only (/proc); None elsewhere or when the process is not found."""
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+    flag = f"--remote-debugging-port={port}".encode()
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    parents: Dict[int, int] = {}
+    rss: Dict[int, int] = {}
+    flagged = set()
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            cmdline = (entry / "cmdline").read_bytes()
+        except OSError:
+            continue
+        pid = int(entry.name)
+        # Имя процесса в скобках может содержать пробелы, поля считаются после него
+        fields = stat.rsplit(")", 1)[1].split()
+        parents[pid] = int(fields[1])
+        rss[pid] = int(fields[21]) * page_size
+        if flag in cmdline:
+            flagged.add(pid)
+    roots = [pid for pid in flagged if parents.get(pid) not in flagged]
+    if not roots:
+        return None
+    children: Dict[int, List[int]] = {}
+    for pid, parent in parents.items():
+        children.setdefault(parent, []).append(pid)
+    total, stack = 0, list(roots)
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, ()))
+    return total
+
+class PooledBrowser:
+    """Pre-launched Chromium reachable over CDP on its own local port"""
+
+    def __init__(self, slot: int, port: int, browser: Browser) -> None:
+        self.slot = slot
+        self.port = port
+        self.browser = browser
+        self.uses = 0
+        self.launched_at = time.monotonic()
+        # Контексты прошлой аренды не удалось закрыть - браузер перезапускается
+        self.dirty = False
+
+    @property
+    def cdp_url(self) -> str:
+        return f"http://{BROWSER_POOL_HOST}:{self.port}"
+
+class BrowserPool:
+    """Long-lived pool of warm browsers leased to parser processes over a local TCP endpoint.
+    A lease lasts while the client keeps its connection open, so crashed clients release their browser."""
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_uses: int = BROWSER_POOL_MAX_USES,
+        max_rss_mb: int = BROWSER_POOL_MAX_RSS_MB,
+        health_interval: float = BROWSER_POOL_HEALTH_INTERVAL,
+        host: str = BROWSER_POOL_HOST,
+        port: int = BROWSER_POOL_PORT,
+        cdp_port: int = BROWSER_POOL_CDP_PORT
+    ) -> None:
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.health_interval = health_interval
+        self.host = host
+        self.port = port
+        self.cdp_port = cdp_port
+        self.idle: List[PooledBrowser] = []
+        self._leased_slots: Set[int] = set()
+        self.leases = 0
+        self.recycled = 0
+        self._playwright: Optional[Playwright] = None
+        self._available = asyncio.Condition()
+        self.logger = setup_logging("browser_pool", role="browser_pool")
+
+    async def _launch(self, slot: int) -> PooledBrowser:
+        # Импорт здесь: lenta_parser сам импортирует этот модуль
+        from parsers.lenta_parser import browser_launch_settings
+
+        settings = browser_launch_settings()
+        port = self.cdp_port + slot
+        settings["args"] = [*settings["args"], f"--remote-debugging-port={port}", f"--remote-debugging-address={self.host}"]
+        browser = await self._playwright.chromium.launch(**settings)
+        self.logger.info("Browser %d launched (CDP port %d)", slot, port)
+        return PooledBrowser(slot, port, browser)
+
+    async def _close(self, pooled: PooledBrowser) -> None:
+        try:
+            await asyncio.wait_for(pooled.browser.close(), TIMEOUT / 1000)
+        except (PlaywrightError, asyncio.TimeoutError) as e:
+            self.logger.warning("Browser %d did not close cleanly: %s", pooled.slot, e)
+
+    async def _recycle(self, pooled: PooledBrowser, reason: str) -> PooledBrowser:
+        """Replace the browser with a fresh one on the same slot"""
+        self.logger.info("Recycling browser %d after %d uses: %s", pooled.slot, pooled.uses, reason)
+        self.recycled += 1
+        await self._close(pooled)
+        return await self._launch(pooled.slot)
+
+    def _recycle_reason(self, pooled: PooledBrowser) -> Optional[str]:
+        if not pooled.browser.is_connected():
+            return "disconnected"
+        if pooled.dirty:
+            return "contexts of the previous lease are left"
+        if self.max_uses and pooled.uses >= self.max_uses:
+            return "use limit"
+        rss = process_tree_rss(pooled.port)
+        if self.max_rss and rss is not None and rss > self.max_rss:
+            return f"memory {rss / 1024 / 1024:.0f} MB"
+        return None
+
+    async def _healthy(self, pooled: PooledBrowser) -> bool:
+        """Probe: the browser still creates and closes a context"""
+        try:
+            context = await asyncio.wait_for(pooled.browser.new_context(), TIMEOUT / 1000)
+            await context.close()
+            return True
+        except (PlaywrightError, asyncio.TimeoutError) as e:
+            self.logger.warning("Browser %d failed health check: %s", pooled.slot, e)
+            return False
+
+    async def _reset(self, pooled: PooledBrowser) -> None:
+        """Dispose browser contexts left by the lease (a crashed client does not close them) and default context cookies"""
+        try:
+            session = await pooled.browser.new_browser_cdp_session()
+            try:
+                contexts = await session.send("Target.getBrowserContexts")
+                for context_id in contexts.get("browserContextIds", []):
+                    await session.send("Target.disposeBrowserContext", {"browserContextId": context_id})
+                await session.send("Storage.clearCookies")
+            finally:
+                await session.detach()
+            if contexts.get("browserContextIds"):
+                self.logger.info("Disposed %d contexts left on browser %d", len(contexts["browserContextIds"]), pooled.slot)
+        except PlaywrightError as e:
+            self.logger.warning("Browser %d was not reset: %s", pooled.slot, e)
+            pooled.dirty = True
+
+    async def _put_back(self, pooled: PooledBrowser) -> None:
+        reason = self._recycle_reason(pooled)
+        if reason:
+            try:
+                pooled = await self._recycle(pooled, reason)
+            except PlaywrightError as e:
+                # Слот будет восстановлен следующей проверкой
+                self.logger.error("Failed to relaunch browser %d: %s", pooled.slot, e)
+                return
+        async with self._available:
+            self.idle.append(pooled)
+            self._available.notify()
+
+    async def acquire(self) -> PooledBrowser:
+        async with self._available:
+            await self._available.wait_for(lambda: self.idle)
+            pooled = self.idle.pop(0)
+        pooled.uses += 1
+        self.leases += 1
+        return pooled
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            async with self._available:
+                checked, self.idle = self.idle, []
+            # Недостающие слоты (неудачный перезапуск) запускаются заново
+            missing = set(range(self.size)) - {pooled.slot for pooled in checked} - self._leased_slots
+            for slot in missing:
+                try:
+                    await self._put_back(await self._launch(slot))
+                except PlaywrightError as e:
+                    self.logger.error("Failed to launch browser %d: %s", slot, e)
+            for pooled in checked:
+                if not await self._healthy(pooled):
+                    # Отключенный браузер будет заменен в _put_back
+                    await self._close(pooled)
+                await self._put_back(pooled)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """One JSON request per line: {"op": "lease"} holds a browser until the connection closes, {"op": "stats"}"""
+        pooled: Optional[PooledBrowser] = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = json.loads(line)
+                if request.get("op") == "lease" and pooled is None:
+                    pooled = await self.acquire()
+                    self._leased_slots.add(pooled.slot)
+                    response: Dict[str, Any] = {"cdp": pooled.cdp_url, "slot": pooled.slot, "uses": pooled.uses}
+                elif request.get("op") == "stats":
+                    response = self.stats
+                else:
+                    response = {"error": f"unsupported request: {request}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError) as e:
+            self.logger.warning("Pool client error: %s", e)
+        finally:
+            if pooled is not None:
+                # Слот остается занятым до возврата, иначе проверка сочтет его пропавшим
+                await self._reset(pooled)
+                await self._put_back(pooled)
+                self._leased_slots.discard(pooled.slot)
+            writer.close()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": len(self.idle),
+            "leased": len(self._leased_slots),
+            "leases": self.leases,
+            "recycled": self.recycled,
+        }
+
+    async def serve(self) -> None:
+        """Launch the browsers and serve leases until cancelled"""
+        async with async_playwright() as p:
+            self._playwright = p
+            started = time.perf_counter()
+            self.idle = list(await asyncio.gather(*(self._launch(slot) for slot in range(self.size))))
+            self.logger.info(f"{self.size} browsers ready in {time.perf_counter() - started:.1f} sec")
+            server = await asyncio.start_server(self._handle_client, self.host, self.port)
+            health = asyncio.create_task(self._health_loop())
+            self.logger.info(f"Browser pool listening on {self.host}:{self.port}")
+            try:
+                async with server:
+                    await server.serve_forever()
+            finally:
+                health.cancel()
+                for pooled in self.idle:
+                    await self._close(pooled)
+
+class BrowserLease:
+    """Client side of the pool: connects to a leased warm browser over CDP.
+    Contexts are opened through the lease and closed on release, so cookies and the selected store stay with the lease."""
+
+    def __init__(self, host: str = BROWSER_POOL_HOST, port: int = BROWSER_POOL_PORT) -> None:
+        self.host = host
+        self.port = port
+        self.slot: Optional[int] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._browser: Optional[Browser] = None
+        self._contexts: List[BrowserContext] = []
+
+    async def acquire(self, playwright: Playwright, timeout: float = TIMEOUT / 1000) -> Browser:
+        """Wait for a free pool browser and connect to it; raises OSError when the pool is not running"""
+        reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), timeout)
+        try:
+            self._writer.write(b'{"op": "lease"}\n')
+            await self._writer.drain()
+            response = json.loads(await asyncio.wait_for(reader.readline(), timeout) or b"{}")
+            if "cdp" not in response:
+                raise ConnectionError(f"Browser pool refused the lease: {response}")
+            self.slot = response["slot"]
+            self._browser = await playwright.chromium.connect_over_cdp(response["cdp"], timeout=timeout * 1000)
+            return self._browser
+        except BaseException:
+            await self.release()
+            raise
+
+    async def new_context(self, **settings: Any) -> BrowserContext:
+        """New isolated context in the leased browser, closed on release"""
+        context = await self._browser.new_context(**settings)
+        self._contexts.append(context)
+        return context
+
+    async def release(self) -> None:
+        """Close the contexts of the lease, disconnect from the browser and return it to the pool"""
+        for context in self._contexts:
+            try:
+                await context.close()
+            except PlaywrightError:
+                pass
+        self._contexts = []
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except PlaywrightError:
+                pass
+            self._browser = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Keep warm browsers for parser runs")
+    arg_parser.add_argument("-n", "--size", type=int, default=BROWSER_POOL_SIZE, help="number of browsers")
+    arg_parser.add_argument("--max-uses", type=int, default=BROWSER_POOL_MAX_USES, help="leases before a browser is recycled (0: no limit)")
+    arg_parser.add_argument("--max-rss-mb", type=int, default=BROWSER_POOL_MAX_RSS_MB, help="memory limit of a browser process tree (0: no limit)")
+    arg_parser.add_argument("--port", type=int, default=BROWSER_POOL_PORT, help="lease endpoint port")
+    args = arg_parser.parse_args()
+
+    pool = BrowserPool(args.size, args.max_uses, args.max_rss_mb, port=args.port)
+    try:
+        asyncio.run(pool.serve())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,53 @@
+from playwright.async_api import Page
+from typing import List, Dict, Optional, Iterable
+from dataclasses import dataclass
+from urllib.parse import urlsplit, urljoin
+
+from config.browser import CATALOG_CATEGORIES
+from models.page_key import PageKey
+
+def is_url(spec: str) -> bool:
+    """Check whether the category spec is a catalog URL rather than a slug"""
+    return "://" in spec
+
+def match_category_links(hrefs: Iterable[str], slugs: Iterable[str], base_url: Optional[str] = None) -> Dict[str, str]:
+    """Catalog menu links of the slugs: the first link whose path after /catalog/ starts with the slug.
+    With base_url the link path is resolved against it"""
+    paths = []
+    for href in hrefs:
+        parts = urlsplit(href)
+        if "/catalog/" in parts.path:
+            url = urljoin(base_url, parts._replace(scheme="", netloc="").geturl()) if base_url else href
+            paths.append((parts.path.split("/catalog/", 1)[1], url))
+    links = {}
+    for slug in slugs:
+        for rest, href in paths:
+            if rest.startswith(slug):
+                links[slug] = href
+                break
+    return links
+
+@dataclass
+class CategoryCrawl:
+    """State of one catalog category crawled in the store session"""
+    name: str
+    spec: str
+    index: int
+    url: Optional[str] = None
+    page: Optional[Page] = None
+    total_pages: int = 0
+
+    def key(self, page_number: int) -> PageKey:
+        """Run-wide key of the category page"""
+        return PageKey(self.name, page_number)
+
+def check_categories(names: Optional[List[str]]) -> List[str]:
+    """Category names of the run (all configured by default)"""
+    names = list(names or CATALOG_CATEGORIES)
+    unknown = [name for name in names if name not in CATALOG_CATEGORIES]
+    if unknown:
+        raise ValueError(f"Unknown categories: {', '.join(unknown)}")
+    return names
+
+def category_crawls(names: List[str]) -> List[CategoryCrawl]:
+    return [CategoryCrawl(name, CATALOG_CATEGORIES[name], index) for index, name in enumerate(names)]
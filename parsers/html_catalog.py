@@ -0,0 +1,213 @@
+from html.parser import HTMLParser
+from typing import List, Dict, Optional, Tuple, Any
+import json
+import re
+
+from config.selectors import SELECTORS
+from parsers.api_payload import decode_catalog_payload, decode_page_count
+
+VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr"
+})
+
+_SELECTOR_RE = re.compile(r"^(?P<tag>[\w-]+)?(?P<classes>(?:\.[\w-]+)*)(?P<attrs>(?:\[[^\]]+\])*)$")
+_ATTR_RE = re.compile(r"\[([\w-]+)(\^?=)'([^']*)'\]")
+
+class SimpleSelector:
+    """Compound CSS selector: tag, classes and [attr='v'] / [attr^='v'] conditions"""
+
+    def __init__(self, selector: str) -> None:
+        match = _SELECTOR_RE.match(selector.strip())
+        if not match:
+            raise ValueError(f"Unsupported selector: {selector}")
+        self.tag = match.group("tag")
+        self.classes = frozenset(c for c in match.group("classes").split(".") if c)
+        self.attrs = _ATTR_RE.findall(match.group("attrs"))
+
+    def matches(self, tag: str, attrs: Dict[str, str]) -> bool:
+        if self.tag and self.tag != tag:
+            return False
+        if self.classes and not self.classes.issubset(attrs.get("class", "").split()):
+            return False
+        for name, op, value in self.attrs:
+            actual = attrs.get(name)
+            if actual is None:
+                return False
+            if op == "=" and actual != value:
+                return False
+            if op == "^=" and not actual.startswith(value):
+                return False
+        return True
+
+def compile_selector(selector: str) -> List[SimpleSelector]:
+    """Compile comma separated selector list"""
+    return [SimpleSelector(part) for part in selector.split(",")]
+
+def _matches(selectors: List[SimpleSelector], tag: str, attrs: Dict[str, str]) -> bool:
+    return any(selector.matches(tag, attrs) for selector in selectors)
+
+_TEXT_FIELDS = ("name", "volume", "price")
+
+class CatalogHTMLParser(HTMLParser):
+    """Streaming extractor of product cards and page count from catalog HTML"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._item = compile_selector(SELECTORS["product_item"])
+        self._fields = {
+            "name": compile_selector(SELECTORS["product_name"]),
+            "volume": compile_selector(SELECTORS["product_volume"]),
+            "price": compile_selector(SELECTORS["product_price"]),
+        }
+        self._image = compile_selector(SELECTORS["product_image"])
+        self._pagination = compile_selector(SELECTORS["pagination_list"])
+
+        self.records: List[Dict[str, Optional[str]]] = []
+        self.json_blocks: List[str] = []
+        self.page_items: List[str] = []
+        self._stack: List[str] = []
+        self._card: Optional[Dict[str, Any]] = None
+        self._card_depth = 0
+        self._field: Optional[str] = None
+        self._field_depth = 0
+        self._text: List[str] = []
+        self._pagination_depth = 0
+        self._page_item_depth = 0
+        self._page_text: List[str] = []
+        self._in_json = False
+        self._json_text: List[str] = []
+
+    def handle_starttag(self, tag: str, attr_list: List[Tuple[str, Optional[str]]]) -> None:
+        attrs = {name: value or "" for name, value in attr_list}
+        depth = len(self._stack) + 1
+
+        if self._card is None:
+            if _matches(self._item, tag, attrs):
+                self._card = {"name": None, "volume": None, "price": None, "image": None}
+                self._card_depth = depth
+        else:
+            if tag == "img" and self._card["image"] is None and _matches(self._image, tag, attrs):
+                self._card["image"] = attrs.get("src")
+            elif self._field is None and tag not in VOID_ELEMENTS:
+                for field in _TEXT_FIELDS:
+                    if self._card[field] is None and _matches(self._fields[field], tag, attrs):
+                        self._field = field
+                        self._field_depth = depth
+                        self._text = []
+                        break
+
+        if not self._pagination_depth and _matches(self._pagination, tag, attrs):
+            self._pagination_depth = depth
+            self.page_items = []
+        elif self._pagination_depth and tag == "li" and not self._page_item_depth:
+            self._page_item_depth = depth
+            self._page_text = []
+
+        if tag == "script" and attrs.get("type") == "application/json":
+            self._in_json = True
+            self._json_text = []
+
+        if tag not in VOID_ELEMENTS:
+            self._stack.append(tag)
+
+    def handle_startendtag(self, tag: str, attr_list: List[Tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attr_list)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "script" and self._in_json:
+            self.json_blocks.append("".join(self._json_text))
+            self._in_json = False
+        if tag not in self._stack:
+            return
+        # Закрываем незакрытые вложенные элементы вместе с текущим
+        while self._stack:
+            depth = len(self._stack)
+            open_tag = self._stack.pop()
+            self._close(depth)
+            if open_tag == tag:
+                break
+
+    def _close(self, depth: int) -> None:
+        if self._field is not None and depth == self._field_depth:
+            self._card[self._field] = " ".join("".join(self._text).split())
+            self._field = None
+        if self._card is not None and depth == self._card_depth:
+            self.records.append({
+                "name": self._card["name"] or "Not specified",
+                "volume": self._card["volume"] or "Not specified",
+                "price": self._card["price"] or "Not specified",
+                "image": self._card["image"]
+            })
+            self._card = None
+        if self._page_item_depth and depth == self._page_item_depth:
+            self.page_items.append(" ".join("".join(self._page_text).split()))
+            self._page_item_depth = 0
+        if self._pagination_depth and depth == self._pagination_depth:
+            self._pagination_depth = 0
+
+    def handle_data(self, data: str) -> None:
+        if self._in_json:
+            self._json_text.append(data)
+        elif self._field is not None:
+            self._text.append(data)
+        if self._page_item_depth:
+            self._page_text.append(data)
+
+def _find_catalog_records(obj: Any, max_depth: int = 8) -> Tuple[List[Dict[str, Any]], Any]:
+    """Search decoded JSON state for the first catalog item list: (records, object holding the list)"""
+    if max_depth < 0:
+        return [], None
+    if isinstance(obj, dict):
+        records = decode_catalog_payload(obj)
+        if records:
+            return records, obj
+        children = obj.values()
+    elif isinstance(obj, list):
+        children = obj
+    else:
+        return [], None
+    for child in children:
+        records, holder = _find_catalog_records(child, max_depth - 1)
+        if records:
+            return records, holder
+    return [], None
+
+def parse_catalog_json_page(text: str) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Decode catalog records and the number of pages (None if not given) from an API response or embedded JSON state"""
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return [], None
+    records, holder = _find_catalog_records(payload)
+    # Пагинация лежит рядом со списком товаров или в корне ответа
+    pages = decode_page_count(holder, len(records))
+    if pages is None and holder is not payload:
+        pages = decode_page_count(payload, len(records))
+    return records, pages
+
+def parse_catalog_json(text: str) -> List[Dict[str, Any]]:
+    """Decode catalog records from an API response or embedded JSON state"""
+    return parse_catalog_json_page(text)[0]
+
+def parse_catalog_html(html: str) -> Tuple[List[Dict[str, Any]], int]:
+    """Extract product card records and number of pages from catalog page HTML"""
+    parser = CatalogHTMLParser()
+    parser.feed(html)
+    parser.close()
+
+    records = parser.records
+    json_pages = None
+    if not records:
+        # Страница без отрендеренных карточек: ищем товары во встроенном состоянии приложения
+        for block in parser.json_blocks:
+            records, json_pages = parse_catalog_json_page(block)
+            if records:
+                break
+
+    last_page = parser.page_items[-1] if parser.page_items else ""
+    if last_page.isdigit():
+        return records, int(last_page)
+    return records, json_pages or 1
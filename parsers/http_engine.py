@@ -0,0 +1,215 @@
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import time
+import sys
+
+import aiohttp
+
+from config.browser import (
+    CONTEXT_SETTINGS,
+    USER_AGENT,
+    TIMEOUT,
+    PAGE_CONCURRENCY,
+    METRICS_ENABLED
+)
+from config.http import HTTP_POOL_SIZE
+from parsers.lenta_parser import AsyncLentaProductParse
+from parsers.html_catalog import parse_catalog_html, parse_catalog_json_page
+from parsers.categories import CategoryCrawl, category_crawls, is_url
+from utils.result_writer import NDJSONResultSink
+from utils.delta import DeltaTracker
+from models.product import Product
+from models.page_key import PageKey
+
+def cookie_header(storage_state: Dict, url: str) -> str:
+    """Build Cookie header from Playwright storage state cookies matching the URL host"""
+    host = urlsplit(url).hostname or ""
+    cookies = []
+    for cookie in storage_state.get("cookies", []):
+        domain = cookie.get("domain", "").lstrip(".")
+        if host == domain or host.endswith("." + domain):
+            cookies.append(f"{cookie['name']}={cookie['value']}")
+    return "; ".join(cookies)
+
+class HttpLentaProductParse(AsyncLentaProductParse):
+    """Browser-free engine: fetches catalog pages over pooled HTTP using the cached store session.
+    Chromium is only launched to bootstrap the store session when the cache is empty or expired."""
+
+    def __init__(
+        self,
+        address: str,
+        page_concurrency: int = PAGE_CONCURRENCY,
+        catalog_url: Optional[str] = None,
+        sink: Optional[NDJSONResultSink] = None,
+        collect_metrics: bool = METRICS_ENABLED,
+        delta: Optional[DeltaTracker] = None,
+        categories: Optional[List[str]] = None
+    ) -> None:
+        super().__init__(
+            address, page_concurrency=page_concurrency, use_session_cache=True, sink=sink,
+            collect_metrics=collect_metrics, delta=delta, categories=categories
+        )
+        self.catalog_url = catalog_url
+        self._storage_state: Dict = {}
+
+    def _category_urls(self, entry: Dict) -> Dict[str, str]:
+        """Catalog URLs of the run categories known from the configuration and the cached session"""
+        if self.catalog_url:
+            # Явный URL каталога заменяет первую категорию
+            return {self.categories[0]: self.catalog_url}
+        cached = entry.get("category_urls") or {}
+        urls = {}
+        for crawl in category_crawls(self.categories):
+            url = crawl.spec if is_url(crawl.spec) else cached.get(crawl.name)
+            # Записи кеша без адресов категорий хранят только URL первой категории
+            if url is None and crawl.index == 0 and not cached:
+                url = entry.get("catalog_url")
+            if url:
+                urls[crawl.name] = url
+        return urls
+
+    async def _load_session(self) -> Optional[Dict]:
+        """Get cached store session, bootstrapping it in Chromium if needed"""
+        entry = self.session_cache.load_entry(self.address)
+        # Категории, которых нет в магазине, не попадают в кеш: достаточно адреса хотя бы одной
+        if entry and self._category_urls(entry):
+            self.logger.info("Store session loaded from cache")
+            return entry
+        self.logger.info("No cached store session, bootstrapping it in Chromium ->")
+        return await self.bootstrap_session()
+
+    async def _fetch_page(self, session: aiohttp.ClientSession, catalog_url: str, page_number: int) -> Tuple[List[Dict], int]:
+        """Fetch and parse one catalog page: (records, number of pages)"""
+        self.metrics.count("round_trips")
+        url = self._page_url(catalog_url, page_number)
+        with self.metrics.phase("page_fetch"):
+            async with session.get(url, headers={"Cookie": cookie_header(self._storage_state, url)}) as response:
+                response.raise_for_status()
+                body = await response.text()
+        with self.metrics.phase("page_extract"):
+            if "json" in response.headers.get("Content-Type", ""):
+                records, pages = parse_catalog_json_page(body)
+                if pages is None:
+                    self.logger.warning("No pagination in the catalog response of %s, parsing one page", url)
+                return records, pages or 1
+            return parse_catalog_html(body)
+
+    def _page_products(self, records: List[Dict], page_number: PageKey) -> List[Product]:
+        category = page_number.category
+        page_items = []
+        with self.metrics.phase("page_build"):
+            for idx, record in enumerate(records, 1):
+                try:
+                    page_items.append(self._build_product(record, category=category))
+                except Exception as e:
+                    self.metrics.count("card_failures")
+                    self.logger.warning("Error parsing product %d on page %s: %s", idx, page_number, e)
+        self.logger.info("page %s processed. Products: %d ...", page_number, len(page_items))
+        self._page_completed(page_number, page_items)
+        self.metrics.count("pages")
+        self.metrics.count("cards", len(records))
+        return page_items
+
+    async def _crawl_category(self, session: aiohttp.ClientSession, crawl: CategoryCrawl, semaphore: asyncio.Semaphore) -> List[Product]:
+        """Fetch all pages of the category; the semaphore bounds requests of all categories"""
+        try:
+            async with semaphore:
+                records, crawl.total_pages = await self._fetch_page(session, crawl.url, 1)
+        except Exception as e:
+            self.logger.error(f"Error opening category {crawl.name}: {str(e)}")
+            self.failed_pages.append((crawl.key(1), f"category {crawl.name}: {str(e)}"))
+            self.metrics.count("page_failures")
+            return []
+        self.logger.info(f"Category {crawl.name}: {crawl.total_pages} pages")
+        first_page = [] if self._page_done(crawl.key(1)) else self._page_products(records, crawl.key(1))
+        page_numbers = [n for n in range(2, crawl.total_pages + 1) if not self._page_done(crawl.key(n))]
+
+        async def fetch(page_number: int) -> List[Product]:
+            async with semaphore:
+                if self._past_delta_stop(crawl.key(page_number)):
+                    return []
+                records, _ = await self._fetch_page(session, crawl.url, page_number)
+                return self._page_products(records, crawl.key(page_number))
+
+        results = await asyncio.gather(*(fetch(n) for n in page_numbers), return_exceptions=True)
+
+        products = list(first_page)
+        for page_number, result in zip(page_numbers, results):
+            if isinstance(result, BaseException):
+                key = crawl.key(page_number)
+                self.logger.error("Error processing page %s: %s", key, result)
+                self.failed_pages.append((key, str(result)))
+                self.metrics.count("page_failures")
+                continue
+            products.extend(result)
+        return products
+
+    async def parse(self) -> Optional[List[Product]]:
+        """Main parser method"""
+        try:
+            self.logger.info(f"Starting HTTP parser for address: {self.address}")
+            self.start_time = time.perf_counter()
+            self.failed_pages = []
+
+            entry = await self._load_session()
+            if not entry:
+                self.logger.critical("Store session is not available")
+                return None
+            self._storage_state = entry["storage_state"]
+            urls = self._category_urls(entry)
+            crawls = [crawl for crawl in category_crawls(self.categories) if crawl.name in urls]
+            for crawl in crawls:
+                crawl.url = urls[crawl.name]
+            missing = [name for name in self.categories if name not in urls]
+            if missing and not self.catalog_url:
+                self.logger.warning(f"Categories not found in the store catalog: {', '.join(missing)}")
+            if not crawls:
+                raise RuntimeError("None of the catalog categories was found")
+
+            headers = {**CONTEXT_SETTINGS["extra_http_headers"], "User-Agent": USER_AGENT}
+            connector = aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, ttl_dns_cache=300)
+            timeout = aiohttp.ClientTimeout(total=TIMEOUT / 1000)
+            semaphore = asyncio.Semaphore(max(1, self.page_concurrency))
+
+            async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout) as session:
+                results = await asyncio.gather(*(self._crawl_category(session, crawl, semaphore) for crawl in crawls))
+            self.logger.info(
+                "Pages per category: " + ", ".join(f"{crawl.name} {crawl.total_pages}" for crawl in crawls)
+            )
+
+            catalog = [product for products in results for product in products]
+            if self.failed_pages:
+                self.logger.warning(f"Failed pages: {', '.join(str(n) for n, _ in self.failed_pages)}")
+            if self.delta is not None:
+                self._finish_delta()
+            if self.sink is not None:
+                if not self.failed_pages:
+                    self.sink.finish()
+                catalog = self.sink.read_products()
+
+            elapsed_seconds = time.perf_counter() - self.start_time
+            self.metrics.observe("run", elapsed_seconds)
+            self.logger.info(
+                f"<- parsing completed! Total products processed: {len(catalog)}, "
+                f"execution time: {elapsed_seconds:.1f} sec"
+            )
+            return catalog
+
+        except Exception as e:
+            self.metrics.count("run_failures")
+            self.logger.critical(f"Critical error: {str(e)}", exc_info=True)
+            return None
+
+if __name__ == "__main__":
+    test_address = sys.argv[1] if len(sys.argv) > 1 else "Москва, Чонгарский бул., 7"
+    parser = HttpLentaProductParse(test_address)
+
+    result = asyncio.run(parser.parse())
+
+    if result:
+        parser._save_results(result, test_address)
+        print(f"Successfully parsed {len(result)} products")
+    else:
+        print("Parser failed")
+        sys.exit(1)
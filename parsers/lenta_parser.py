@@ -1,11 +1,12 @@
-from playwright.async_api import async_playwright, Page
-from typing import List, Dict, Optional
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Error as PlaywrightError
+from typing import List, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from datetime import datetime
 from pathlib import Path
+import argparse
 import asyncio
-import time
 import json
-import re
+import time
 import sys
 
 from config.browser import (
@@ -14,20 +15,192 @@ from config.browser import (
     USER_AGENT,
     BASE_URL,
     TIMEOUT,
-    RESULTS_DIR
+    BATCH_EXTRACTION,
+    PAGE_CONCURRENCY,
+    PAGE_QUERY_PARAM,
+    ROUTING_PROFILE,
+    SESSION_CACHE_ENABLED,
+    EXTRACTION_ENGINE,
+    METRICS_ENABLED,
+    READY_QUIET_MS,
+    READY_TIMEOUT,
+    USE_BROWSER_POOL,
+    CATALOG_CATEGORIES
 )
+from config.normalization import NORMALIZE_WORKERS
+from config.delta import DELTA_UNCHANGED_PAGES
+from config.images import FETCH_IMAGES
 
 from config.selectors import SELECTORS
 from utils.logging import setup_logging
-from utils.name_processor import process_product_name
-from models.product import Product
+from utils.metrics import RunMetrics, NULL_METRICS
+from utils.name_cache import process_product_name, get_name_cache
+from utils.request_router import ResourceRouter, HostRateLimiter
+from utils.session_cache import SessionCache, address_matches
+from utils.result_writer import NDJSONResultSink, safe_filename, results_path, write_results_json, available_compressions
+from parsers.network_capture import CatalogResponseCapture
+from parsers.pipeline import PagePipeline
+from parsers.browser_pool import BrowserLease
+from parsers.categories import CategoryCrawl, category_crawls, check_categories, is_url, match_category_links
+from utils.name_processor import ProcessedName
+from utils.delta import DeltaTracker
+from utils.image_cache import ImageFetcher
+from models.product import Product, parse_price
+from models.page_key import PageKey
+
+# Извлечение всех карточек страницы за один вызов evaluate.
+# visible повторяет правила ElementHandle.is_visible (isElementVisible в Playwright): display: contents
+# проверяется по дочерним узлам, иначе нужны checkVisibility(), visibility: visible и непустой прямоугольник
+CARDS_SCRIPT = """(items, selectors) => {
+    const nonEmpty = (rect) => rect.width > 0 && rect.height > 0;
+    const visible = (el) => {
+        if (!el) return false;
+        const style = getComputedStyle(el);
+        if (style.display === 'contents') {
+            for (let child = el.firstChild; child; child = child.nextSibling) {
+                if (child.nodeType === Node.ELEMENT_NODE && visible(child)) return true;
+                if (child.nodeType === Node.TEXT_NODE) {
+                    const range = document.createRange();
+                    range.selectNode(child);
+                    if (nonEmpty(range.getBoundingClientRect())) return true;
+                }
+            }
+            return false;
+        }
+        if (el.checkVisibility && !el.checkVisibility()) return false;
+        return style.visibility === 'visible' && nonEmpty(el.getBoundingClientRect());
+    };
+    const text = (item, selector) => {
+        const el = item.querySelector(selector);
+        return visible(el) ? el.innerText : 'Not specified';
+    };
+    return items.map((item) => {
+        const image = item.querySelector(selectors.image);
+        return {
+            name: text(item, selectors.name),
+            volume: text(item, selectors.volume),
+            price: text(item, selectors.price),
+            image: visible(image) ? image.getAttribute('src') : null
+        };
+    });
+}"""
+
+# Ожидание готовности страницы каталога: MutationObserver следит за карточками,
+# страница готова, когда все карточки отрисованы и их набор не меняется READY_QUIET_MS
+READY_SCRIPT = """async ({item, name, quietMs, timeoutMs, stale}) => {
+    const start = performance.now();
+    const cards = () => document.querySelectorAll(item);
+    const text = (el) => ((el && el.querySelector(name)) || {}).textContent || '';
+    const signature = (list) => list.length
+        ? `${list.length}|${text(list[0])}|${text(list[list.length - 1])}` : '';
+    const rendered = (list) => Array.prototype.every.call(list, (el) => text(el).trim() !== '');
+    const nextFrame = () => new Promise((resolve) => {
+        requestAnimationFrame(() => resolve());
+        setTimeout(resolve, 50);
+    });
+    // Мгновенная прокрутка по экранам, чтобы сработали ленивые загрузчики карточек
+    const triggerLazyLoad = async () => {
+        const step = window.innerHeight || 1000;
+        for (let top = 0; top < document.body.scrollHeight; top += step) {
+            window.scrollTo({top, behavior: 'instant'});
+            await nextFrame();
+        }
+        window.scrollTo({top: document.body.scrollHeight, behavior: 'instant'});
+    };
+
+    return await new Promise((resolve) => {
+        let state = null;
+        let quiet = null;
+        let scrolledAt = -1;
+        const finish = (ready) => {
+            observer.disconnect();
+            clearTimeout(quiet);
+            clearTimeout(deadline);
+            const list = cards();
+            resolve({ready, cards: list.length, elapsed: performance.now() - start, signature: signature(list)});
+        };
+        const check = () => {
+            const list = cards();
+            const current = signature(list);
+            if (!list.length || current === stale || !rendered(list)) {
+                state = null;
+                clearTimeout(quiet);
+                return;
+            }
+            if (list.length !== scrolledAt) {
+                scrolledAt = list.length;
+                triggerLazyLoad();
+            }
+            if (current !== state) {
+                state = current;
+                clearTimeout(quiet);
+                quiet = setTimeout(() => {
+                    const now = cards();
+                    if (signature(now) === state && rendered(now)) {
+                        finish(true);
+                    } else {
+                        state = null;
+                        check();
+                    }
+                }, quietMs);
+            }
+        };
+        const observer = new MutationObserver(check);
+        observer.observe(document, {childList: true, subtree: true, characterData: true});
+        const deadline = setTimeout(() => finish(false), timeoutMs);
+        check();
+    });
+}"""
+
+def browser_launch_settings() -> Dict:
+    """Chromium launch settings with the parser user agent"""
+    return {**BROWSER_SETTINGS, "args": [*BROWSER_SETTINGS["args"], f"--user-agent={USER_AGENT}"]}
 
 class AsyncLentaProductParse:
-    def __init__(self, address: str) -> None:
+    def __init__(
+        self,
+        address: str,
+        batch_extraction: bool = BATCH_EXTRACTION,
+        page_concurrency: int = PAGE_CONCURRENCY,
+        routing_profile: str = ROUTING_PROFILE,
+        use_session_cache: bool = SESSION_CACHE_ENABLED,
+        engine: str = EXTRACTION_ENGINE,
+        sink: Optional[NDJSONResultSink] = None,
+        collect_metrics: bool = METRICS_ENABLED,
+        normalize_workers: int = NORMALIZE_WORKERS,
+        delta: Optional[DeltaTracker] = None,
+        use_browser_pool: bool = USE_BROWSER_POOL,
+        categories: Optional[List[str]] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        fetch_images: bool = FETCH_IMAGES
+    ) -> None:
+        if engine not in ("dom", "network"):
+            raise ValueError(f"Unknown extraction engine: {engine}")
         self.address = address
+        self.categories = check_categories(categories)
+        self.engine = engine
+        self.sink = sink
+        self.delta = delta
+        self.use_browser_pool = use_browser_pool
+        self.normalize_workers = normalize_workers
+        self._pipeline: Optional[PagePipeline] = None
+        self.fetch_images = fetch_images
+        self._images: Optional[ImageFetcher] = None
+        self._image_tasks: List[asyncio.Future] = []
+        self.metrics = RunMetrics({"address": address}) if collect_metrics else NULL_METRICS
+        self._captures: Dict[Page, CatalogResponseCapture] = {}
+        self._ready_signatures: Dict[Page, str] = {}
+        self.page_ready_times: Dict[PageKey, float] = {}
+        self.batch_extraction = batch_extraction
+        self.page_concurrency = page_concurrency
+        self.routing_profile = routing_profile
+        self.rate_limiter = rate_limiter
+        self.routing_stats: Dict = {}
+        self.session_cache = SessionCache() if use_session_cache else None
+        self.failed_pages: List[Tuple[PageKey, str]] = []
         self.list_products = []
         self.start_time = time.perf_counter()
-        self.logger = setup_logging()
+        self.logger = setup_logging(address)
         self.logger.info("Parser initialized with address: %s", address)
 
     async def __store_selection(self) -> None:
@@ -38,6 +211,7 @@ class AsyncLentaProductParse:
             await self.page.wait_for_selector(SELECTORS["address_block"], timeout=TIMEOUT)
             self.logger.debug("Found address block")
             await self.page.click(SELECTORS["address_block"])
+            self.metrics.count("round_trips", 2)
             self.logger.debug("Clicked address block")
 
             await self.page.wait_for_selector(SELECTORS["address_form"], timeout=TIMEOUT)
@@ -47,227 +221,705 @@ class AsyncLentaProductParse:
                 self.address,
                 delay=30
             )
+            self.metrics.count("round_trips", 2)
             self.logger.debug(f"Entered address: {self.address}")
 
             await self.page.wait_for_selector(SELECTORS["address_item"], timeout=TIMEOUT)
             self.logger.debug("Found address item")
             await self.page.click(SELECTORS["address_item"])
             await self.page.click(SELECTORS["confirm_button"])
+            self.metrics.count("round_trips", 3)
             self.logger.info("Store successfully selected")
 
         except Exception as e:
             self.logger.error(f"Error during store selection: {str(e)}", exc_info=True)
             raise
 
-    async def __go_to_beer_catalog(self) -> None:
-        """Navigate to catalog"""
+    async def __store_is_active(self) -> bool:
+        """Check that the restored session has the requested store selected"""
+        try:
+            await self.page.wait_for_selector(SELECTORS["address_block"], timeout=TIMEOUT)
+            displayed = await self.page.inner_text(SELECTORS["address_block"])
+            self.metrics.count("round_trips", 2)
+            return address_matches(displayed, self.address)
+        except Exception as e:
+            self.logger.warning(f"Error checking restored store: {str(e)}")
+            return False
+
+    async def __open_store(self, browser: Union[Browser, BrowserLease], router: ResourceRouter) -> BrowserContext:
+        """Create a browser context with the store selected, restoring the cached session if possible"""
+        storage_state = self.session_cache.load(self.address) if self.session_cache else None
+        if storage_state:
+            context = await browser.new_context(**CONTEXT_SETTINGS, storage_state=storage_state)
+            await router.install(context)
+            self.page = await context.new_page()
+            with self.metrics.phase("goto"):
+                await self.page.goto(BASE_URL, timeout=TIMEOUT)
+            self.metrics.count("round_trips", 3)
+            with self.metrics.phase("session_restore_check"):
+                restored = await self.__store_is_active()
+            if restored:
+                self.logger.info("Store restored from session cache")
+                return context
+            self.logger.info("Cached session does not match the store, selecting it again")
+            self.session_cache.invalidate(self.address)
+            await context.close()
+
+        context = await browser.new_context(**CONTEXT_SETTINGS)
+        self.logger.debug("Browser context created")
+        await router.install(context)
+
+        self.page = await context.new_page()
+        self.logger.debug("New page created")
+        with self.metrics.phase("goto"):
+            await self.page.goto(BASE_URL, timeout=TIMEOUT)
+        self.metrics.count("round_trips", 3)
+        self.logger.info("Main page loaded")
+
+        with self.metrics.phase("store_selection"):
+            await self.__store_selection()
+        return context
+
+    async def __save_session(self, context: BrowserContext, crawls: List[CategoryCrawl]) -> None:
+        """Save store session and category URLs to the session cache"""
+        if not self.session_cache:
+            return
+        resolved = [crawl for crawl in crawls if crawl.url]
+        try:
+            self.session_cache.save(
+                self.address, await context.storage_state(),
+                catalog_url=resolved[0].url if resolved else None,
+                category_urls={crawl.name: crawl.url for crawl in resolved if not is_url(crawl.spec)}
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to save session cache: {str(e)}")
+
+    async def bootstrap_session(self) -> Optional[Dict]:
+        """Select the store in Chromium and cache its session for browser-free engines"""
+        try:
+            async with async_playwright() as p:
+                async with await p.chromium.launch(**browser_launch_settings()) as browser:
+                    async with await self.__open_store(browser, ResourceRouter(self.routing_profile)) as context:
+                        crawls = category_crawls(self.categories)
+                        await self.__resolve_category_urls(crawls)
+                        await self.__save_session(context, crawls)
+            return self.session_cache.load_entry(self.address) if self.session_cache else None
+        except Exception as e:
+            self.logger.critical(f"Session bootstrap error: {str(e)}", exc_info=True)
+            return None
+
+    async def __open_catalog_menu(self, page: Page) -> None:
+        """Open the alcohol section of the catalog menu"""
         try:
-            self.logger.info("Navigating to product catalog ->")
+            self.logger.info("Opening catalog menu ->")
             
-            await self.page.wait_for_selector(SELECTORS["catalog_button"])
-            await self.page.click("button.p-button.p-button-tertiary.catalog-button")
+            await page.wait_for_selector(SELECTORS["catalog_button"])
+            await page.click("button.p-button.p-button-tertiary.catalog-button")
+            self.metrics.count("round_trips", 2)
             self.logger.debug("main catalog opened ...")
 
-            await self.page.wait_for_selector(SELECTORS["alcohol_category"])
-            await self.page.click(SELECTORS["alcohol_category"])
+            await page.wait_for_selector(SELECTORS["alcohol_category"])
+            await page.click(SELECTORS["alcohol_category"])
+            self.metrics.count("round_trips", 2)
             self.logger.debug("sub-catalog opened ...")
 
-            await self.page.wait_for_selector("div[class='product-categories-chips ng-star-inserted']")
-            await self.page.click(SELECTORS["beer_category"])
-            self.logger.info("<- successfully navigated to product catalog")
+            await page.wait_for_selector(SELECTORS["category_chips"])
+            self.metrics.count("round_trips")
 
         except Exception as e:
-            self.logger.error(f"Catalog navigation error: {str(e)}", exc_info=True)
+            self.logger.error(f"Catalog menu error: {str(e)}", exc_info=True)
             raise
 
+    async def __resolve_category_urls(self, crawls: List[CategoryCrawl]) -> None:
+        """Set category URLs: configured URLs, cached ones, the rest looked up in the catalog menu"""
+        entry = self.session_cache.load_entry(self.address) if self.session_cache else None
+        cached = (entry or {}).get("category_urls") or {}
+        for crawl in crawls:
+            crawl.url = crawl.spec if is_url(crawl.spec) else cached.get(crawl.name)
+        pending = [crawl for crawl in crawls if crawl.url is None]
+        if not pending:
+            return
+
+        await self.__open_catalog_menu(self.page)
+        hrefs = await self.page.eval_on_selector_all(SELECTORS["category_link"], "links => links.map(link => link.href)")
+        self.metrics.count("round_trips")
+        # Путь ссылки на хосте текущей страницы (ссылки меню абсолютные)
+        links = match_category_links(hrefs, [crawl.spec for crawl in pending], self.page.url)
+        for crawl in pending:
+            crawl.url = links.get(crawl.spec)
+            if crawl.url is None:
+                self.logger.warning(f"Category {crawl.name} ({crawl.spec}) not found in the catalog menu")
+
+    async def __open_category(self, context: BrowserContext, crawl: CategoryCrawl) -> None:
+        """Open the first page of the category in its own tab and count its pages"""
+        if crawl.page is None:
+            crawl.page = await context.new_page()
+            self.metrics.count("round_trips")
+        if self.engine == "network":
+            self._captures[crawl.page] = CatalogResponseCapture(crawl.page)
+        with self.metrics.phase("catalog_navigation"):
+            await crawl.page.goto(crawl.url, timeout=TIMEOUT)
+        self.metrics.count("round_trips")
+
+        with self.metrics.phase("page_count"):
+            crawl.total_pages = await self.__number_of_pages(crawl.page)
+        self.logger.info(f"Category {crawl.name}: {crawl.total_pages} pages")
+
     async def _get_element_text(self, parent, selector: str) -> str:
         """Safely get element text with timeout"""
         try:
             element = await parent.query_selector(selector)
             if element and await element.is_visible():
+                self.metrics.count("round_trips", 3)
                 return await element.inner_text()
+            self.metrics.count("round_trips", 2 if element else 1)
             return "Not specified"
         except Exception as e:
-            self.logger.warning(f"Error getting element text: {str(e)}")
+            self.logger.warning("Error getting element text: %s", e)
             return "Error getting text"
 
     async def _get_attribute(self, parent, selector: str, attr: str) -> Optional[str]:
         """Safely get element attribute"""
         element = await parent.query_selector(selector)
         if element and await element.is_visible():
+            self.metrics.count("round_trips", 3)
             return await element.get_attribute(attr)
+        self.metrics.count("round_trips", 2 if element else 1)
         return None
 
-    async def __number_of_pages(self) -> int:
+    async def __number_of_pages(self, page: Page) -> int:
         """Get total number of product pages"""
         try:
-            await self.page.wait_for_selector(SELECTORS["pagination"])
-            pagination = await self.page.query_selector(SELECTORS["pagination_list"])
+            await page.wait_for_selector(SELECTORS["pagination"])
+            pagination = await page.query_selector(SELECTORS["pagination_list"])
+            self.metrics.count("round_trips", 2)
             if not pagination:
                 return 1
                 
             last_page = await pagination.query_selector("li:last-child")
+            self.metrics.count("round_trips", 2 if last_page else 1)
             return int(await last_page.inner_text()) if last_page else 1
         except Exception as e:
-            print(f"Error getting page count: {e}")
+            self.metrics.count("page_count_failures")
+            self.logger.error("Error getting page count: %s", e)
             return 1
 
-    async def __scroll_page(self) -> None:
-        await self.page.wait_for_selector(SELECTORS["product_grid"])
-        await self.page.evaluate("""() => {
-                window.scrollTo({
-                    top: document.body.scrollHeight / 2,
-                    behavior: 'smooth'
-                });
-            }""")
-
-    async def __get_beer_info(self, number_of_pages: int) -> List[Dict]:
-        """Parsing products in catalog"""
-        catalog = []
-        self.logger.info(f"Starting page parsing ->")
+    async def __wait_until_ready(self, page: Page, page_number: PageKey) -> None:
+        """Wait until every card of the catalog page is rendered and the card set stops changing"""
+        result = await page.evaluate(READY_SCRIPT, {
+            "item": SELECTORS["product_item"],
+            "name": SELECTORS["product_name"],
+            "quietMs": READY_QUIET_MS,
+            "timeoutMs": READY_TIMEOUT,
+            # Подпись предыдущей страницы вкладки: после клика старая сетка еще на месте
+            "stale": self._ready_signatures.get(page),
+        })
+        self.metrics.count("round_trips")
+        self._ready_signatures[page] = result["signature"]
+        seconds = result["elapsed"] / 1000
+        self.page_ready_times[page_number] = seconds
+        self.metrics.observe("page_ready", seconds)
+        if result["ready"]:
+            self.logger.debug("page %s ready in %.0f ms (%d cards)", page_number, result["elapsed"], result["cards"])
+        else:
+            self.metrics.count("page_ready_timeouts")
+            self.logger.warning(
+                "page %s not settled after %d ms, extracting %d cards", page_number, READY_TIMEOUT, result["cards"]
+            )
+
+    async def _extract_cards(self, page: Page) -> List[Dict[str, Optional[str]]]:
+        """Extract raw card records of the current page in one DOM round trip"""
+        self.metrics.count("round_trips")
+        return await page.eval_on_selector_all(
+            SELECTORS["product_item"],
+            CARDS_SCRIPT,
+            {
+                "name": SELECTORS["product_name"],
+                "volume": SELECTORS["product_volume"],
+                "price": SELECTORS["product_price"],
+                "image": SELECTORS["product_image"],
+            }
+        )
+
+    async def _extract_cards_per_element(self, page: Page, page_number: PageKey) -> List[Dict[str, Optional[str]]]:
+        """Extract raw card records element by element"""
+        items = await page.query_selector_all(SELECTORS["product_item"])
+        self.metrics.count("round_trips")
+        records = []
+        for idx, item in enumerate(items, 1):
+            try:
+                with self.metrics.phase("card_extract"):
+                    records.append({
+                        "name": await self._get_element_text(item, SELECTORS["product_name"]),
+                        "volume": await self._get_element_text(item, SELECTORS["product_volume"]),
+                        "price": await self._get_element_text(item, SELECTORS["product_price"]),
+                        "image": await self._get_attribute(item, SELECTORS["product_image"], "src")
+                    })
+            except Exception as e:
+                self.logger.warning("Error parsing product %d on page %s: %s", idx, page_number, e)
+        return records
+
+    def _build_product(self, record: Dict, processed: Optional[ProcessedName] = None, category: Optional[str] = None) -> Product:
+        """Build product from a raw card record (and its name already normalized by the process pool)"""
+        product_type, cleaned_name, color_type, is_alcoholic, filtering_type, pasteurization_type, alcohol_percentage, sweetness_type, packaging_type, clarification_type = processed or process_product_name(record["name"])
+
+        return Product(
+            name=cleaned_name,
+            type=product_type,
+            color=color_type,
+            is_alcoholic=is_alcoholic,
+            filtering=filtering_type,
+            pasteurization=pasteurization_type,
+            alcohol_percentage=alcohol_percentage,
+            sweetness=sweetness_type,
+            packaging=packaging_type,
+            clarification=clarification_type,
+            volume=record["volume"],
+            price_kopecks=record["price_value"] if record.get("price_value") is not None else parse_price(record["price"]),
+            image=record["image"],
+            category=category
+        )
+
+    def _page_done(self, page_number: PageKey) -> bool:
+        """Check whether the page was already written by the resumed run"""
+        return self.sink is not None and page_number in self.sink.completed_pages
+
+    def _page_completed(self, page_number: PageKey, page_items: List[Product]) -> None:
+        """Flush parsed page to the streaming sink and compare it with the previous snapshot"""
+        if self._images is not None:
+            # Изображения загружаются параллельно с обходом следующих страниц;
+            # в поток страница пишется после них, чтобы записи содержали image_path
+            self._image_tasks.append(asyncio.ensure_future(self.__stream_with_images(page_number, page_items)))
+        elif self.sink is not None:
+            self.sink.write_page(page_number, page_items)
+        if self.delta is not None and self.delta.observe_page(page_number, page_items):
+            self.logger.debug("page %s unchanged since the previous run", page_number)
+
+    async def __stream_with_images(self, page_number: PageKey, page_items: List[Product]) -> None:
+        """Download images of the page, then write it to the sink"""
+        await self._images.fetch_products(page_items)
+        if self.sink is None:
+            return
+        try:
+            self.sink.write_page(page_number, page_items)
+        except OSError as e:
+            # Незаписанная страница оставляет чекпоинт незавершенным для --resume
+            self.logger.error("Error writing page %s: %s", page_number, e)
+            self.failed_pages.append((page_number, e))
+            self.metrics.count("page_failures")
+
+    def _past_delta_stop(self, page_number: PageKey) -> bool:
+        """Check whether the delta crawl stopped before the page"""
+        return self.delta is not None and self.delta.past_stop(page_number)
+
+    def _finish_delta(self) -> None:
+        """Write the delta file of the run"""
+        path, delta = self.delta.write(failed_pages=bool(self.failed_pages))
+        if delta["stopped_at_pages"]:
+            self.logger.info(
+                f"Delta crawl stopped after pages {', '.join(map(str, delta['stopped_at_pages']))}: "
+                f"{self.delta.unchanged_pages} consecutive pages unchanged"
+            )
+        self.logger.info(
+            f"Delta saved to {path.name}: added {len(delta['added'])}, "
+            f"changed {len(delta['changed'])}, removed {len(delta['removed'])}"
+        )
+
+    async def __parse_current_page(self, page: Page, page_number: PageKey) -> int:
+        """Extract raw cards of the catalog page opened in the tab and queue them for normalization"""
+        if self._page_done(page_number):
+            self.logger.debug("page %s already saved, skipping ...", page_number)
+            return 0
+
+        if self.engine == "network":
+            with self.metrics.phase("page_capture"):
+                records = await self._captures[page].take_records(TIMEOUT / 1000)
+        else:
+            records = await self.__extract_page_records(page, page_number)
+        self.logger.debug("found %d products on page %s ...", len(records), page_number)
+
+        # Ожидание здесь - обратное давление нормализации на браузер
+        with self.metrics.phase("pipeline_put"):
+            await self._pipeline.put(page_number, records)
+        return len(records)
+
+    def _handle_page(self, page_number: PageKey, records: List[Dict], processed: Optional[List[ProcessedName]]) -> List[Product]:
+        """Normalization stage: build products of the page and stream them to the sink"""
+        category = page_number.category
+        page_items = []
+        with self.metrics.phase("page_build"):
+            for idx, record in enumerate(records, 1):
+                try:
+                    page_items.append(self._build_product(record, processed[idx - 1] if processed else None, category))
+                except Exception as e:
+                    self.metrics.count("card_failures")
+                    self.logger.warning("Error parsing product %d on page %s: %s", idx, page_number, e)
+        self._page_completed(page_number, page_items)
+        self.metrics.count("pages")
+        self.metrics.count("cards", len(records))
+        self.logger.info("page %s processed. Products: %d ...", page_number, len(page_items))
+        return page_items
+
+    async def __extract_page_records(self, page: Page, page_number: PageKey) -> List[Dict]:
+        """Extract raw card records from the rendered catalog page"""
+        await self.__wait_until_ready(page, page_number)
+
+        if not self.batch_extraction:
+            with self.metrics.phase("page_extract"):
+                return await self._extract_cards_per_element(page, page_number)
+
+        start = time.perf_counter()
+        with self.metrics.phase("page_extract"):
+            records = await self._extract_cards(page)
+        if records and self.metrics.enabled:
+            # Карточки извлекаются одним вызовом, задержка на карточку - доля времени вызова
+            self.metrics.observe("card_extract", (time.perf_counter() - start) / len(records), len(records))
+        return records
+
+    @staticmethod
+    def _page_url(catalog_url: str, page_number: int) -> str:
+        """Build direct URL of the catalog page"""
+        parts = urlsplit(catalog_url)
+        query = [(k, v) for k, v in parse_qsl(parts.query) if k != PAGE_QUERY_PARAM]
+        if page_number > 1:
+            query.append((PAGE_QUERY_PARAM, str(page_number)))
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
+    async def __get_category_info(self, crawl: CategoryCrawl) -> None:
+        """Parsing category pages by clicking through them in the category tab"""
+        self.logger.info(f"Starting page parsing of {crawl.name} ->")
+        page, number_of_pages = crawl.page, crawl.total_pages
         
         for i in range(1, number_of_pages + 1):
+            key = crawl.key(i)
+            if self._past_delta_stop(key):
+                self.logger.info("Pages %s-%s skipped: catalog unchanged since the previous run", key, crawl.key(number_of_pages))
+                break
             try:
-                self.logger.debug(f"processing page {i}/{number_of_pages} ...")
-                
-                await self.page.wait_for_selector(SELECTORS["product_grid"], state="attached")
-                await self.__scroll_page()
-                
-                items = await self.page.query_selector_all(SELECTORS["product_item"])
-                self.logger.debug(f"found {len(items)} products on page {i} ...")
-
-                page_items = []
-                for idx, item in enumerate(items, 1):
-                    try:
-                        raw_name = await self._get_element_text(item, SELECTORS["product_name"])
-                        product_type, cleaned_name, color_type, is_alcoholic, filtering_type, pasteurization_type, alcohol_percentage, sweetness_type, packaging_type, clarification_type = process_product_name(raw_name)
-                        
-                        product = Product(
-                            name=cleaned_name,
-                            type=product_type,
-                            color=color_type,
-                            is_alcoholic=is_alcoholic,
-                            filtering=filtering_type,
-                            pasteurization=pasteurization_type,
-                            alcohol_percentage=alcohol_percentage,
-                            sweetness=sweetness_type,
-                            packaging=packaging_type,
-                            clarification=clarification_type,
-                            volume=await self._get_element_text(item, SELECTORS["product_volume"]),
-                            price=self.__clean_value(await self._get_element_text(item, SELECTORS["product_price"])),
-                            image=await self._get_attribute(item, SELECTORS["product_image"], "src")
-                        )
-                        
-                        page_items.append(product.to_dict())
-                        
-                        if idx % 10 == 0:
-                            self.logger.debug(f"processed {idx}/{len(items)} products on page {i} ...")
-                    
-                    except Exception as e:
-                        self.logger.warning(f"Error parsing product {idx} on page {i}: {str(e)}")
+                self.logger.debug("processing page %s/%d ...", key, number_of_pages)
 
-                catalog.extend(page_items)
-                self.logger.info(f"page {i} processed. Products: {len(page_items)} ...")
+                cards = await self.__parse_current_page(page, key)
+                self.logger.debug("page %s extracted. Cards: %d ...", key, cards)
 
                 if i < number_of_pages:
                     next_selector = f"a[aria-label='перейти на страницу {i + 1}']"
-                    if await self.page.query_selector(next_selector):
-                        await self.page.click(next_selector)
-                        self.logger.debug(f"navigating to page {i + 1} ...")
+                    if await page.query_selector(next_selector):
+                        with self.metrics.phase("page_navigation"):
+                            await page.click(next_selector)
+                        self.metrics.count("round_trips", 2)
+                        self.logger.debug("navigating to page %s ...", crawl.key(i + 1))
                     else:
-                        self.logger.warning(f"Next page button not found for page {i + 1}")
+                        self.metrics.count("round_trips")
+                        self.logger.warning("Next page button not found for page %s", crawl.key(i + 1))
+                        self.failed_pages.extend((crawl.key(n), "next page button not found") for n in range(i + 1, number_of_pages + 1))
+                        self.metrics.count("page_failures", number_of_pages - i)
                         break
                         
             except Exception as e:
-                self.logger.error(f"Error processing page {i}: {str(e)}", exc_info=True)
+                self.logger.error("Error processing page %s: %s", key, e, exc_info=True)
+                self.failed_pages.append((key, str(e)))
+                self.metrics.count("page_failures")
                 continue
-        self.logger.info(f"<- parsing completed! Total products processed: {len(catalog)}")
 
-        return catalog
+    async def __parse_page_in_tab(self, context: BrowserContext, catalog_url: str, crawl: CategoryCrawl, page_number: int, semaphore: asyncio.Semaphore) -> int:
+        """Open the category page in a new tab of the store context and parse it"""
+        key = crawl.key(page_number)
+        async with semaphore:
+            if self._past_delta_stop(key):
+                self.logger.debug("page %s skipped: catalog unchanged since the previous run", key)
+                return 0
+            page = await context.new_page()
+            if self.engine == "network":
+                self._captures[page] = CatalogResponseCapture(page)
+            self.metrics.count("round_trips")
+            try:
+                with self.metrics.phase("page_goto"):
+                    await page.goto(self._page_url(catalog_url, page_number), timeout=TIMEOUT)
+                self.metrics.count("round_trips")
+                cards = await self.__parse_current_page(page, key)
+                self.logger.debug("page %s extracted. Cards: %d ...", key, cards)
+                return cards
+            finally:
+                self._captures.pop(page, None)
+                self._ready_signatures.pop(page, None)
+                await page.close()
+                self.metrics.count("round_trips")
+
+    async def __get_category_info_concurrent(self, context: BrowserContext, crawl: CategoryCrawl, semaphore: asyncio.Semaphore) -> None:
+        """Parsing category pages concurrently in tabs sharing the store context"""
+        self.logger.info(f"Starting concurrent page parsing of {crawl.name} ({self.page_concurrency} tabs) ->")
+        catalog_url = crawl.page.url
+
+        # Первая страница уже открыта во вкладке категории
+        async def first_page() -> int:
+            async with semaphore:
+                return await self.__parse_current_page(crawl.page, crawl.key(1))
+
+        page_numbers = [n for n in range(2, crawl.total_pages + 1) if not self._page_done(crawl.key(n))]
+        results = await asyncio.gather(
+            first_page(),
+            *(self.__parse_page_in_tab(context, catalog_url, crawl, n, semaphore) for n in page_numbers),
+            return_exceptions=True
+        )
+
+        for page_number, result in zip([1] + page_numbers, results):
+            if isinstance(result, BaseException):
+                key = crawl.key(page_number)
+                self.logger.error("Error processing page %s: %s", key, result)
+                self.failed_pages.append((key, str(result)))
+                self.metrics.count("page_failures")
+
+    async def __crawl_category(self, context: BrowserContext, crawl: CategoryCrawl, semaphore: asyncio.Semaphore) -> None:
+        """Open the category and parse its pages; the semaphore bounds open tabs of all categories"""
+        try:
+            try:
+                if crawl.page is not self.page:
+                    # Вкладка категории тоже занимает место в общем лимите
+                    async with semaphore:
+                        await self.__open_category(context, crawl)
+                else:
+                    await self.__open_category(context, crawl)
+            except Exception as e:
+                self.logger.error(f"Error opening category {crawl.name}: {str(e)}")
+                self.failed_pages.append((crawl.key(1), f"category {crawl.name}: {str(e)}"))
+                self.metrics.count("page_failures")
+                return
+
+            if self.page_concurrency > 1 and crawl.total_pages > 1:
+                await self.__get_category_info_concurrent(context, crawl, semaphore)
+            else:
+                async with semaphore:
+                    await self.__get_category_info(crawl)
+        finally:
+            if crawl.page is not None and crawl.page is not self.page:
+                self._captures.pop(crawl.page, None)
+                self._ready_signatures.pop(crawl.page, None)
+                await crawl.page.close()
 
-    def __clean_value(self, value: str) -> str:
-        """Clean price value"""
+    async def parse_in_browser(self, browser: Union[Browser, BrowserLease]) -> Optional[List[Product]]:
+        """Parse the store catalog in an isolated context of an already launched browser or of a pool lease"""
         try:
-            price_match = re.search(r'(\d+,\d+)', value)
-            return f"{price_match.group(1)} ₽" if price_match else "Price not specified"
+            self.start_time = time.perf_counter()
+            self.failed_pages = []
+            self.page_ready_times = {}
+            self._ready_signatures = {}
+            router = ResourceRouter(self.routing_profile, self.rate_limiter)
+
+            async with await self.__open_store(browser, router) as context:
+                crawls = category_crawls(self.categories)
+                with self.metrics.phase("category_lookup"):
+                    await self.__resolve_category_urls(crawls)
+                crawls = [crawl for crawl in crawls if crawl.url]
+                if not crawls:
+                    raise RuntimeError("None of the catalog categories was found")
+                await self.__save_session(context, crawls)
+                # Первая категория открывается во вкладке выбора магазина
+                crawls[0].page = self.page
+                semaphore = asyncio.Semaphore(max(1, self.page_concurrency))
+
+                if self.fetch_images:
+                    self._images = ImageFetcher(base_url=BASE_URL)
+                    self._image_tasks = []
+                async with PagePipeline(self._handle_page, self.normalize_workers) as pipeline:
+                    self._pipeline = pipeline
+                    await asyncio.gather(*(self.__crawl_category(context, crawl, semaphore) for crawl in crawls))
+                self._pipeline = None
+                self.logger.info(
+                    "Pages per category: " + ", ".join(f"{crawl.name} {crawl.total_pages}" for crawl in crawls)
+                )
+                for page_number, error in pipeline.failed:
+                    self.logger.error("Error normalizing page %s: %s", page_number, error)
+                    self.failed_pages.append((page_number, error))
+                    self.metrics.count("page_failures")
+                catalog = pipeline.catalog()
+                self.logger.info(f"<- parsing completed! Total products processed: {len(catalog)}")
+                if self.failed_pages:
+                    self.logger.warning(
+                        f"Failed pages: {', '.join(str(n) for n, _ in self.failed_pages)}"
+                    )
+                name_cache = get_name_cache().stats
+                self.logger.info(
+                    "Name cache: hits %d, disk hits %d, misses %d",
+                    name_cache["hits"], name_cache["disk_hits"], name_cache["misses"]
+                )
+                if self.page_ready_times:
+                    slowest = max(self.page_ready_times, key=self.page_ready_times.get)
+                    self.logger.info(
+                        "Time to ready: mean %.0f ms, slowest page %s (%.0f ms)",
+                        1000 * sum(self.page_ready_times.values()) / len(self.page_ready_times),
+                        slowest, 1000 * self.page_ready_times[slowest]
+                    )
+                if self._images is not None:
+                    await self.__wait_page_images()
+                if self.delta is not None:
+                    self._finish_delta()
+                if self.sink is not None:
+                    catalog = self.__finish_sink()
+                if self._images is not None:
+                    await self.__finish_images(catalog)
+
+                self.routing_stats = router.stats
+                self.metrics.count("requests_blocked", router.blocked)
+                self.metrics.count("requests_allowed", router.allowed)
+                self.logger.info(
+                    f"Requests blocked: {router.blocked}, allowed: {router.allowed}, "
+                    f"loaded: {router.bytes_loaded / 1024:.0f} KB, saved ~{router.bytes_saved / 1024:.0f} KB "
+                    f"(profile: {router.profile})"
+                )
+
+                elapsed_seconds = time.perf_counter() - self.start_time
+                self.metrics.observe("run", elapsed_seconds)
+                hours, remainder = divmod(elapsed_seconds, 3600)
+                minutes, seconds = divmod(remainder, 60)
+                self.logger.info(
+                    f"Parser finished. Execution time: "
+                    f"{int(minutes)} min {seconds:.1f} sec"
+                )
+                return catalog
+
         except Exception as e:
-            print(f"Error processing price: {e}")
-            return "Price error"
+            self.metrics.count("run_failures")
+            self.logger.critical(f"Critical error: {str(e)}", exc_info=True)
+            return None
+        finally:
+            if self._images is not None:
+                for task in self._image_tasks:
+                    task.cancel()
+                await asyncio.gather(*self._image_tasks, return_exceptions=True)
+                self._image_tasks = []
+                await self._images.close()
+                self._images = None
+
+    async def __wait_page_images(self) -> None:
+        """Wait for the image downloads of all pages and their writes to the sink"""
+        with self.metrics.phase("image_fetch"):
+            results = await asyncio.gather(*self._image_tasks, return_exceptions=True)
+            self._image_tasks = []
+        for error in results:
+            if isinstance(error, Exception):
+                self.logger.error(f"Error saving page images: {error}")
+
+    async def __finish_images(self, catalog: List[Product]) -> None:
+        """Record local image paths on the final catalog"""
+        with self.metrics.phase("image_fetch"):
+            # Товары, прочитанные из потока, и страницы прерванного запуска; загруженные URL берутся из памяти
+            await self._images.fetch_products(catalog)
+        stats = self._images.stats
+        self.metrics.count("images_downloaded", stats["downloaded"])
+        self.logger.info(
+            f"Images: cached {stats['hits']}, revalidated {stats['revalidated']}, downloaded {stats['downloaded']} "
+            f"({stats['bytes_loaded'] / 1024:.0f} KB, {stats['duplicates']} duplicate), failed {stats['failed']}"
+        )
+
+    def __finish_sink(self) -> List[Product]:
+        """Complete the streaming run and read back the whole catalog"""
+        # С неудачными страницами чекпоинт остается незавершенным, чтобы их можно было дочитать в --resume
+        if not self.failed_pages:
+            self.sink.finish()
+        self.logger.info(f"Streamed {self.sink.product_count} products to {self.sink.path.name}")
+        return self.sink.read_products()
 
-    async def parse(self) -> Optional[List[Dict]]:
+    async def parse(self) -> Optional[List[Product]]:
         """Main parser method"""
         try:
             self.logger.info(f"Starting parser for address: {self.address}")
             
             async with async_playwright() as p:
                 self.logger.debug("Playwright context created")
-                browser_settings = BROWSER_SETTINGS.copy()
-                browser_settings["args"].append(f"--user-agent={USER_AGENT}")
-                
-                async with await p.chromium.launch(**browser_settings) as browser:
-                    self.logger.debug("Browser launched")
-                    async with await browser.new_context(**CONTEXT_SETTINGS) as context:
-                        self.logger.debug("Browser context created")
-                        await context.route("**/*", lambda route: route.continue_() if not route.request.resource_type == "geolocation" else route.abort())
-                        
-                        self.page = await context.new_page()
-                        self.logger.debug("New page created")
-                        await self.page.goto(BASE_URL, timeout=TIMEOUT)
-                        self.logger.info("Main page loaded")
-
-                        await self.__store_selection()
-                        await self.__go_to_beer_catalog()
-
-                        total_pages = await self.__number_of_pages()
-                        self.logger.info(f"Total pages to parse: {total_pages}")
-
-                        catalog = await self.__get_beer_info(total_pages)
+                if self.use_browser_pool:
+                    lease = BrowserLease()
+                    try:
+                        with self.metrics.phase("browser_lease"):
+                            await lease.acquire(p)
+                    except (OSError, asyncio.TimeoutError, PlaywrightError) as e:
+                        self.logger.warning(f"Browser pool is not available ({e}), launching a browser")
+                    else:
+                        self.logger.info(f"Leased warm browser {lease.slot} from the pool")
+                        try:
+                            # Контексты открываются через аренду и закрываются при ее возврате
+                            return await self.parse_in_browser(lease)
+                        finally:
+                            await lease.release()
 
-                        elapsed_seconds = time.perf_counter() - self.start_time
-                        hours, remainder = divmod(elapsed_seconds, 3600)
-                        minutes, seconds = divmod(remainder, 60)
-                        self.logger.info(
-                            f"Parser finished. Execution time: "
-                            f"{int(minutes)} min {seconds:.1f} sec"
-                        )
-                        return catalog
+                with self.metrics.phase("browser_launch"):
+                    browser = await p.chromium.launch(**browser_launch_settings())
+                async with browser:
+                    self.logger.debug("Browser launched")
+                    return await self.parse_in_browser(browser)
 
         except Exception as e:
             self.logger.critical(f"Critical error: {str(e)}", exc_info=True)
             return None
 
-    def _save_results(self, catalog: List[Dict], address: str) -> None:
+    def _save_results(self, catalog: List[Product], address: str) -> None:
         """Save parsing results to a JSON file"""
         try:
-            results_dir = Path(__file__).parent.parent / RESULTS_DIR
+            results_dir = results_path()
             results_dir.mkdir(exist_ok=True)
             
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            # Очищаем адрес от недопустимых символов в имени файла
-            safe_address = "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in address)
-            filename = f"lenta_products_{safe_address}_{timestamp}.json"
+            filename = f"lenta_products_{safe_filename(address)}_{timestamp}.json"
             
             with open(results_dir / filename, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'address': address,
-                    'timestamp': timestamp,
-                    'products': catalog
-                }, f, ensure_ascii=False, indent=2)
+                write_results_json(f, address, timestamp, catalog, [page_number for page_number, _ in self.failed_pages])
                 
             self.logger.info(f"Results saved to {filename}")
         except Exception as e:
             self.logger.error(f"Error saving results: {str(e)}")
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Parse the beer catalog of a Lenta store")
     # Тестовый адрес для проверки
-    test_address = "Москва, Чонгарский бул., 7"
-    parser = AsyncLentaProductParse(test_address)
+    arg_parser.add_argument("address", nargs="?", default="Москва, Чонгарский бул., 7", help="store address")
+    arg_parser.add_argument("--stream", action="store_true", help="stream pages to NDJSON as they are parsed")
+    arg_parser.add_argument(
+        "--compression", choices=["gzip", "zstd"],
+        help=f"NDJSON compression (available: {', '.join(available_compressions())})"
+    )
+    arg_parser.add_argument("--resume", action="store_true", help="continue the interrupted streaming run")
+    arg_parser.add_argument("--compact", action="store_true", help="also save the JSON results file at the end")
+    arg_parser.add_argument("--metrics-report", type=Path, help="write JSON report of phase timings and counters")
+    arg_parser.add_argument("--prometheus", type=Path, help="write phase metrics in Prometheus text format")
+    arg_parser.add_argument("--delta", action="store_true", help="save only changes since the previous results of the store")
+    arg_parser.add_argument("--unchanged-pages", type=int, default=DELTA_UNCHANGED_PAGES, help="delta crawl stops after this many unchanged pages (0: parse all)")
+    arg_parser.add_argument("--category", action="append", choices=list(CATALOG_CATEGORIES), help="catalog category (repeatable, default: all)")
+    arg_parser.add_argument("--pool", action="store_true", default=USE_BROWSER_POOL, help="lease a warm browser from the browser pool daemon")
+    arg_parser.add_argument("-w", "--workers", type=int, default=NORMALIZE_WORKERS, help="name normalization processes (0: in the event loop)")
+    arg_parser.add_argument("--images", action="store_true", default=FETCH_IMAGES, help="download product images into the local cache")
+    args = arg_parser.parse_args()
+    if args.compression and args.compression not in available_compressions():
+        arg_parser.error(f"--compression {args.compression} requires the 'zstandard' package (pip install zstandard)")
+
+    sink = None
+    if args.stream or args.resume:
+        sink = NDJSONResultSink(args.address, compression=args.compression, resume=args.resume)
+        if sink.resumed:
+            print(f"Resuming {sink.path.name}: {len(sink.completed_pages)} pages saved ({sink.product_count} products)")
+    delta = DeltaTracker(args.address, args.unchanged_pages) if args.delta else None
+    if delta is not None and not delta.has_snapshot:
+        # Без прежних результатов сравнивать не с чем: сохраняется полный каталог, он станет базой
+        print("No previous results of the store, saving the full catalog")
+        delta = None
+        args.compact = True
+    parser = AsyncLentaProductParse(
+        args.address, sink=sink, collect_metrics=bool(args.metrics_report or args.prometheus) or METRICS_ENABLED,
+        normalize_workers=args.workers, delta=delta, use_browser_pool=args.pool,
+        categories=args.category, fetch_images=args.images
+    )
     
     # Запускаем парсер
     result = asyncio.run(parser.parse())
+
+    if args.metrics_report:
+        args.metrics_report.write_text(json.dumps(parser.metrics.report(), ensure_ascii=False, indent=2), encoding='utf-8')
+    if args.prometheus:
+        args.prometheus.write_text(parser.metrics.prometheus(), encoding='utf-8')
     
     if result:
+        # Частичный обход дельта-режима не сохраняется как полный каталог
+        if delta is None and (args.compact or sink is None):
+            parser._save_results(result, args.address)
         print(f"Successfully parsed {len(result)} products")
     else:
         print("Parser failed")
-        sys.exit(1) 
\ No newline at end of file
+        sys.exit(1)
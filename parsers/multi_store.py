@@ -0,0 +1,109 @@
+from playwright.async_api import async_playwright, Browser
+from typing import List, Dict, Optional, Iterable
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+
+from config.browser import STORE_CONCURRENCY, ROUTING_PROFILE, ROUTING_PROFILES, EXTRACTION_ENGINE, CATALOG_CATEGORIES
+from config.normalization import NORMALIZE_WORKERS
+from config.images import FETCH_IMAGES
+from parsers.lenta_parser import AsyncLentaProductParse, browser_launch_settings
+from utils.logging import setup_logging
+from utils.metrics import RunMetrics, prometheus_text
+from models.product import Product
+
+class MultiStoreRunner:
+    """Parse many stores sharing one Chromium instance"""
+
+    def __init__(
+        self,
+        addresses: Iterable[str],
+        store_concurrency: int = STORE_CONCURRENCY,
+        save_results: bool = True,
+        **parser_options
+    ) -> None:
+        self.addresses = list(dict.fromkeys(addresses))
+        self.store_concurrency = store_concurrency
+        self.save_results = save_results
+        self.parser_options = parser_options
+        self.metrics: Dict[str, RunMetrics] = {}
+        self.logger = setup_logging(role="multi_store")
+
+    async def _run_store(self, browser: Browser, address: str, semaphore: asyncio.Semaphore) -> Optional[List[Product]]:
+        """Parse one store in its own browser context"""
+        async with semaphore:
+            try:
+                parser = AsyncLentaProductParse(address, **self.parser_options)
+                if parser.metrics.enabled:
+                    self.metrics[address] = parser.metrics
+                catalog = await parser.parse_in_browser(browser)
+                if catalog is not None and self.save_results:
+                    parser._save_results(catalog, address)
+                return catalog
+            except Exception as e:
+                # Сбой одного магазина не прерывает остальные
+                self.logger.error(f"Store {address} failed: {str(e)}", exc_info=True)
+                return None
+
+    async def run(self) -> Dict[str, Optional[List[Product]]]:
+        """Launch the browser once and parse all stores; None marks a failed store"""
+        self.logger.info(f"Starting multi-store run for {len(self.addresses)} stores ->")
+        semaphore = asyncio.Semaphore(self.store_concurrency)
+
+        async with async_playwright() as p:
+            async with await p.chromium.launch(**browser_launch_settings()) as browser:
+                self.logger.debug("Browser launched")
+                catalogs = await asyncio.gather(
+                    *(self._run_store(browser, address, semaphore) for address in self.addresses)
+                )
+
+        results = dict(zip(self.addresses, catalogs))
+        failed = [address for address, catalog in results.items() if catalog is None]
+        self.logger.info(f"<- multi-store run finished. Stores: {len(results)}, failed: {len(failed)}")
+        for address in failed:
+            self.logger.warning(f"Store failed: {address}")
+        return results
+
+def read_addresses(path: Path) -> List[str]:
+    """Read addresses from a file, one per line"""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Parse the beer catalog of many Lenta stores with one browser")
+    arg_parser.add_argument("addresses", nargs="*", help="store addresses")
+    arg_parser.add_argument("-f", "--file", type=Path, help="file with one address per line")
+    arg_parser.add_argument("-c", "--concurrency", type=int, default=STORE_CONCURRENCY, help="stores parsed at once")
+    arg_parser.add_argument("-r", "--routing", choices=list(ROUTING_PROFILES), default=ROUTING_PROFILE, help="request routing profile")
+    arg_parser.add_argument("-e", "--engine", choices=["dom", "network"], default=EXTRACTION_ENGINE, help="product extraction engine")
+    arg_parser.add_argument("--prometheus", type=Path, help="write per-store phase metrics in Prometheus text format")
+    arg_parser.add_argument("--category", action="append", choices=list(CATALOG_CATEGORIES), help="catalog category (repeatable, default: all)")
+    arg_parser.add_argument("-w", "--workers", type=int, default=NORMALIZE_WORKERS, help="name normalization processes per store")
+    arg_parser.add_argument("--images", action="store_true", default=FETCH_IMAGES, help="download product images into the local cache")
+    args = arg_parser.parse_args()
+
+    addresses = list(args.addresses)
+    if args.file:
+        addresses.extend(read_addresses(args.file))
+    if not addresses:
+        arg_parser.error("no addresses given")
+
+    runner = MultiStoreRunner(
+        addresses,
+        store_concurrency=args.concurrency,
+        routing_profile=args.routing,
+        engine=args.engine,
+        collect_metrics=args.prometheus is not None,
+        normalize_workers=args.workers,
+        categories=args.category,
+        fetch_images=args.images
+    )
+    results = asyncio.run(runner.run())
+    if args.prometheus:
+        args.prometheus.write_text(prometheus_text(runner.metrics.values()), encoding='utf-8')
+
+    for address, catalog in results.items():
+        print(f"{address}: {len(catalog)} products" if catalog is not None else f"{address}: failed")
+    if any(catalog is None for catalog in results.values()):
+        sys.exit(1)
@@ -0,0 +1,45 @@
+from playwright.async_api import Page, Response
+from typing import List, Dict, Any, Set
+import asyncio
+import logging
+import re
+
+from config.api import CATALOG_RESPONSE_PATTERN
+from parsers.api_payload import decode_catalog_payload
+
+class CatalogResponseCapture:
+    """Collects catalog API responses received by a page"""
+
+    def __init__(self, page: Page, pattern: str = CATALOG_RESPONSE_PATTERN) -> None:
+        self._pattern = re.compile(pattern)
+        self._payloads: List[Any] = []
+        self._received = asyncio.Event()
+        self._tasks: Set[asyncio.Task] = set()
+        page.on("response", self._on_response)
+
+    def _on_response(self, response: Response) -> None:
+        if response.ok and self._pattern.search(response.url):
+            task = asyncio.ensure_future(self._read(response))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _read(self, response: Response) -> None:
+        try:
+            self._payloads.append(await response.json())
+            self._received.set()
+        except Exception as e:
+            logging.warning("Error reading catalog response %s: %s", response.url, e)
+
+    async def take_records(self, timeout: float, settle: float = 0.3) -> List[Dict[str, Any]]:
+        """Wait for catalog responses and decode the latest one, consuming all received"""
+        await asyncio.wait_for(self._received.wait(), timeout)
+        # Ждем, пока поток ответов затихнет: последний ответ соответствует открытой странице
+        while True:
+            self._received.clear()
+            try:
+                await asyncio.wait_for(self._received.wait(), settle)
+            except asyncio.TimeoutError:
+                break
+        payload = self._payloads[-1]
+        self._payloads.clear()
+        return decode_catalog_payload(payload)
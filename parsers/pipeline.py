@@ -0,0 +1,103 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple, Callable
+import asyncio
+
+from config.normalization import NORMALIZE_WORKERS, PIPELINE_QUEUE_SIZE
+from utils.name_cache import get_name_cache
+from utils.name_processor import ProcessedName
+from utils.logging import worker_log_queue, init_worker_logging
+from models.product import Product
+from models.page_key import PageKey
+
+PageHandler = Callable[[PageKey, List[Dict], Optional[List[ProcessedName]]], List[Product]]
+
+def normalize_names(names: List[str]) -> List[ProcessedName]:
+    """Process pool task: normalize card names of one page"""
+    cache = get_name_cache()
+    processed = cache.process_many(names)
+    # atexit в процессах пула не вызывается, поэтому кеш сбрасывается после каждой страницы
+    cache.flush()
+    return processed
+
+class PagePipeline:
+    """Bounded queue between browser workers extracting raw card records and the normalization stage.
+    A full queue suspends the producers; leaving the context drains queued pages."""
+
+    def __init__(
+        self,
+        handle_page: PageHandler,
+        workers: int = NORMALIZE_WORKERS,
+        queue_size: int = PIPELINE_QUEUE_SIZE
+    ) -> None:
+        self.handle_page = handle_page
+        self.workers = workers
+        self.queue_size = queue_size
+        self.pages: Dict[PageKey, List[Product]] = {}
+        self.failed: List[Tuple[PageKey, str]] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumers: List[asyncio.Task] = []
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def __aenter__(self) -> "PagePipeline":
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.workers > 0:
+            # Записи журнала из процессов пула идут через очередь в обработчики родителя
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=init_worker_logging, initargs=(worker_log_queue(),)
+            )
+        # С пулом процессов потребителей столько же, сколько процессов, иначе один в event loop
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(max(1, self.workers))]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None and issubclass(exc_type, (asyncio.CancelledError, KeyboardInterrupt)):
+            self.abort()
+        else:
+            await self.drain()
+
+    async def put(self, page_number: PageKey, records: List[Dict]) -> None:
+        """Queue raw records of the page, waits while the queue is full"""
+        await self._queue.put((page_number, records))
+
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            try:
+                if item is None:
+                    return
+                page_number, records = item
+                try:
+                    processed = None
+                    if self._executor is not None:
+                        processed = await loop.run_in_executor(
+                            self._executor, normalize_names, [record["name"] for record in records]
+                        )
+                    self.pages[page_number] = self.handle_page(page_number, records, processed)
+                except Exception as e:
+                    self.failed.append((page_number, str(e)))
+            finally:
+                self._queue.task_done()
+
+    async def drain(self) -> None:
+        """Process everything queued, then stop consumers and the process pool"""
+        for _ in self._consumers:
+            await self._queue.put(None)
+        await asyncio.gather(*self._consumers)
+        self._consumers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def abort(self) -> None:
+        """Drop queued pages on cancellation"""
+        for consumer in self._consumers:
+            consumer.cancel()
+        self._consumers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def catalog(self) -> List[Product]:
+        """Products of all normalized pages in page order"""
+        return [product for page_number in sorted(self.pages) for product in self.pages[page_number]]
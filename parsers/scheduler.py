@@ -0,0 +1,267 @@
+from playwright.async_api import async_playwright, Browser
+from typing import List, Dict, Optional, Iterable, Set, Any
+from dataclasses import dataclass, asdict, fields
+from urllib.parse import urlsplit
+from pathlib import Path
+import argparse
+import asyncio
+import random
+import heapq
+import json
+import time
+
+from config.browser import BASE_URL, CATALOG_CATEGORIES
+from config.scheduler import (
+    SCHEDULER_REFRESH_HOURS,
+    SCHEDULER_CHANGE_WEIGHT,
+    SCHEDULER_CONCURRENCY,
+    SCHEDULER_HOST_CONCURRENCY,
+    SCHEDULER_REQUESTS_PER_SECOND,
+    SCHEDULER_RETRY_BASE,
+    SCHEDULER_RETRY_MAX,
+    SCHEDULER_STATE,
+    SCHEDULER_SNAPSHOT_EVERY
+)
+from parsers.lenta_parser import AsyncLentaProductParse, browser_launch_settings
+from parsers.categories import check_categories, is_url
+from parsers.multi_store import read_addresses
+from utils.request_router import HostRateLimiter
+from utils.result_writer import results_path
+from utils.delta import DeltaTracker, deltas_since_base, write_snapshot
+from utils.logging import setup_logging
+
+# Вес последнего запуска в скользящей доле изменений
+CHANGE_RATE_SMOOTHING = 0.5
+
+@dataclass
+class RefreshJob:
+    """Refresh state of one (store, category) pair"""
+    address: str
+    category: str
+    last_success: float = 0.0
+    last_attempt: float = 0.0
+    next_attempt: float = 0.0
+    failures: int = 0
+    runs: int = 0
+    # Доля измененных товаров за последние запуски; неизвестная считается полной
+    change_rate: float = 1.0
+    last_error: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.address}|{self.category}"
+
+    @property
+    def host(self) -> str:
+        spec = CATALOG_CATEGORIES[self.category]
+        return urlsplit(spec if is_url(spec) else BASE_URL).hostname or ""
+
+    def staleness(self, now: float) -> float:
+        """Data age relative to the refresh interval of the job: due from 1, never parsed jobs first"""
+        if not self.last_success:
+            return float("inf")
+        interval = SCHEDULER_REFRESH_HOURS * 3600 / (1 + SCHEDULER_CHANGE_WEIGHT * self.change_rate)
+        return (now - self.last_success) / interval
+
+    def due_at(self) -> float:
+        """Time the job becomes due (ignoring retry delay)"""
+        if not self.last_success:
+            return 0.0
+        return self.last_success + SCHEDULER_REFRESH_HOURS * 3600 / (1 + SCHEDULER_CHANGE_WEIGHT * self.change_rate)
+
+class JobQueue:
+    """Refresh jobs with their state persisted to a JSON file after every change"""
+
+    def __init__(self, path: Path, addresses: Iterable[str], categories: Iterable[str]) -> None:
+        self.path = path
+        self.saved: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            with open(path, encoding='utf-8') as f:
+                self.saved = json.load(f)
+        known = {field.name for field in fields(RefreshJob)}
+        self.jobs: Dict[str, RefreshJob] = {}
+        for address in addresses:
+            for category in categories:
+                job = RefreshJob(address, category)
+                state = self.saved.get(job.key)
+                if state:
+                    job = RefreshJob(**{name: value for name, value in state.items() if name in known})
+                self.jobs[job.key] = job
+
+    def ready(self, now: float, excluded: Set[str], busy_addresses: Set[str]) -> List[RefreshJob]:
+        """Due jobs, stalest first; one job per store at a time"""
+        heap = [
+            (-job.staleness(now), key, job) for key, job in self.jobs.items()
+            if key not in excluded and job.address not in busy_addresses
+            and job.next_attempt <= now and job.staleness(now) >= 1
+        ]
+        heapq.heapify(heap)
+        ready, addresses = [], set()
+        while heap:
+            _, _, job = heapq.heappop(heap)
+            if job.address not in addresses:
+                ready.append(job)
+                addresses.add(job.address)
+        return ready
+
+    def next_wakeup(self) -> float:
+        """Earliest time a job becomes due or retryable"""
+        return min((max(job.due_at(), job.next_attempt) for job in self.jobs.values()), default=float("inf"))
+
+    def save(self) -> None:
+        # Состояние заданий, не входящих в текущий запуск, сохраняется
+        state = {**self.saved, **{key: asdict(job) for key, job in self.jobs.items()}}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.path)
+
+class RefreshScheduler:
+    """Continuous crawl of (store, category) jobs ordered by data age and change rate,
+    with global and per-host concurrency, a per-host request rate and retries with backoff"""
+
+    def __init__(
+        self,
+        addresses: Iterable[str],
+        categories: Optional[List[str]] = None,
+        concurrency: int = SCHEDULER_CONCURRENCY,
+        host_concurrency: int = SCHEDULER_HOST_CONCURRENCY,
+        requests_per_second: float = SCHEDULER_REQUESTS_PER_SECOND,
+        state_path: Optional[Path] = None,
+        snapshot_every: int = SCHEDULER_SNAPSHOT_EVERY,
+        **parser_options
+    ) -> None:
+        self.queue = JobQueue(state_path or results_path() / SCHEDULER_STATE, dict.fromkeys(addresses), check_categories(categories))
+        self.concurrency = concurrency
+        self.host_concurrency = host_concurrency
+        self.limiter = HostRateLimiter(requests_per_second)
+        self.snapshot_every = snapshot_every
+        self.parser_options = parser_options
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.logger = setup_logging("scheduler", role="scheduler")
+
+    def _retry_delay(self, failures: int) -> float:
+        delay = min(SCHEDULER_RETRY_MAX, SCHEDULER_RETRY_BASE * 2 ** (failures - 1))
+        # Разброс, чтобы упавшие вместе задания не повторялись одновременно
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _run_job(self, browser: Browser, job: RefreshJob) -> None:
+        """Parse the category of the store in delta mode and update the job state"""
+        slots = self._host_slots.setdefault(job.host, asyncio.Semaphore(self.host_concurrency))
+        async with slots:
+            job.last_attempt = time.time()
+            delta = DeltaTracker(job.address)
+            parser = AsyncLentaProductParse(
+                job.address,
+                categories=[job.category],
+                delta=delta if delta.has_snapshot else None,
+                rate_limiter=self.limiter,
+                **self.parser_options
+            )
+            self.logger.info(f"Job {job.key} started (staleness {job.staleness(job.last_attempt):.2f})")
+            catalog = await parser.parse_in_browser(browser)
+
+        if catalog is None:
+            job.failures += 1
+            job.last_error = "parser failed"
+            job.next_attempt = time.time() + self._retry_delay(job.failures)
+            self.logger.warning(f"Job {job.key} failed ({job.failures} in a row), retry in {job.next_attempt - time.time():.0f} sec")
+            return
+
+        if delta.has_snapshot:
+            result = delta.build(failed_pages=bool(parser.failed_pages))
+            changes = len(result["added"]) + len(result["changed"]) + len(result["removed"])
+            observed = min(1.0, changes / max(1, len(result["order"])))
+            self._compact(job.address, delta.results_dir)
+        else:
+            # Первый запуск магазина сохраняет полный результат, он станет базой дельт
+            parser._save_results(catalog, job.address)
+            observed = 1.0
+        job.change_rate = CHANGE_RATE_SMOOTHING * observed + (1 - CHANGE_RATE_SMOOTHING) * job.change_rate
+        job.last_success = time.time()
+        job.failures = 0
+        job.last_error = None
+        job.next_attempt = 0.0
+        job.runs += 1
+        self.logger.info(f"Job {job.key} done: {len(catalog)} products, change rate {job.change_rate:.3f}")
+
+    def _compact(self, address: str, results_dir: Path) -> None:
+        """Save the merged snapshot of the store once its delta chain is long, so readers apply few deltas"""
+        if not self.snapshot_every or deltas_since_base(address, results_dir) < self.snapshot_every:
+            return
+        try:
+            path = write_snapshot(address, results_dir)
+            self.logger.info(f"Snapshot of {address} saved to {path.name}")
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Failed to save snapshot of {address}: {str(e)}")
+
+    async def run(self, once: bool = False) -> None:
+        """Dispatch due jobs until cancelled; with once stop when no job is due"""
+        running: Dict[asyncio.Task, RefreshJob] = {}
+        self.logger.info(f"Scheduler started with {len(self.queue.jobs)} jobs ->")
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(**browser_launch_settings())
+            try:
+                while True:
+                    if not browser.is_connected():
+                        self.logger.warning("Browser disconnected, relaunching")
+                        browser = await p.chromium.launch(**browser_launch_settings())
+
+                    now = time.time()
+                    busy = {job.address for job in running.values()}
+                    ready = self.queue.ready(now, {job.key for job in running.values()}, busy)
+                    for job in ready[:self.concurrency - len(running)]:
+                        running[asyncio.create_task(self._run_job(browser, job))] = job
+
+                    if not running:
+                        if once:
+                            break
+                        wakeup = self.queue.next_wakeup()
+                        self.logger.info(f"No jobs due, sleeping {max(0, wakeup - now):.0f} sec")
+                        await asyncio.sleep(min(max(1.0, wakeup - now), SCHEDULER_REFRESH_HOURS * 3600))
+                        continue
+
+                    # Пробуждение по завершении задания или к ближайшему сроку
+                    timeout = max(1.0, self.queue.next_wakeup() - now)
+                    done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        job = running.pop(task)
+                        if task.exception() is not None:
+                            job.failures += 1
+                            job.last_error = str(task.exception())
+                            job.next_attempt = time.time() + self._retry_delay(job.failures)
+                            self.logger.error(f"Job {job.key} crashed: {job.last_error}")
+                    if done:
+                        self.queue.save()
+            finally:
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                self.queue.save()
+                await browser.close()
+        self.logger.info(f"<- scheduler stopped. Requests delayed by the rate limit: {self.limiter.waited:.1f} sec")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Keep store catalogs fresh: refresh the stalest (store, category) pairs first")
+    arg_parser.add_argument("addresses", nargs="*", help="store addresses")
+    arg_parser.add_argument("-f", "--file", type=Path, help="file with one address per line")
+    arg_parser.add_argument("--category", action="append", choices=list(CATALOG_CATEGORIES), help="catalog category (repeatable, default: all)")
+    arg_parser.add_argument("-c", "--concurrency", type=int, default=SCHEDULER_CONCURRENCY, help="jobs running at once")
+    arg_parser.add_argument("--per-host", type=int, default=SCHEDULER_HOST_CONCURRENCY, help="jobs running at once against one host")
+    arg_parser.add_argument("--rps", type=float, default=SCHEDULER_REQUESTS_PER_SECOND, help="page and API requests per second to one host")
+    arg_parser.add_argument("--once", action="store_true", help="exit when no job is due (for cron)")
+    args = arg_parser.parse_args()
+
+    addresses = list(args.addresses)
+    if args.file:
+        addresses.extend(read_addresses(args.file))
+    if not addresses:
+        arg_parser.error("no addresses given")
+
+    scheduler = RefreshScheduler(addresses, args.category, args.concurrency, args.per_host, args.rps)
+    try:
+        asyncio.run(scheduler.run(once=args.once))
+    except KeyboardInterrupt:
+        pass
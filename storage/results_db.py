@@ -0,0 +1,333 @@
+from typing import List, Dict, Optional, Iterable, Any
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+import argparse
+import sqlite3
+import logging
+import json
+
+from config.storage import RESULTS_DB
+from models.product import Product, parse_price
+from utils.result_writer import results_path, safe_filename
+from utils.delta import load_snapshot
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stores (
+    id INTEGER PRIMARY KEY,
+    address TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    product_key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    name_norm TEXT NOT NULL,
+    type TEXT,
+    volume TEXT,
+    color TEXT,
+    is_alcoholic INTEGER,
+    filtering TEXT,
+    pasteurization TEXT,
+    alcohol_percentage REAL,
+    sweetness TEXT,
+    packaging TEXT,
+    clarification TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    store_id INTEGER NOT NULL REFERENCES stores(id),
+    run_ts TEXT NOT NULL,
+    source TEXT UNIQUE,
+    source_size INTEGER,
+    source_mtime REAL
+);
+CREATE TABLE IF NOT EXISTS prices (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    product_id INTEGER NOT NULL REFERENCES products(id),
+    price_kopecks INTEGER,
+    image TEXT,
+    image_path TEXT,
+    PRIMARY KEY (run_id, product_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_runs_store_ts ON runs(store_id, run_ts);
+CREATE INDEX IF NOT EXISTS idx_prices_product ON prices(product_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_products_name_norm ON products(name_norm);
+"""
+
+_PRODUCT_FIELDS = (
+    "color", "is_alcoholic", "filtering", "pasteurization", "alcohol_percentage",
+    "sweetness", "packaging", "clarification"
+)
+
+def product_key(product: Dict) -> str:
+    """Product identity within the store: type, normalized name and volume"""
+    name = " ".join(str(product.get("name", "")).lower().split())
+    volume = " ".join(str(product.get("volume", "")).lower().split())
+    return f"{product.get('type', '')}|{name}|{volume}"
+
+def _run_ts(timestamp: str) -> str:
+    """Convert results file timestamp (%Y%m%d_%H%M%S) to ISO format"""
+    try:
+        return datetime.strptime(timestamp, '%Y%m%d_%H%M%S').isoformat()
+    except (TypeError, ValueError):
+        return timestamp
+
+class ResultsDB:
+    """Indexed SQLite store of parser results with price-history queries"""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path or results_path() / RESULTS_DB
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self._product_ids: Dict[str, int] = {}
+
+    def _migrate(self) -> None:
+        """Add columns introduced after the database was created"""
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(prices)")}
+        if "image_path" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE prices ADD COLUMN image_path TEXT")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ResultsDB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _store_id(self, address: str) -> int:
+        self.conn.execute("INSERT OR IGNORE INTO stores(address) VALUES (?)", (address,))
+        return self.conn.execute("SELECT id FROM stores WHERE address = ?", (address,)).fetchone()[0]
+
+    def _product_id(self, product: Dict, inserted: Dict[str, int]) -> int:
+        """Id of the product; ids first seen in the open transaction go to inserted"""
+        key = product_key(product)
+        product_id = self._product_ids.get(key) or inserted.get(key)
+        if product_id is None:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO products(product_key, name, name_norm, type, volume, "
+                f"{', '.join(_PRODUCT_FIELDS)}) VALUES ({', '.join('?' * (5 + len(_PRODUCT_FIELDS)))})",
+                (key, product.get("name", ""), " ".join(str(product.get("name", "")).lower().split()),
+                 product.get("type"), product.get("volume"), *(product.get(f) for f in _PRODUCT_FIELDS))
+            )
+            product_id = self.conn.execute("SELECT id FROM products WHERE product_key = ?", (key,)).fetchone()[0]
+            inserted[key] = product_id
+        return product_id
+
+    def ingest_catalog(
+        self,
+        address: str,
+        timestamp: str,
+        products: Iterable[Any],
+        source: Optional[str] = None,
+        source_size: Optional[int] = None,
+        source_mtime: Optional[float] = None
+    ) -> int:
+        """Load one parser run into the store, returns number of price rows"""
+        # Идентификаторы кешируются только после фиксации: при откате их строк в базе нет
+        inserted: Dict[str, int] = {}
+        with self.conn:
+            count = self._insert_run(address, timestamp, products, inserted, source, source_size, source_mtime)
+        self._product_ids.update(inserted)
+        return count
+
+    def _insert_run(
+        self,
+        address: str,
+        timestamp: str,
+        products: Iterable[Any],
+        inserted: Dict[str, int],
+        source: Optional[str] = None,
+        source_size: Optional[int] = None,
+        source_mtime: Optional[float] = None
+    ) -> int:
+        """Insert the run and its prices inside the caller's transaction"""
+        store_id = self._store_id(address)
+        cursor = self.conn.execute(
+            "INSERT INTO runs(store_id, run_ts, source, source_size, source_mtime) VALUES (?, ?, ?, ?, ?)",
+            (store_id, _run_ts(timestamp), source, source_size, source_mtime)
+        )
+        run_id = cursor.lastrowid
+        rows = {}
+        for product in products:
+            if isinstance(product, Product):
+                product = product.to_dict()
+            price = product.get("price_kopecks")
+            if price is None:
+                price = parse_price(product.get("price"))
+            product_id = self._product_id(product, inserted)
+            rows[product_id] = (run_id, product_id, price, product.get("image"), product.get("image_path"))
+        self.conn.executemany(
+            "INSERT INTO prices (run_id, product_id, price_kopecks, image, image_path) VALUES (?, ?, ?, ?, ?)",
+            rows.values()
+        )
+        return len(rows)
+
+    def ingest_file(self, path: Path) -> bool:
+        """Ingest JSON results file or delta file; unchanged files that are already loaded are skipped"""
+        stat = path.stat()
+        source = str(path.resolve())
+        row = self.conn.execute(
+            "SELECT id, source_size, source_mtime FROM runs WHERE source = ?", (source,)
+        ).fetchone()
+        if row and row["source_size"] == stat.st_size and row["source_mtime"] == stat.st_mtime:
+            return False
+
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        address, timestamp = data["address"], data["timestamp"]
+        is_delta = path.name.startswith("lenta_delta_")
+        if is_delta and (path.parent / f"lenta_products_{safe_filename(address)}_{timestamp}.json").exists():
+            # Полный файл того же запуска (например, с product_id) загружается вместо дельты
+            return False
+        if is_delta:
+            # Дельта хранит только изменения: цены запуска - снимок на момент дельты
+            snapshot = load_snapshot(address, path.parent, until=timestamp, full=True)
+            if snapshot is None:
+                raise ValueError(f"no full results file of {address} before the delta")
+            products = list(snapshot[1].values())
+        else:
+            products = data.get("products") or []
+
+        # Прежняя версия запуска удаляется в той же транзакции: при сбое загрузки она остается в базе
+        inserted: Dict[str, int] = {}
+        with self.conn:
+            if row:
+                self.conn.execute("DELETE FROM runs WHERE id = ?", (row["id"],))
+            if not is_delta:
+                # Запуск, ранее загруженный из дельты, заменяется полным файлом
+                self.conn.execute(
+                    "DELETE FROM runs WHERE run_ts = ? AND source LIKE ? AND store_id = (SELECT id FROM stores WHERE address = ?)",
+                    (_run_ts(timestamp), "%lenta_delta_%", address)
+                )
+            self._insert_run(
+                address, timestamp, products, inserted,
+                source=source, source_size=stat.st_size, source_mtime=stat.st_mtime
+            )
+        self._product_ids.update(inserted)
+        return True
+
+    def ingest_dir(self, directory: Optional[Path] = None) -> int:
+        """Incrementally ingest all JSON results and delta files of the directory"""
+        directory = directory or results_path()
+        ingested = 0
+        paths = chain(directory.glob("lenta_products_*.json"), directory.glob("lenta_delta_*.json"))
+        for path in sorted(paths):
+            if path.name.endswith(".checkpoint.json"):
+                continue
+            try:
+                ingested += self.ingest_file(path)
+            except Exception as e:
+                logging.warning(f"Failed to ingest {path.name}: {str(e)}")
+        return ingested
+
+    def find_products(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Find products by a substring of the name"""
+        rows = self.conn.execute(
+            "SELECT id, name, type, volume FROM products WHERE name_norm LIKE ? ORDER BY name_norm LIMIT ?",
+            (f"%{' '.join(query.lower().split())}%", limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _product_filter(self, query: str) -> tuple:
+        return "p.name_norm LIKE ?", (f"%{' '.join(query.lower().split())}%",)
+
+    def latest_prices(self, query: str, address: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Latest known price of matching products in every store"""
+        where, params = self._product_filter(query)
+        if address:
+            where += " AND s.address = ?"
+            params += (address,)
+        rows = self.conn.execute(f"""
+            SELECT address, name, volume, price_kopecks, image_path, run_ts FROM (
+                SELECT s.address, p.name, p.volume, pr.price_kopecks, pr.image_path, r.run_ts,
+                       ROW_NUMBER() OVER (PARTITION BY r.store_id, pr.product_id ORDER BY r.run_ts DESC) AS rn
+                FROM prices pr
+                JOIN runs r ON r.id = pr.run_id
+                JOIN stores s ON s.id = r.store_id
+                JOIN products p ON p.id = pr.product_id
+                WHERE {where}
+            ) WHERE rn = 1
+            ORDER BY name, price_kopecks
+        """, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def price_history(
+        self,
+        query: str,
+        address: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Price history of matching products across runs and stores"""
+        where, params = self._product_filter(query)
+        if address:
+            where += " AND s.address = ?"
+            params += (address,)
+        if since:
+            where += " AND r.run_ts >= ?"
+            params += (since,)
+        rows = self.conn.execute(f"""
+            SELECT p.name, p.volume, s.address, r.run_ts, pr.price_kopecks
+            FROM prices pr
+            JOIN runs r ON r.id = pr.run_id
+            JOIN stores s ON s.id = r.store_id
+            JOIN products p ON p.id = pr.product_id
+            WHERE {where}
+            ORDER BY p.name, s.address, r.run_ts
+        """, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def cheapest_store(self, query: str) -> List[Dict[str, Any]]:
+        """Store with the lowest latest price for every matching product"""
+        cheapest: Dict[tuple, Dict[str, Any]] = {}
+        for row in self.latest_prices(query):
+            if row["price_kopecks"] is None:
+                continue
+            key = (row["name"], row["volume"])
+            if key not in cheapest or row["price_kopecks"] < cheapest[key]["price_kopecks"]:
+                cheapest[key] = row
+        return list(cheapest.values())
+
+def _print_rows(rows: List[Dict[str, Any]]) -> None:
+    for row in rows:
+        if row.get("price_kopecks") is not None:
+            row = {**row, "price": f"{row['price_kopecks'] / 100:.2f}"}
+        print(json.dumps(row, ensure_ascii=False))
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Indexed store of Lenta parser results")
+    arg_parser.add_argument("--db", type=Path, help="database path")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="ingest results files")
+    ingest.add_argument("paths", nargs="*", type=Path, help="results files or directories (default: results/)")
+
+    for name, help_text in (("latest", "latest price per store"), ("history", "price history"), ("cheapest", "cheapest store")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("query", help="substring of the product name")
+        if name != "cheapest":
+            command.add_argument("--address", help="store address")
+        if name == "history":
+            command.add_argument("--since", help="ISO date, e.g. 2025-01-01")
+
+    args = arg_parser.parse_args()
+
+    with ResultsDB(args.db) as db:
+        if args.command == "ingest":
+            ingested = 0
+            for path in args.paths or [results_path()]:
+                ingested += db.ingest_dir(path) if path.is_dir() else db.ingest_file(path)
+            print(f"Ingested files: {ingested}")
+        elif args.command == "latest":
+            _print_rows(db.latest_prices(args.query, args.address))
+        elif args.command == "history":
+            _print_rows(db.price_history(args.query, args.address, args.since))
+        elif args.command == "cheapest":
+            _print_rows(db.cheapest_store(args.query))
@@ -0,0 +1,30 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+# Тесты запускаются из корня проекта: python -m pytest
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import name_cache
+from utils import logging as log_utils
+
+DATA_DIR = Path(__file__).parent / "data"
+
+@pytest.fixture(autouse=True, scope="session")
+def name_cache_dir(tmp_path_factory):
+    """Keep the on-disk name cache of the test run out of the project"""
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(name_cache, "NAME_CACHE_PATH", tmp_path_factory.mktemp("cache") / "names.sqlite3")
+        patch.setattr(name_cache, "_cache", None)
+        yield
+        if name_cache._cache is not None:
+            name_cache._cache.close()
+
+@pytest.fixture(autouse=True, scope="session")
+def log_dir(tmp_path_factory):
+    """Log files of the test run go to a temporary directory"""
+    path = tmp_path_factory.mktemp("logs")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(log_utils, "log_dir_path", lambda: path)
+        yield path
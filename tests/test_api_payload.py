@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import pytest
+
+from conftest import DATA_DIR
+from parsers.api_payload import decode_catalog_payload, decode_page_count
+
+def load(name: str):
+    with open(DATA_DIR / "catalog_api" / name, encoding="utf-8") as f:
+        return json.load(f)
+
+def test_items_payload():
+    records = decode_catalog_payload(load("items.json"))
+    assert [record["name"] for record in records] == [
+        "Пиво светлое BALTIKA №7 Экспортное фильтрованное пастеризованное 5,4%, ж/б 0.45л",
+        "Сидр ЧЕСТНЫЙ СИДР Яблочный полусладкий газированный 6%, 0.5л",
+        "Пиво безалкогольное BUD светлое фильтрованное пастеризованное 0%, ж/б 0.45л",
+        "Медовуха ЛЕДЯНАЯ Вишня 5%, 0.33л",
+    ]
+    first, second, third, fourth = records
+    assert first == {
+        "name": first["name"],
+        "volume": "0,45 л",
+        "price": "Not specified",
+        "price_value": 8999,
+        "image": "https://cdn.lenta.com/images/101.png",
+    }
+    # Пустая цена по первому пути - берется следующий
+    assert (second["volume"], second["price_value"], second["image"]) == ("0,5 л", 15950, "https://cdn.lenta.com/images/102.png")
+    # Отсутствующие и null поля
+    assert (third["volume"], third["price_value"], third["image"]) == ("Not specified", None, None)
+    assert (fourth["volume"], fourth["price_value"], fourth["image"]) == ("0,33 л", 12990, "https://cdn.lenta.com/images/105.png")
+
+def test_nested_items_with_invalid_values():
+    records = decode_catalog_payload(load("data_items.json"))
+    assert records == [{
+        "name": "Пиво темное BALTIKA №6 Портер пастеризованное 7%, 0.45л",
+        "volume": "Not specified",
+        "price": "Not specified",
+        "price_value": None,
+        "image": None,
+    }]
+
+@pytest.mark.parametrize("payload", [None, {}, {"items": None}, {"items": {"name": "x"}}, "items", 7])
+def test_payload_without_items(payload):
+    assert decode_catalog_payload(payload) == []
+
+def test_list_payload():
+    assert [record["name"] for record in decode_catalog_payload([{"name": "Пиво"}, {"title": "Сидр"}])] == ["Пиво", "Сидр"]
+
+def test_products_from_recorded_response():
+    """Records of the recorded response build products the same way the parser does"""
+    lenta_parser = pytest.importorskip("parsers.lenta_parser")
+    parser = lenta_parser.AsyncLentaProductParse("test", use_session_cache=False)
+    products = [parser._build_product(record) for record in decode_catalog_payload(load("items.json"))]
+
+    beer, cider, alcohol_free, mead = products
+    assert (beer.type, beer.color, beer.filtering, beer.pasteurization) == ("Пиво", "Светлое", "Фильтрованное", "Пастеризованное")
+    assert (beer.alcohol_percentage, beer.packaging, beer.volume_ml, beer.price_kopecks, beer.price) == (5.4, "ж/б", 450, 8999, "89,99 ₽")
+    assert beer.image == "https://cdn.lenta.com/images/101.png"
+    assert (cider.type, cider.sweetness, cider.alcohol_percentage, cider.price_kopecks, cider.volume_ml) == ("Сидр", "Полусладкое", 6.0, 15950, 500)
+    assert (alcohol_free.is_alcoholic, alcohol_free.volume, alcohol_free.volume_ml) == (False, "Not specified", None)
+    assert (alcohol_free.price_kopecks, alcohol_free.price, alcohol_free.image) == (None, "Price not specified", None)
+    assert (mead.type, mead.volume_ml, mead.price_kopecks) == ("Медовуха", 330, 12990)
+
+class FakeResponse:
+    def __init__(self, url: str, payload, ok: bool = True) -> None:
+        self.url = url
+        self.ok = ok
+        self._payload = payload
+
+    async def json(self):
+        if isinstance(self._payload, Exception):
+            raise self._payload
+        return self._payload
+
+class FakePage:
+    def __init__(self) -> None:
+        self.handlers = []
+
+    def on(self, event: str, handler) -> None:
+        assert event == "response"
+        self.handlers.append(handler)
+
+    def emit(self, response: FakeResponse) -> None:
+        for handler in self.handlers:
+            handler(response)
+
+def test_capture_takes_latest_matching_response():
+    network_capture = pytest.importorskip("parsers.network_capture")
+
+    async def run():
+        page = FakePage()
+        capture = network_capture.CatalogResponseCapture(page)
+        api = "https://lenta.com/api-gateway/v1/catalog/items?page=2"
+        page.emit(FakeResponse("https://lenta.com/api-gateway/v1/catalog/items?page=1", load("data_items.json")))
+        page.emit(FakeResponse(api, load("items.json")))
+        # Не совпадающие с шаблоном, неуспешные и нечитаемые ответы пропускаются
+        page.emit(FakeResponse("https://lenta.com/api-gateway/v1/catalog/categories", {"items": [{"name": "Категория"}]}))
+        page.emit(FakeResponse(api, {"items": [{"name": "Ошибка"}]}, ok=False))
+        page.emit(FakeResponse(api, ValueError("not json")))
+        records = await capture.take_records(timeout=1, settle=0.05)
+        assert len(records) == 4 and records[0]["price_value"] == 8999
+        with pytest.raises(asyncio.TimeoutError):
+            await capture.take_records(timeout=0.05)
+
+    asyncio.run(run())
+
+@pytest.mark.parametrize("payload, page_items, pages", [
+    (load("data_items.json"), 1, 7),
+    ({"items": [], "pagination": {"totalPages": "4"}}, 0, 4),
+    ({"items": [], "total": 95, "limit": 40}, 40, 3),
+    ({"items": [], "totalCount": 80}, 40, 2),
+    ({"items": [], "meta": {"total": 0, "limit": 40}}, 0, 1),
+    ({"items": [], "pages": True, "total": 41, "pageSize": 40}, 40, 2),
+    ({"items": []}, 40, None),
+    ([], 0, None),
+])
+def test_page_count(payload, page_items, pages):
+    assert decode_page_count(payload, page_items) == pages
@@ -0,0 +1,194 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from playwright.async_api import Error as PlaywrightError
+
+from parsers.browser_pool import BrowserPool, BrowserLease, PooledBrowser, process_tree_rss
+
+class FakeContext:
+    def __init__(self, browser, settings):
+        self.browser = browser
+        self.settings = settings
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+        self.browser.contexts.remove(self)
+
+class FakeCDPSession:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def send(self, method, params=None):
+        self.browser.cdp_calls.append((method, params))
+        if self.browser.fail_reset:
+            raise PlaywrightError("Target closed")
+        if method == "Target.getBrowserContexts":
+            return {"browserContextIds": list(self.browser.leftover)}
+        if method == "Target.disposeBrowserContext":
+            self.browser.leftover.remove(params["browserContextId"])
+        return {}
+
+    async def detach(self):
+        pass
+
+class FakeBrowser:
+    """Browser of the pool process and the view of the same browser from the leasing client"""
+
+    def __init__(self):
+        self.contexts = []
+        self.leftover = []
+        self.cdp_calls = []
+        self.fail_reset = False
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **settings):
+        context = FakeContext(self, settings)
+        self.contexts.append(context)
+        return context
+
+    async def new_browser_cdp_session(self):
+        return FakeCDPSession(self)
+
+    async def close(self):
+        self.closed = True
+
+class FakePlaywright:
+    def __init__(self, browser):
+        self.chromium = self
+        self.browser = browser
+        self.cdp_urls = []
+
+    async def connect_over_cdp(self, url, timeout=None):
+        self.cdp_urls.append(url)
+        return self.browser
+
+def run_pool(test, size=1, **options):
+    """Run the test coroutine against a pool of fake browsers served on a free port"""
+    async def main():
+        pool = BrowserPool(size=size, max_rss_mb=0, **options)
+        browsers = [FakeBrowser() for _ in range(size)]
+        pool.idle = [PooledBrowser(slot, 9410 + slot, browser) for slot, browser in enumerate(browsers)]
+        relaunched = []
+
+        async def launch(slot):
+            browser = FakeBrowser()
+            relaunched.append(browser)
+            return PooledBrowser(slot, 9410 + slot, browser)
+
+        pool._launch = launch
+        server = await asyncio.start_server(pool._handle_client, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            await test(pool, port, browsers, relaunched)
+        finally:
+            server.close()
+            await server.wait_closed()
+    asyncio.run(main())
+
+async def wait_idle(pool, count):
+    for _ in range(100):
+        if len(pool.idle) == count and not pool._leased_slots:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"pool stats: {pool.stats}")
+
+def test_lease_contexts_closed_on_release():
+    async def test(pool, port, browsers, relaunched):
+        playwright = FakePlaywright(browsers[0])
+        lease = BrowserLease(port=port)
+        await lease.acquire(playwright)
+        assert lease.slot == 0 and playwright.cdp_urls == ["http://127.0.0.1:9410"]
+        assert pool.stats["leased"] == 1 and pool.stats["idle"] == 0
+        first = await lease.new_context(locale="ru-RU")
+        second = await lease.new_context(storage_state={"cookies": []})
+        assert first.settings == {"locale": "ru-RU"}
+        await lease.release()
+        assert first.closed and second.closed and not browsers[0].contexts
+        await wait_idle(pool, 1)
+        assert pool.stats["leases"] == 1
+        # При возврате пул сбрасывает контексты браузера через CDP
+        assert ("Storage.clearCookies", None) in browsers[0].cdp_calls
+    run_pool(test)
+
+def test_crashed_client_contexts_disposed():
+    async def test(pool, port, browsers, relaunched):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b'{"op": "lease"}\n')
+        await writer.drain()
+        assert json.loads(await reader.readline())["slot"] == 0
+        # Клиент упал, не закрыв свои контексты
+        browsers[0].leftover = ["ctx-1", "ctx-2"]
+        writer.close()
+        await wait_idle(pool, 1)
+        assert browsers[0].leftover == []
+        assert pool.idle[0].browser is browsers[0] and not relaunched
+    run_pool(test)
+
+def test_failed_reset_recycles_browser():
+    async def test(pool, port, browsers, relaunched):
+        browsers[0].fail_reset = True
+        lease = BrowserLease(port=port)
+        await lease.acquire(FakePlaywright(browsers[0]))
+        await lease.release()
+        await wait_idle(pool, 1)
+        assert pool.idle[0].browser is relaunched[0]
+        assert pool.stats["recycled"] == 1 and browsers[0].closed
+    run_pool(test)
+
+def test_use_limit_recycles_browser():
+    async def test(pool, port, browsers, relaunched):
+        for _ in range(3):
+            lease = BrowserLease(port=port)
+            await lease.acquire(FakePlaywright(pool.idle[0].browser))
+            await lease.release()
+            await wait_idle(pool, 1)
+        assert len(relaunched) == 1 and pool.idle[0].uses == 1
+    run_pool(test, max_uses=2)
+
+def test_leases_wait_for_free_browser():
+    async def test(pool, port, browsers, relaunched):
+        first = BrowserLease(port=port)
+        await first.acquire(FakePlaywright(browsers[0]))
+        second = BrowserLease(port=port)
+        waiting = asyncio.ensure_future(second.acquire(FakePlaywright(browsers[0])))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        await first.release()
+        await asyncio.wait_for(waiting, 1)
+        assert second.slot == 0
+        await second.release()
+        await wait_idle(pool, 1)
+        assert pool.stats["leases"] == 2
+    run_pool(test)
+
+def test_unsupported_request_and_stats():
+    async def test(pool, port, browsers, relaunched):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b'{"op": "stats"}\n{"op": "reboot"}\n')
+        await writer.drain()
+        assert json.loads(await reader.readline()) == {"size": 1, "idle": 1, "leased": 0, "leases": 0, "recycled": 0}
+        assert "error" in json.loads(await reader.readline())
+        writer.close()
+    run_pool(test)
+
+def test_pool_not_running():
+    async def main():
+        server = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        with pytest.raises(OSError):
+            await BrowserLease(port=port).acquire(FakePlaywright(FakeBrowser()), timeout=1)
+    asyncio.run(main())
+
+def test_process_tree_rss_unknown_port():
+    assert process_tree_rss(1) is None
@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("playwright.async_api")
+pytest.importorskip("aiohttp")
+from playwright.async_api import async_playwright, Error as PlaywrightError
+
+from config.selectors import SELECTORS
+from parsers.lenta_parser import AsyncLentaProductParse, READY_SCRIPT, browser_launch_settings
+
+CARD = """<div class="lu-grid__item ng-star-inserted"{style}><div class="lu-product-card">
+<img class="lu-product-card-image" src="/{idx}.png" width="{size}" height="{size}" alt="">
+<div class="card-name"><span class="card-name_content"{name_style}>Пиво светлое {idx}</span><p class="card-name_package">0,5 л</p></div>
+<div class="card-prices"><span class="main-price __accent"{price_style}>99,90 ₽</span></div>
+</div></div>"""
+
+# Случаи, где проверки видимости расходятся: fixed-контейнер, visibility, display: contents, нулевой размер
+CASES = [
+    {},
+    {"style": ' style="position: fixed; top: 0; left: 0"'},
+    {"name_style": ' style="visibility: hidden"'},
+    {"style": ' style="visibility: hidden"', "name_style": ' style="visibility: visible"'},
+    {"price_style": ' style="display: none"'},
+    {"name_style": ' style="display: contents"'},
+    {"price_style": ' style="display: contents"><i></i><span style="display: none'},
+    {"size": 0},
+    {"name_style": ' style="opacity: 0"'},
+    {"name_style": ' style="content-visibility: hidden"'},
+]
+
+def render(cases) -> str:
+    cards = "".join(
+        CARD.format(idx=idx, style=case.get("style", ""), size=case.get("size", 160),
+                    name_style=case.get("name_style", ""), price_style=case.get("price_style", ""))
+        for idx, case in enumerate(cases)
+    )
+    return f'<html><body><div class="lu-grid">{cards}</div></body></html>'
+
+async def in_page(content: str, action):
+    """Run the action on a Chromium page with the given content"""
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch(**browser_launch_settings())
+        except PlaywrightError as e:
+            pytest.skip(f"Chromium is not available: {e}")
+        async with browser:
+            page = await browser.new_page()
+            await page.set_content(content)
+            return await action(page)
+
+async def extract_both():
+    parser = AsyncLentaProductParse("test", use_session_cache=False)
+
+    async def extract(page):
+        return await parser._extract_cards(page), await parser._extract_cards_per_element(page, 1)
+    return await in_page(render(CASES), extract)
+
+def wait_ready(content: str, timeout_ms: int = 3000, stale=None):
+    async def wait(page):
+        return await page.evaluate(READY_SCRIPT, {
+            "item": SELECTORS["product_item"],
+            "name": SELECTORS["product_name"],
+            "quietMs": 100,
+            "timeoutMs": timeout_ms,
+            "stale": stale,
+        })
+    return asyncio.run(in_page(content, wait))
+
+# Карточки дорисовываются скриптом страницы после загрузки, как у ленивой сетки каталога
+DELAYED = """<html><body><div class="lu-grid"></div><script>
+setTimeout(() => {{ document.querySelector('.lu-grid').innerHTML = {cards}; }}, {delay});
+</script></body></html>"""
+
+def test_batch_visibility_matches_is_visible():
+    """The one-round-trip extraction treats every card like the per-element is_visible path"""
+    batch, per_element = asyncio.run(extract_both())
+    assert len(batch) == len(CASES)
+    assert batch == per_element
+
+def test_ready_after_cards_are_added():
+    """The observer reports ready once the late cards are rendered and stop changing"""
+    cards = render(CASES[:3]).split('<div class="lu-grid">', 1)[1].rsplit("</div></body>", 1)[0]
+    result = wait_ready(DELAYED.format(cards=json.dumps(cards), delay=300))
+    assert result["ready"] is True
+    assert result["cards"] == 3
+    # Готовность объявляется не раньше периода тишины после последнего изменения
+    assert result["elapsed"] >= 100
+    assert result["signature"].startswith("3|")
+
+def test_stale_grid_is_not_ready():
+    """The previous page's grid with the stale signature only ends in the timeout"""
+    first = wait_ready(render(CASES[:2]))
+    assert first["ready"] is True
+    result = wait_ready(render(CASES[:2]), timeout_ms=500, stale=first["signature"])
+    assert result["ready"] is False
+    assert result["cards"] == 2
+    assert result["elapsed"] >= 450
+
+def test_timeout_with_unrendered_cards():
+    """Cards without names never settle; the wait gives up after the timeout with the cards found"""
+    content = render([{}, {}]).replace("Пиво светлое 1", "")
+    result = wait_ready(content, timeout_ms=500)
+    assert result["ready"] is False
+    assert result["cards"] == 2
+    assert result["elapsed"] >= 450
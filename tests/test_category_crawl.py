@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("playwright.async_api")
+pytest.importorskip("aiohttp")
+from playwright.async_api import async_playwright, Error as PlaywrightError
+
+import parsers.lenta_parser as lenta_parser
+from benchmarks.mock_store import MockStorefront
+
+ADDRESS = "Москва, Тестовая ул., 1"
+PAGES = 3
+PAGE_SIZE = 6
+TABS = 2
+
+@pytest.fixture(scope="module")
+def chromium():
+    async def launch():
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(**lenta_parser.browser_launch_settings())
+            await browser.close()
+    try:
+        asyncio.run(launch())
+    except PlaywrightError as e:
+        pytest.skip(f"Chromium is not available: {e}")
+
+@pytest.fixture
+def storefront(monkeypatch):
+    with MockStorefront(total_pages=PAGES, page_size=PAGE_SIZE, categories=("pivo", "sidr", "medovuha")) as storefront:
+        monkeypatch.setattr(lenta_parser, "BASE_URL", storefront.url)
+        yield storefront
+
+class TabCounter(lenta_parser.AsyncLentaProductParse):
+    """Parser recording how many pages are extracted at once"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.active = 0
+        self.max_active = 0
+
+    async def _extract_cards(self, page):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            # Задержка дает остальным вкладкам шанс пересечься с этой
+            await asyncio.sleep(0.05)
+            return await super()._extract_cards(page)
+        finally:
+            self.active -= 1
+
+def test_categories_crawled_concurrently_within_tab_limit(chromium, storefront):
+    parser = TabCounter(
+        ADDRESS, page_concurrency=TABS, use_session_cache=False, use_browser_pool=False,
+        engine="dom", batch_extraction=True, normalize_workers=0, categories=["beer", "cider", "mead"]
+    )
+    catalog = asyncio.run(parser.parse())
+    assert catalog is not None
+    assert parser.failed_pages == []
+    assert sorted(product.name for product in catalog) == sorted(storefront.names)
+    assert {product.category for product in catalog} == {"beer", "cider", "mead"}
+    assert 1 < parser.max_active <= TABS
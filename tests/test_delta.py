@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from models.product import Product
+from models.page_key import PageKey
+from storage.results_db import ResultsDB
+from utils.delta import DeltaTracker, load_snapshot
+from utils.result_writer import write_results_json
+
+ADDRESS = "Москва, Ленинский пр-т, 1"
+BASE_TS = "20250101_100000"
+DELTA_TS = "20250102_100000"
+
+def beer(name, price_kopecks, **fields):
+    return Product.from_dict({
+        "name": name, "type": "Пиво", "volume": "0,45 л", "price_kopecks": price_kopecks,
+        "image": f"/img/{name}.png", "category": "Пиво", **fields
+    })
+
+def write_base(directory, timestamp, products):
+    path = directory / f"lenta_products_{ADDRESS.replace(',', '_')}_{timestamp}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        write_results_json(f, ADDRESS, timestamp, products, [])
+    return path
+
+def write_delta(directory, timestamp, page_products):
+    tracker = DeltaTracker(ADDRESS, results_dir=directory)
+    for page_number, products in enumerate(page_products, 1):
+        tracker.observe_page(PageKey("beer", page_number), products)
+    delta = tracker.build()
+    delta["timestamp"] = timestamp
+    path = directory / f"lenta_delta_{ADDRESS.replace(',', '_')}_{timestamp}.json"
+    path.write_text(json.dumps(delta, ensure_ascii=False), encoding="utf-8")
+    return path
+
+@pytest.fixture
+def results(tmp_path):
+    """Full results file and a later delta: price change, new product, removed product"""
+    write_base(tmp_path, BASE_TS, [
+        beer("Жигулевское", 5990, product_id="p1", image_path="cache/images/aa/bb/1.png"),
+        beer("Охота", 7990, product_id="p2"),
+        beer("Essa", 9990, product_id="p3"),
+    ])
+    write_delta(tmp_path, DELTA_TS, [[beer("Жигулевское", 6490), beer("Охота", 7990), beer("Балтика", 6990)]])
+    return tmp_path
+
+def test_snapshot_applies_delta(results):
+    timestamp, snapshot = load_snapshot(ADDRESS, results, full=True)
+    assert timestamp == DELTA_TS
+    records = {record["name"]: record for record in snapshot.values()}
+    assert {name: record["price_kopecks"] for name, record in records.items()} == {
+        "Жигулевское": 6490, "Охота": 7990, "Балтика": 6990
+    }
+    # Измененная дельтой запись сохраняет идентификатор и путь к изображению
+    assert records["Жигулевское"]["product_id"] == "p1"
+    assert records["Жигулевское"]["image_path"] == "cache/images/aa/bb/1.png"
+    assert records["Балтика"].get("product_id") is None
+
+    base_timestamp, base = load_snapshot(ADDRESS, results, until=BASE_TS)
+    assert base_timestamp == BASE_TS and len(base) == 3
+    assert "product_id" not in next(iter(base.values()))
+
+def test_ranking_reads_deltas(results):
+    pytest.importorskip("numpy")
+    from analysis.ranking import latest_results, load_latest_catalogs
+
+    catalogs = load_latest_catalogs(results)
+    assert sorted(product["name"] for product in catalogs[ADDRESS]) == ["Балтика", "Жигулевское", "Охота"]
+    assert latest_results(results)[ADDRESS]["timestamp"] == DELTA_TS
+
+def test_results_db_reads_deltas(results):
+    with ResultsDB(results / "results.sqlite3") as db:
+        assert db.ingest_dir(results) == 2
+        latest = {row["name"]: row["price_kopecks"] for row in db.latest_prices("", ADDRESS)}
+        assert latest == {"Жигулевское": 6490, "Охота": 7990, "Балтика": 6990, "Essa": 9990}
+        history = [row["price_kopecks"] for row in db.price_history("жигулевское")]
+        assert history == [5990, 6490]
+        assert db.ingest_dir(results) == 0
+
+        # Полный файл того же времени, что и дельта (например, с product_id), заменяет запуск дельты
+        timestamp, snapshot = load_snapshot(ADDRESS, results, full=True)
+        write_base(results, timestamp, [Product.from_dict(record) for record in snapshot.values()])
+        assert db.ingest_dir(results) == 1
+        assert db.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 2
+        assert db.ingest_dir(results) == 0
+        assert [row["price_kopecks"] for row in db.price_history("жигулевское")] == [5990, 6490]
+
+def test_early_stop_per_category(tmp_path):
+    """Unchanged pages stop only their own category; keys of different categories never form one run"""
+    pages = {(category, page): [beer(f"{category}-{page}-{n}", 5990, category=category) for n in range(2)]
+             for category in ("beer", "cider") for page in range(1, 6)}
+    write_base(tmp_path, BASE_TS, [product for page in sorted(pages) for product in pages[page]])
+    tracker = DeltaTracker(ADDRESS, unchanged_pages=2, results_dir=tmp_path)
+    # Последняя страница первой категории и первая страница второй не образуют окна
+    for key in (PageKey("beer", 5), PageKey("cider", 1)):
+        assert tracker.observe_page(key, pages[key])
+    assert tracker.stop_pages == {}
+    for key in (PageKey("cider", 3), PageKey("cider", 2)):
+        tracker.observe_page(key, pages[key])
+    assert tracker.stop_pages == {"cider": 2}
+    assert tracker.past_stop(PageKey("cider", 3)) and not tracker.past_stop(PageKey("beer", 3))
+    assert tracker.build()["stopped_at_pages"] == [("cider", 2)]
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from analysis.entity_resolution import EntityResolver, numbers, normalize_name, save_product_ids
+from analysis.ranking import latest_results
+
+def beer(name, volume="0,45 л", abv=4.5, **fields):
+    return {"name": name, "type": "Пиво", "volume": volume, "alcohol_percentage": abv, "price_kopecks": 9999, **fields}
+
+def ids(products):
+    return [product["product_id"] for product in products]
+
+def test_name_variants_merge():
+    products = [beer("BALTIKA №7 Экспортное 0 45л"), beer("Baltika №7 Экспортное"), beer("BALTIKA № 7 Экспортноe")]
+    EntityResolver().resolve(products)
+    assert len(set(ids(products))) == 1
+
+@pytest.mark.parametrize("a, b", [
+    ("BALTIKA №9 Крепкое", "BALTIKA №7 Крепкое"),
+    ("Жигули Барное 1978", "Жигули Барное 1987"),
+    ("Охота Крепкое 8", "Охота Крепкое"),
+])
+def test_different_numbers_do_not_merge(a, b):
+    products = [beer(a), beer(b)]
+    EntityResolver(threshold=0.1).resolve(products)
+    assert ids(products)[0] != ids(products)[1]
+
+@pytest.mark.parametrize("other", [beer("Жигулевское Барное", volume="0,5 л"), beer("Жигулевское Барное", abv=5.0), beer("Жигулевское Барное", abv=None)])
+def test_volume_and_abv_must_match(other):
+    products = [beer("Жигулевское Барное"), other]
+    EntityResolver(threshold=0.1).resolve(products)
+    assert ids(products)[0] != ids(products)[1]
+
+def test_numbers():
+    assert numbers(normalize_name("BALTIKA №7 Экспортное 0 45л")) == ["7"]
+    assert numbers("1978 №3") == numbers("№3 1978")
+
+def test_ids_persisted_to_results(tmp_path):
+    for address, name in (("Москва", "BALTIKA №7 Экспортное"), ("Казань", "Baltika №7 экспортное")):
+        path = tmp_path / f"lenta_products_{address}_20250101_100000.json"
+        path.write_text(json.dumps({
+            "address": address, "timestamp": "20250101_100000", "failed_pages": [3], "products": [beer(name)]
+        }, ensure_ascii=False), encoding="utf-8")
+    results = latest_results(tmp_path)
+    EntityResolver().resolve_catalogs({address: data["products"] for address, data in results.items()})
+    save_product_ids(results, tmp_path)
+
+    reread = latest_results(tmp_path)
+    assert sorted(reread) == ["Казань", "Москва"]
+    product_ids = {data["products"][0]["product_id"] for data in reread.values()}
+    assert len(product_ids) == 1 and None not in product_ids
+    assert reread["Москва"]["failed_pages"] == [3]
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+http_engine = pytest.importorskip("parsers.http_engine")
+
+from benchmarks.mock_store import MockStorefront
+from utils.result_writer import NDJSONResultSink
+from utils.session_cache import SessionCache
+
+ADDRESS = "Москва, Тестовая ул., 1"
+PAGES = 3
+PAGE_SIZE = 12
+
+def run_parser(storefront: MockStorefront, tmp_path, prefix: str, categories=("beer", "cider")):
+    """Parse the mock store over HTTP with a cached session pointing at its catalogs"""
+    cache = SessionCache(tmp_path / "sessions")
+    cache.save(ADDRESS, {"cookies": [{"name": "store", "value": "1", "domain": "127.0.0.1"}]}, category_urls={
+        "beer": f"{storefront.url}{prefix}/pivo",
+        "cider": f"{storefront.url}{prefix}/sidr",
+    })
+    sink = NDJSONResultSink(ADDRESS, results_dir=tmp_path / "results")
+    parser = http_engine.HttpLentaProductParse(ADDRESS, page_concurrency=4, sink=sink, categories=list(categories))
+    parser.session_cache = cache
+    return parser, sink, asyncio.run(parser.parse())
+
+@pytest.fixture
+def storefront():
+    with MockStorefront(total_pages=PAGES, page_size=PAGE_SIZE, categories=("pivo", "sidr")) as storefront:
+        yield storefront
+
+@pytest.mark.parametrize("prefix", ["/catalog", "/api/catalog"], ids=["html", "json"])
+def test_all_pages_of_all_categories(storefront, tmp_path, prefix):
+    parser, sink, catalog = run_parser(storefront, tmp_path, prefix)
+
+    assert catalog is not None and not parser.failed_pages
+    assert len(catalog) == 2 * PAGES * PAGE_SIZE
+    assert [product.category for product in catalog] == ["beer"] * PAGES * PAGE_SIZE + ["cider"] * PAGES * PAGE_SIZE
+    assert all(product.price_kopecks and product.volume_ml for product in catalog)
+    assert sink.read_checkpoint()["completed"]
+    assert len(sink.read_checkpoint()["completed_pages"]) == 2 * PAGES
+
+def test_html_and_json_agree(storefront, tmp_path):
+    _, _, html = run_parser(storefront, tmp_path / "html", "/catalog")
+    _, _, api = run_parser(storefront, tmp_path / "json", "/api/catalog")
+    assert [product.to_dict() for product in html] == [product.to_dict() for product in api]
+
+def test_missing_category_page_is_reported(storefront, tmp_path):
+    # Категории нет в магазине: ошибка ее первой страницы, остальные категории разбираются
+    storefront.catalogs.pop("sidr")
+    parser, sink, catalog = run_parser(storefront, tmp_path, "/catalog")
+    assert len(catalog) == PAGES * PAGE_SIZE
+    assert len(parser.failed_pages) == 1
+    assert not sink.read_checkpoint()["completed"]
@@ -0,0 +1,81 @@
+import asyncio
+import hashlib
+import sqlite3
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from benchmarks.mock_store import MockStorefront, IMAGE_VARIANTS
+from models.product import Product
+from utils.image_cache import ImageFetcher
+
+PAGE_SIZE = 4
+
+@pytest.fixture
+def storefront():
+    with MockStorefront(total_pages=1, page_size=PAGE_SIZE) as storefront:
+        yield storefront
+
+def fetch(fetcher: ImageFetcher, *images):
+    async def run():
+        try:
+            return await asyncio.gather(*(fetcher.fetch(image) for image in images))
+        finally:
+            await fetcher.close()
+    return asyncio.run(run())
+
+def test_same_url_downloaded_once(storefront, tmp_path):
+    fetcher = ImageFetcher(tmp_path / "images", base_url=storefront.url)
+    paths = fetch(fetcher, "/images/1-0.png", "/images/1-0.png", "/images/1-0.png")
+    assert len(set(paths)) == 1
+    assert storefront.image_requests == 1
+    assert fetcher.downloaded == 1
+
+def test_same_content_stored_once(storefront, tmp_path):
+    """Different URLs serving identical bytes share one file"""
+    fetcher = ImageFetcher(tmp_path / "images", base_url=storefront.url)
+    # Содержимое картинок повторяется через IMAGE_VARIANTS карточек
+    paths = fetch(fetcher, "/images/1-0.png", f"/images/1-{IMAGE_VARIANTS}.png")
+    assert paths[0] == paths[1]
+    assert storefront.image_requests == 2
+    assert fetcher.duplicates == 1
+    assert len([path for path in (tmp_path / "images").rglob("*.png")]) == 1
+
+def test_cache_layout(storefront, tmp_path):
+    cache_dir = tmp_path / "images"
+    fetcher = ImageFetcher(cache_dir, base_url=storefront.url)
+    path, = fetch(fetcher, "/images/1-1.png")
+    digest = hashlib.sha256(storefront.images[(PAGE_SIZE + 1) % IMAGE_VARIANTS]).hexdigest()
+    expected = cache_dir / digest[:2] / digest[2:4] / f"{digest}.png"
+    assert path == str(expected)
+    assert expected.read_bytes() == storefront.images[(PAGE_SIZE + 1) % IMAGE_VARIANTS]
+    assert not list(cache_dir.rglob("*.tmp"))
+    with sqlite3.connect(cache_dir / "index.sqlite3") as conn:
+        row = conn.execute("SELECT digest, path FROM urls WHERE url = ?", (f"{storefront.url}/images/1-1.png",)).fetchone()
+    assert row == (digest, str(expected.relative_to(cache_dir)))
+
+def test_known_urls_cached_and_revalidated(storefront, tmp_path):
+    cache_dir = tmp_path / "images"
+    fetch(ImageFetcher(cache_dir, base_url=storefront.url), "/images/1-2.png")
+    cached = ImageFetcher(cache_dir, base_url=storefront.url)
+    fetch(cached, "/images/1-2.png")
+    assert (cached.hits, storefront.image_requests) == (1, 1)
+
+    stale = ImageFetcher(cache_dir, revalidate_hours=0, base_url=storefront.url)
+    fetch(stale, "/images/1-2.png")
+    assert stale.revalidated == 1
+    assert storefront.not_modified == 1
+
+def test_fetch_products_records_paths(storefront, tmp_path):
+    fetcher = ImageFetcher(tmp_path / "images", base_url=storefront.url)
+    products = [Product(name="Жигулевское", type="Пиво", image="/images/1-3.png"), Product(name="Охота", type="Пиво", image=None)]
+
+    async def run():
+        try:
+            await fetcher.fetch_products(products)
+        finally:
+            await fetcher.close()
+    asyncio.run(run())
+    assert products[0].image_path.endswith(".png")
+    assert products[1].image_path is None
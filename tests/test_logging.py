@@ -0,0 +1,73 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
+
+import utils.logging as log_utils
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+def log_from_worker(message):
+    logging.getLogger("LentaParser.worker").warning("worker says %s", message)
+    return len(logging.getLogger().handlers)
+
+def test_pool_worker_records_reach_parent_handlers(monkeypatch):
+    """Records logged in process pool workers are emitted by the handlers of the parent process"""
+    target = ListHandler()
+    monkeypatch.setattr(log_utils, "_targets", [target])
+    monkeypatch.setattr(log_utils, "_listener", None)
+    monkeypatch.setattr(log_utils, "_worker_queue", None)
+    monkeypatch.setattr(log_utils, "_worker_listener", None)
+    log_queue = log_utils.worker_log_queue()
+    assert log_queue is not None
+    assert log_utils.worker_log_queue() is log_queue
+    try:
+        with ProcessPoolExecutor(
+            max_workers=2, initializer=log_utils.init_worker_logging, initargs=(log_queue,)
+        ) as executor:
+            handler_counts = list(executor.map(log_from_worker, ["a", "b", "c"]))
+    finally:
+        log_utils.shutdown_logging()
+    # В процессе пула остается только обработчик очереди
+    assert handler_counts == [1, 1, 1]
+    assert sorted(record.getMessage() for record in target.records) == [
+        "worker says a", "worker says b", "worker says c"
+    ]
+    assert {record.name for record in target.records} == {"LentaParser.worker"}
+
+def test_worker_queue_requires_configured_logging(monkeypatch):
+    monkeypatch.setattr(log_utils, "_targets", [])
+    assert log_utils.worker_log_queue() is None
+    # Без очереди инициализатор ничего не меняет
+    handlers = list(logging.getLogger().handlers)
+    log_utils.init_worker_logging(None)
+    assert logging.getLogger().handlers == handlers
+
+def test_log_file_per_process_role(monkeypatch, tmp_path):
+    """Each process writes and rotates its own file named after its role"""
+    monkeypatch.setattr(log_utils, "log_dir_path", lambda: tmp_path)
+    monkeypatch.setattr(log_utils, "LOG_QUEUE", False)
+    monkeypatch.setattr(log_utils, "_handlers", [])
+    monkeypatch.setattr(log_utils, "_targets", [])
+    root = logging.getLogger()
+    previous = list(root.handlers)
+    try:
+        logger = log_utils.setup_logging("scheduler", role="scheduler")
+        # Последующие вызовы процесса файл не меняют
+        log_utils.setup_logging("Москва, Тестовая ул., 1").warning("store record")
+        logger.warning("scheduler record")
+        for handler in log_utils._targets:
+            handler.flush()
+    finally:
+        for handler in log_utils._handlers:
+            root.removeHandler(handler)
+            handler.close()
+        assert root.handlers == previous
+    assert [path.name for path in tmp_path.iterdir()] == [f"lenta_parser.scheduler.{os.getpid()}.log"]
+    text = (tmp_path / log_utils.log_file_name("scheduler")).read_text(encoding="utf-8")
+    assert "store record" in text and "scheduler record" in text
@@ -0,0 +1,50 @@
+import pytest
+
+from utils.metrics import NULL_METRICS, RunMetrics, prometheus_text
+
+def test_phase_timer_and_failures():
+    metrics = RunMetrics({"address": "A"})
+    with metrics.phase("page_goto"):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.phase("page_goto"):
+            raise ValueError("timeout")
+    stats = metrics.report()["phases"]["page_goto"]
+    assert stats["count"] == 2
+    assert 0 <= stats["min"] <= stats["max"]
+    # Исключение проходит дальше и учитывается отдельным счетчиком
+    assert metrics.counters == {"page_goto_failures": 1}
+
+def test_observe_and_count():
+    metrics = RunMetrics()
+    metrics.observe("page_ready", 0.5)
+    metrics.observe("page_ready", 0.1, count=3)
+    metrics.count("pages")
+    metrics.count("cards", 24)
+    metrics.count("cards", 12)
+    report = metrics.report()
+    assert report["phases"]["page_ready"] == {"count": 4, "total": 0.8, "min": 0.1, "max": 0.5, "mean": 0.2}
+    assert report["counters"] == {"cards": 36, "pages": 1}
+    assert list(report) == ["labels", "started_at", "phases", "counters"]
+
+def test_prometheus_text():
+    first = RunMetrics({"address": 'ул. "Тестовая", 1'})
+    first.observe("page_goto", 0.25)
+    first.count("pages", 2)
+    second = RunMetrics({"address": "B"})
+    second.count("pages", 1)
+    text = prometheus_text([first, second, NULL_METRICS])
+    lines = text.splitlines()
+    assert "# TYPE lenta_parser_phase_seconds summary" in lines
+    assert 'lenta_parser_phase_seconds_sum{address="ул. \\"Тестовая\\", 1",phase="page_goto"} 0.250000' in lines
+    assert 'lenta_parser_phase_seconds_count{address="ул. \\"Тестовая\\", 1",phase="page_goto"} 1' in lines
+    assert 'lenta_parser_events_total{address="B",event="pages"} 1' in lines
+    assert text.endswith("\n")
+    assert first.prometheus() == prometheus_text([first])
+
+def test_null_metrics():
+    with NULL_METRICS.phase("run"):
+        NULL_METRICS.count("pages")
+    assert NULL_METRICS.report() == {}
+    assert NULL_METRICS.prometheus() == ""
+    assert prometheus_text([NULL_METRICS]) == ""
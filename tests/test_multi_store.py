@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("playwright.async_api")
+pytest.importorskip("aiohttp")
+
+from models.product import Product
+from parsers import multi_store
+from parsers.multi_store import MultiStoreRunner, read_addresses
+from utils.metrics import NULL_METRICS
+
+def test_read_addresses(tmp_path):
+    path = tmp_path / "addresses.txt"
+    path.write_text(
+        "# магазины Москвы\n"
+        "Москва, Тестовая ул., 1\n"
+        "\n"
+        "   \n"
+        "  # отключен: Москва, Закрытая ул., 5\n"
+        "  Москва, Пробная ул., 2  \n",
+        encoding="utf-8"
+    )
+    assert read_addresses(path) == ["Москва, Тестовая ул., 1", "Москва, Пробная ул., 2"]
+
+class StubParser:
+    """Parser stand-in: fails on addresses starting with "сбой", returns None on "пусто" """
+    active = 0
+    max_active = 0
+    saved = []
+
+    def __init__(self, address, **options):
+        self.address = address
+        self.metrics = NULL_METRICS
+
+    async def parse_in_browser(self, browser):
+        StubParser.active += 1
+        StubParser.max_active = max(StubParser.max_active, StubParser.active)
+        try:
+            await asyncio.sleep(0.01)
+            if self.address.startswith("сбой"):
+                raise RuntimeError("browser context crashed")
+            if self.address.startswith("пусто"):
+                return None
+            return [Product(name=f"Пиво {self.address}", type="Пиво")]
+        finally:
+            StubParser.active -= 1
+
+    def _save_results(self, catalog, address):
+        StubParser.saved.append(address)
+
+class FakeBrowser:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+class FakePlaywright:
+    async def __aenter__(self):
+        async def launch(**settings):
+            return FakeBrowser()
+        return SimpleNamespace(chromium=SimpleNamespace(launch=launch))
+
+    async def __aexit__(self, *exc):
+        pass
+
+@pytest.fixture
+def stub_parser(monkeypatch):
+    StubParser.active = StubParser.max_active = 0
+    StubParser.saved = []
+    monkeypatch.setattr(multi_store, "AsyncLentaProductParse", StubParser)
+    monkeypatch.setattr(multi_store, "async_playwright", FakePlaywright)
+    return StubParser
+
+def test_failed_store_does_not_stop_others(stub_parser):
+    addresses = ["магазин 1", "сбой 2", "магазин 3", "пусто 4", "магазин 5", "магазин 1"]
+    runner = MultiStoreRunner(addresses, store_concurrency=2)
+    results = asyncio.run(runner.run())
+    # Повторный адрес парсится один раз
+    assert list(results) == ["магазин 1", "сбой 2", "магазин 3", "пусто 4", "магазин 5"]
+    assert results["сбой 2"] is None and results["пусто 4"] is None
+    assert [len(results[address]) for address in ("магазин 1", "магазин 3", "магазин 5")] == [1, 1, 1]
+    assert sorted(stub_parser.saved) == ["магазин 1", "магазин 3", "магазин 5"]
+    assert stub_parser.max_active == 2
+
+def test_results_not_saved_when_disabled(stub_parser):
+    results = asyncio.run(MultiStoreRunner(["магазин 1"], save_results=False).run())
+    assert results["магазин 1"] is not None
+    assert stub_parser.saved == []
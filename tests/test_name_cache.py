@@ -0,0 +1,24 @@
+from utils.name_cache import NameCache
+from utils.name_processor import NameProcessor
+
+NAMES = ["Пиво светлое Жигулевское 4,5% 0,5 л", "Пиво темное Охота крепкое 8% 0,45 л", "Напиток пивной Essa 6,5% 0,45 л"]
+
+def test_disk_store_round_trip(tmp_path):
+    path = tmp_path / "names.sqlite3"
+    cache = NameCache(maxsize=1, disk_path=path)
+    expected = cache.process_many(NAMES)
+    # LRU на одну запись: ранние названия читаются из еще не сброшенных результатов
+    assert cache.process_many(NAMES[:2]) == expected[:2]
+    assert cache.stats["misses"] == 3
+    cache.close()
+
+    reopened = NameCache(maxsize=1, disk_path=path)
+    assert reopened.process_many(NAMES) == expected
+    assert reopened.stats["misses"] == 0 and reopened.stats["disk_hits"] == 3
+    reopened.close()
+
+def test_results_match_processor(tmp_path):
+    cache = NameCache(disk_path=tmp_path / "names.sqlite3")
+    processor = NameProcessor()
+    assert cache.process_many(NAMES) == [processor.process(name) for name in NAMES]
+    cache.close()
@@ -0,0 +1,30 @@
+import json
+import re
+
+import pytest
+
+from conftest import DATA_DIR
+from config.product_types import PACKAGING_TYPES
+from utils.name_processor import NameProcessor, _WORD_CATEGORIES, process_product_name, process_many
+
+# Названия и результаты исходной (до предкомпиляции) реализации process_product_name
+with open(DATA_DIR / "name_golden.json", encoding="utf-8") as f:
+    GOLDEN = [(name, tuple(expected)) for name, expected in json.load(f)]
+
+@pytest.mark.parametrize("name, expected", GOLDEN, ids=range(len(GOLDEN)))
+def test_matches_baseline(name, expected):
+    assert process_product_name(name) == expected
+
+def test_process_many_matches_baseline():
+    names = [name for name, _ in GOLDEN]
+    assert process_many(names) == [expected for _, expected in GOLDEN]
+    assert NameProcessor().process_many(iter(names)) == [expected for _, expected in GOLDEN]
+
+def test_corpus_covers_every_table_key():
+    """Every attribute key and packaging type occurs in the golden corpus"""
+    text = "\n".join(name.lower() for name, _ in GOLDEN)
+    for category, table in _WORD_CATEGORIES:
+        for key in table:
+            assert re.search(rf"\b{key}[а-я]*\b", text), (category, key)
+    for key in PACKAGING_TYPES:
+        assert re.search(rf"\b{key}\b", text), key
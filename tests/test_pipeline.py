@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from models.page_key import PageKey
+from models.product import Product
+from parsers.pipeline import PagePipeline
+
+def records(page_number: PageKey, count: int = 2):
+    return [{"name": f"Пиво {page_number.category}-{page_number.page}-{idx}"} for idx in range(count)]
+
+class FakeHandler:
+    """Normalization stage recording the pages it builds"""
+
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.handled = []
+        self.processed = {}
+
+    def __call__(self, page_number, page_records, processed):
+        if page_number in self.fail_on:
+            raise ValueError(f"bad page {page_number}")
+        self.handled.append(page_number)
+        self.processed[page_number] = processed
+        return [Product(name=record["name"], type="Пиво") for record in page_records]
+
+def test_catalog_in_page_order():
+    """Pages queued out of order come back ordered by category and page"""
+    handler = FakeHandler()
+    keys = [PageKey("cider", 2), PageKey("beer", 3), PageKey("cider", 1), PageKey("beer", 1), PageKey("beer", 2)]
+
+    async def run():
+        async with PagePipeline(handler, workers=0) as pipeline:
+            for key in keys:
+                await pipeline.put(key, records(key))
+        return pipeline
+
+    pipeline = asyncio.run(run())
+    assert sorted(handler.handled) == sorted(keys)
+    assert [product.name for product in pipeline.catalog()] == [
+        name["name"] for key in sorted(keys) for name in records(key)
+    ]
+    assert pipeline.failed == []
+
+def test_full_queue_suspends_producer():
+    """With the queue full the next put waits until the consumer takes pages"""
+    events = []
+
+    def handle(page_number, page_records, processed):
+        events.append(("handle", page_number.page))
+        return []
+
+    async def run(queue_size):
+        events.clear()
+        async with PagePipeline(handle, workers=0, queue_size=queue_size) as pipeline:
+            for page in range(1, 6):
+                await pipeline.put(PageKey("beer", page), [])
+                events.append(("put", page))
+
+    asyncio.run(run(2))
+    # Третья страница встает в очередь только после того, как потребитель разобрал первые
+    assert events.index(("handle", 1)) < events.index(("put", 3))
+    assert events.index(("put", 2)) < events.index(("handle", 1))
+    asyncio.run(run(0))
+    assert events.index(("put", 5)) < events.index(("handle", 1))
+
+def test_failed_page_does_not_stop_others():
+    handler = FakeHandler(fail_on={PageKey("beer", 2)})
+
+    async def run():
+        async with PagePipeline(handler, workers=0) as pipeline:
+            for page in range(1, 4):
+                await pipeline.put(PageKey("beer", page), records(PageKey("beer", page)))
+        return pipeline
+
+    pipeline = asyncio.run(run())
+    assert handler.handled == [PageKey("beer", 1), PageKey("beer", 3)]
+    assert pipeline.failed == [(PageKey("beer", 2), "bad page beer:2")]
+    assert len(pipeline.catalog()) == 4
+
+def test_cancellation_aborts_consumers():
+    """Cancelling the producer stops consumers and the pool without draining the queue"""
+    handler = FakeHandler()
+    # Потребитель ждет пул процессов, пока производитель ставит страницы в очередь и отменяется
+    pipeline = PagePipeline(handler, workers=1, queue_size=4)
+    consumers = []
+
+    async def produce():
+        async with pipeline:
+            consumers.extend(pipeline._consumers)
+            for page in range(1, 4):
+                await pipeline.put(PageKey("beer", page), records(PageKey("beer", page)))
+            await asyncio.sleep(0)
+            asyncio.current_task().cancel()
+            await asyncio.sleep(0)
+
+    async def run():
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.ensure_future(produce())
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert consumers and all(consumer.cancelled() for consumer in consumers)
+    assert pipeline._consumers == [] and pipeline._executor is None
+    assert handler.handled == []
+
+def test_process_pool_normalizes_names():
+    """With workers the names of every page are normalized in the pool before the page is handled"""
+    handler = FakeHandler()
+    keys = [PageKey("beer", page) for page in range(1, 5)]
+
+    async def run():
+        async with PagePipeline(handler, workers=2, queue_size=1) as pipeline:
+            for key in keys:
+                await pipeline.put(key, records(key, 3))
+        return pipeline
+
+    pipeline = asyncio.run(run())
+    assert pipeline._executor is None
+    assert sorted(handler.handled) == keys
+    for key in keys:
+        assert len(handler.processed[key]) == 3
+    assert len(pipeline.catalog()) == 12
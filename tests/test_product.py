@@ -0,0 +1,28 @@
+import pytest
+
+from models.product import parse_price, parse_volume, format_price
+
+@pytest.mark.parametrize("separator", ["\u0020", "\u00a0", "\u202f", "\u2009", "\u2007", "\u2002", "\u3000"])
+def test_parse_price_thousands_separators(separator):
+    assert parse_price(f"1{separator}234,50 ₽") == 123450
+    assert parse_price(f"12{separator}345{separator}₽") == 1234500
+
+@pytest.mark.parametrize("value, kopecks", [
+    ("89,99 ₽", 8999),
+    ("89.9 ₽", 8990),
+    ("120 ₽", 12000),
+    ("  1 099,00 ₽\n", 109900),
+    ("", None),
+    (None, None),
+    ("Price not specified", None),
+])
+def test_parse_price(value, kopecks):
+    assert parse_price(value) == kopecks
+
+def test_format_price_round_trip():
+    for kopecks in (0, 5, 8999, 123450):
+        assert parse_price(format_price(kopecks)) == kopecks
+
+@pytest.mark.parametrize("value, ml", [("0,45 л", 450), ("450 мл", 450), ("1.5L", 1500), ("пиво", None)])
+def test_parse_volume(value, ml):
+    assert parse_volume(value) == ml
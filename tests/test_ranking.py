@@ -0,0 +1,86 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analysis.ranking import CatalogFrame, top_k_across
+
+def product(name, price_kopecks, volume="0,5 л", abv=4.5, **fields):
+    return {"name": name, "type": "Пиво", "volume": volume, "price_kopecks": price_kopecks,
+            "alcohol_percentage": abv, **fields}
+
+CATALOGS = {
+    "A": [
+        product("Жигулевское", 6000),
+        product("Балтика 7", 9000),
+        product("Охота Крепкое", 8000, abv=8.0),
+        product("Без цены", None),
+    ],
+    "B": [
+        product("Жигулевское", 5500),
+        product("Essa", 10000, "0,45 л"),
+        product("Балтика 7", 9000),
+    ],
+}
+
+@pytest.fixture(scope="module")
+def frame():
+    return CatalogFrame(CATALOGS)
+
+def ranked(frame, k, **options):
+    return [(row["store"], row["name"]) for row in frame.top_k(k, **options)]
+
+def brute_force(frame, k, by="price_per_litre", descending=False):
+    """Reference ranking: full stable sort, ties in row order"""
+    values = frame.column(by)
+    rows = [row for row in range(len(frame)) if not np.isnan(values[row])]
+    rows.sort(key=lambda row: -values[row] if descending else values[row])
+    return [(frame.stores[frame.store[row]], frame.names[row]) for row in rows[:k]]
+
+@pytest.mark.parametrize("k", [1, 2, 3, 4, 5, 6])
+@pytest.mark.parametrize("descending", [False, True])
+def test_top_k_matches_full_sort(frame, k, descending):
+    assert ranked(frame, k, descending=descending) == brute_force(frame, k, descending=descending)
+
+def test_ties_keep_row_order(frame):
+    # Балтика 7 стоит одинаково в обоих магазинах: при отсечении внутри равных остается первая строка
+    assert ranked(frame, 4) == [("B", "Жигулевское"), ("A", "Жигулевское"), ("A", "Охота Крепкое"), ("A", "Балтика 7")]
+    assert ranked(frame, 5)[-2:] == [("A", "Балтика 7"), ("B", "Балтика 7")]
+
+def test_ties_across_many_rows():
+    frame = CatalogFrame({"A": [product(f"Пиво {idx}", 5000 + 1000 * (idx % 3)) for idx in range(30)]})
+    for k in (1, 7, 10, 11, 25):
+        assert ranked(frame, k) == brute_force(frame, k)
+
+def test_k_beyond_frame_and_missing_values(frame):
+    # Товар без цены в рейтинг не попадает
+    assert len(frame.top_k(100)) == len(frame) - 1
+    assert ranked(frame, 100) == brute_force(frame, 100)
+    assert frame.top_k(0) == []
+
+def test_distinct_keeps_best_offer(frame):
+    assert ranked(frame, 10, distinct=True) == [
+        ("B", "Жигулевское"), ("A", "Охота Крепкое"), ("A", "Балтика 7"), ("B", "Essa")
+    ]
+
+def test_filters_and_price_per_alcohol(frame):
+    assert ranked(frame, 3, by="price_per_alcohol", stores=["A"]) == [
+        ("A", "Охота Крепкое"), ("A", "Жигулевское"), ("A", "Балтика 7")
+    ]
+    assert ranked(frame, 3, min_abv=6) == [("A", "Охота Крепкое")]
+
+@pytest.mark.parametrize("catalogs", [{}, {"A": []}])
+def test_empty_frame(catalogs):
+    frame = CatalogFrame(catalogs)
+    assert len(frame) == 0
+    assert frame.top_k(5) == []
+    assert frame.top_k(5, by="price", descending=True, distinct=True) == []
+    assert top_k_across([frame], 5) == []
+
+def test_top_k_across_shards(frame):
+    shards = [CatalogFrame({store: products}) for store, products in CATALOGS.items()]
+    merged = [(row["store"], row["name"]) for row in top_k_across(shards, 3)]
+    assert merged == ranked(frame, 3)
+
+def test_unknown_metric(frame):
+    with pytest.raises(ValueError):
+        frame.top_k(3, by="rating")
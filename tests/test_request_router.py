@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("playwright.async_api")
+
+from utils import request_router
+from utils.request_router import HostRateLimiter, ResourceRouter
+
+class FakeRoute:
+    def __init__(self, url: str, resource_type: str) -> None:
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.action = None
+
+    async def abort(self) -> None:
+        self.action = "abort"
+
+    async def continue_(self) -> None:
+        self.action = "continue"
+
+def route(router: ResourceRouter, url: str, resource_type: str) -> str:
+    fake = FakeRoute(url, resource_type)
+    asyncio.run(router._handle(fake))
+    return fake.action
+
+@pytest.mark.parametrize("profile, resource_type, action", [
+    ("none", "image", "continue"),
+    ("images", "image", "abort"),
+    ("images", "font", "abort"),
+    ("images", "stylesheet", "continue"),
+    ("images", "document", "continue"),
+    ("aggressive", "stylesheet", "abort"),
+    ("aggressive", "xhr", "continue"),
+])
+def test_resource_types_by_profile(profile, resource_type, action):
+    assert route(ResourceRouter(profile), "https://lenta.com/catalog/pivo", resource_type) == action
+
+@pytest.mark.parametrize("url, action", [
+    ("https://mc.yandex.ru/watch/1", "abort"),
+    ("https://www.googletagmanager.com/gtm.js", "abort"),
+    ("https://notvk.com/script.js", "continue"),
+    ("https://lenta.com/api/v1/catalog", "continue"),
+])
+def test_domain_blocklist(url, action):
+    assert route(ResourceRouter("images"), url, "script") == action
+    # Профиль none домены не блокирует
+    assert route(ResourceRouter("none"), url, "script") == "continue"
+
+def test_stats_count_decisions():
+    router = ResourceRouter("images")
+    for resource_type in ("image", "image", "font", "document"):
+        route(router, "https://lenta.com/", resource_type)
+    stats = router.stats
+    assert (stats["blocked"], stats["allowed"]) == (3, 1)
+    assert stats["blocked_by_type"] == {"image": 2, "font": 1}
+    assert stats["bytes_saved_estimate"] > 0
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        ResourceRouter("everything")
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Virtual time of the rate limiter: sleeping advances the clock instead of waiting"""
+    state = SimpleNamespace(now=100.0, sleeps=[])
+
+    async def sleep(delay):
+        state.sleeps.append(delay)
+        state.now += delay
+
+    monkeypatch.setattr(request_router, "time", SimpleNamespace(monotonic=lambda: state.now))
+    monkeypatch.setattr(request_router, "asyncio", SimpleNamespace(sleep=sleep))
+    return state
+
+def test_burst_then_rate(clock):
+    limiter = HostRateLimiter(rate=2, burst=3)
+
+    async def run():
+        for _ in range(5):
+            await limiter.acquire("lenta.com")
+    asyncio.run(run())
+    # Три запроса проходят сразу, следующие ждут по полсекунды
+    assert clock.sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+    assert limiter.waited == pytest.approx(1.0)
+    assert clock.now == pytest.approx(101.0)
+
+def test_buckets_per_host_and_refill(clock):
+    limiter = HostRateLimiter(rate=1)
+
+    async def run():
+        await limiter.acquire("lenta.com")
+        await limiter.acquire("api.lenta.com")
+        assert clock.sleeps == []
+        clock.now += 0.25
+        await limiter.acquire("lenta.com")
+    asyncio.run(run())
+    # Токен пополнился на четверть, оставшиеся три четверти выжидаются
+    assert clock.sleeps == [pytest.approx(0.75)]
+    assert limiter.waited == pytest.approx(0.75)
+
+def test_router_waits_only_for_site_requests(clock):
+    limiter = HostRateLimiter(rate=1)
+    router = ResourceRouter("none", limiter=limiter)
+    for resource_type in ("document", "script", "stylesheet", "xhr"):
+        assert route(router, "https://lenta.com/catalog", resource_type) == "continue"
+    assert limiter.waited == pytest.approx(1.0)
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        HostRateLimiter(rate=0)
@@ -0,0 +1,68 @@
+import json
+import sys
+
+import pytest
+
+from models.page_key import PageKey
+from models.product import Product
+from utils import result_writer
+from utils.result_writer import NDJSONResultSink, available_compressions
+
+ADDRESS = "Москва, Тестовая ул., 1"
+
+def beer(name):
+    return Product.from_dict({"name": name, "type": "Пиво", "volume": "0,5 л", "price_kopecks": 5990})
+
+def test_page_keys_survive_resume(tmp_path):
+    sink = NDJSONResultSink(ADDRESS, results_dir=tmp_path)
+    sink.write_page(PageKey("cider", 1), [beer("Сидр")])
+    sink.write_page(PageKey("beer", 2), [beer("Охота")])
+    sink.write_page(PageKey("beer", 1), [beer("Жигулевское")])
+    assert sink.read_checkpoint()["completed_pages"] == [["beer", 1], ["beer", 2], ["cider", 1]]
+
+    resumed = NDJSONResultSink(ADDRESS, resume=True, results_dir=tmp_path)
+    assert resumed.resumed and resumed.path == sink.path
+    assert resumed.completed_pages == {PageKey("beer", 1), PageKey("beer", 2), PageKey("cider", 1)}
+    assert PageKey("cider", 1) in resumed.completed_pages and PageKey("cider", 2) not in resumed.completed_pages
+    resumed.write_page(PageKey("cider", 2), [beer("Медовуха")])
+    assert [product.name for product in resumed.read_products()] == ["Жигулевское", "Охота", "Сидр", "Медовуха"]
+
+def test_legacy_page_numbers(tmp_path):
+    """Checkpoints and records written with plain page numbers belong to the beer catalog"""
+    sink = NDJSONResultSink(ADDRESS, results_dir=tmp_path)
+    with open(sink.path, "w", encoding="utf-8") as f:
+        f.write('{"page": 2, "name": "Охота", "type": "Пиво"}\n{"page": 1, "name": "Жигулевское", "type": "Пиво"}\n')
+    checkpoint = sink.read_checkpoint()
+    checkpoint.update(completed_pages=[1, 2], size=sink.path.stat().st_size, product_count=2)
+    sink.checkpoint_path.write_text(json.dumps(checkpoint), encoding="utf-8")
+
+    resumed = NDJSONResultSink(ADDRESS, resume=True, results_dir=tmp_path)
+    assert resumed.completed_pages == {PageKey("beer", 1), PageKey("beer", 2)}
+    resumed.write_page(PageKey("cider", 1), [beer("Сидр")])
+    assert [product.name for product in resumed.read_products()] == ["Жигулевское", "Охота", "Сидр"]
+
+def test_resume_with_other_categories(tmp_path):
+    """Pages saved for one category selection are not taken for pages of another"""
+    sink = NDJSONResultSink(ADDRESS, results_dir=tmp_path)
+    sink.write_page(PageKey("beer", 1), [beer("Жигулевское")])
+    # Прежний запуск обходил пиво, новый - только сидр: первая страница сидра еще не загружена
+    resumed = NDJSONResultSink(ADDRESS, resume=True, results_dir=tmp_path)
+    assert PageKey("cider", 1) not in resumed.completed_pages
+    resumed.write_page(PageKey("cider", 1), [beer("Сидр")])
+    assert [product.name for product in resumed.read_products()] == ["Жигулевское", "Сидр"]
+
+def test_page_key_format():
+    assert str(PageKey("cider", 12)) == "cider:12"
+    assert json.dumps(PageKey("cider", 12)) == '["cider", 12]'
+    assert PageKey.parse(["cider", 12]) == PageKey("cider", 12) and PageKey.parse(3) == PageKey("beer", 3)
+    assert sorted([PageKey("cider", 1), PageKey("beer", 10), PageKey("beer", 2)]) == [
+        ("beer", 2), ("beer", 10), ("cider", 1)
+    ]
+
+def test_zstd_offered_only_with_zstandard(monkeypatch, tmp_path):
+    # Модуль, записанный в sys.modules как None, не импортируется
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    monkeypatch.setattr(result_writer.importlib.util, "find_spec", lambda name: None)
+    assert available_compressions() == ["gzip"]
+    with pytest.raises(RuntimeError, match="zstandard"):
+        NDJSONResultSink("A", compression="zstd", results_dir=tmp_path)
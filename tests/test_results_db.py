@@ -0,0 +1,65 @@
+import json
+import sqlite3
+
+from storage.results_db import ResultsDB
+
+def write_results(path, address, timestamp, products):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"address": address, "timestamp": timestamp, "failed_pages": [], "products": products}, f, ensure_ascii=False)
+
+def product(name, price_kopecks, volume="0,5 л"):
+    return {"name": name, "type": "Пиво", "volume": volume, "price_kopecks": price_kopecks, "image": None}
+
+def test_bad_file_does_not_break_later_files(tmp_path):
+    """A rolled back file leaves no cached product ids pointing at rows that do not exist"""
+    # Первый товар файла вставляется, затем запись-строка откатывает транзакцию
+    write_results(tmp_path / "lenta_products_A_20250101_100000.json", "A", "20250101_100000", [
+        product("Жигулевское", 5990), "Охота", product("Охота", 7990),
+    ])
+    (tmp_path / "lenta_products_B_20250101_110000.json").write_text("{not json", encoding="utf-8")
+    write_results(tmp_path / "lenta_products_C_20250101_120000.json", "C", "20250101_120000", [
+        product("Жигулевское", 6490), product("Охота", 8490),
+    ])
+    with ResultsDB(tmp_path / "results.sqlite3") as db:
+        assert db.ingest_dir(tmp_path) == 1
+        prices = {row["name"]: row["price_kopecks"] for row in db.latest_prices("")}
+        assert prices == {"Жигулевское": 6490, "Охота": 8490}
+        assert db.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 1
+
+def test_reingest_changed_file(tmp_path):
+    path = tmp_path / "lenta_products_A_20250101_100000.json"
+    write_results(path, "A", "20250101_100000", [product("Жигулевское", 5990)])
+    with ResultsDB(tmp_path / "results.sqlite3") as db:
+        assert db.ingest_dir(tmp_path) == 1
+        assert db.ingest_dir(tmp_path) == 0
+        write_results(path, "A", "20250101_100000", [product("Жигулевское", 5990), product("Охота", 7990, "0,45 л")])
+        assert db.ingest_dir(tmp_path) == 1
+        assert len(db.price_history("")) == 2
+
+def test_image_path_stored_and_old_database_migrated(tmp_path):
+    """Local image paths reach the prices table, including databases created before the column"""
+    db_path = tmp_path / "results.sqlite3"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE prices (run_id INTEGER NOT NULL, product_id INTEGER NOT NULL, price_kopecks INTEGER, "
+        "image TEXT, PRIMARY KEY (run_id, product_id)) WITHOUT ROWID"
+    )
+    conn.close()
+    write_results(tmp_path / "lenta_products_A_20250101_100000.json", "A", "20250101_100000", [
+        {**product("Жигулевское", 5990), "image_path": "cache/images/ab/cd/abcd.png"},
+    ])
+    with ResultsDB(db_path) as db:
+        assert db.ingest_dir(tmp_path) == 1
+        assert [row["image_path"] for row in db.latest_prices("")] == ["cache/images/ab/cd/abcd.png"]
+
+def test_failed_reingest_keeps_previous_run(tmp_path):
+    """A changed file that fails to load leaves the earlier version of the run in place"""
+    path = tmp_path / "lenta_products_A_20250101_100000.json"
+    write_results(path, "A", "20250101_100000", [product("Жигулевское", 5990), product("Охота", 7990)])
+    with ResultsDB(tmp_path / "results.sqlite3") as db:
+        assert db.ingest_dir(tmp_path) == 1
+        write_results(path, "A", "20250101_100000", [product("Жигулевское", 6490), "Охота"])
+        assert db.ingest_dir(tmp_path) == 0
+        prices = {row["name"]: row["price_kopecks"] for row in db.latest_prices("")}
+        assert prices == {"Жигулевское": 5990, "Охота": 7990}
+        assert db.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 1
@@ -0,0 +1,136 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("playwright")
+pytest.importorskip("aiohttp")
+
+import parsers.scheduler as scheduler
+import utils.delta as delta_module
+from config.scheduler import SCHEDULER_REFRESH_HOURS, SCHEDULER_RETRY_BASE
+from models.page_key import PageKey
+from models.product import Product
+from parsers.scheduler import JobQueue, RefreshJob, RefreshScheduler
+from utils.delta import deltas_since_base, load_snapshot
+from utils.result_writer import write_results_json
+
+HOUR = 3600
+NOW = 1_750_000_000.0
+
+def test_staleness():
+    job = RefreshJob("A", "beer")
+    assert job.staleness(NOW) == float("inf") and job.due_at() == 0.0
+    job.last_success = NOW - SCHEDULER_REFRESH_HOURS * HOUR
+    job.change_rate = 0.0
+    assert job.staleness(NOW) == pytest.approx(1.0)
+    # Часто меняющийся каталог устаревает быстрее
+    job.change_rate = 1.0
+    assert job.staleness(NOW) > 1.0 and job.due_at() < NOW
+
+def test_ready_stalest_first_one_job_per_store(tmp_path):
+    queue = JobQueue(tmp_path / "state.json", ["A", "B", "C", "D"], ["beer", "cider"])
+    refresh = SCHEDULER_REFRESH_HOURS * HOUR
+    for key, age, change_rate in [
+        ("A|beer", 2 * refresh, 0.0), ("A|cider", 3 * refresh, 0.0),
+        ("B|beer", 1.5 * refresh, 0.0), ("B|cider", 1.5 * refresh, 1.0),
+        ("C|beer", 0.5 * refresh, 0.0), ("C|cider", 0.5 * refresh, 0.0),
+    ]:
+        job = queue.jobs[key]
+        job.last_success, job.change_rate = NOW - age, change_rate
+    # D никогда не обновлялся, его задания идут первыми; C еще не устарел
+    ready = [job.key for job in queue.ready(NOW, set(), set())]
+    assert ready[0].startswith("D|") and ready[1:] == ["B|cider", "A|cider"]
+    assert [job.key for job in queue.ready(NOW, {"B|cider"}, {"D"})] == ["A|cider", "B|beer"]
+
+    queue.jobs["A|cider"].next_attempt = NOW + 60
+    assert [job.key for job in queue.ready(NOW, set(), {"B", "D"})] == ["A|beer"]
+    assert queue.next_wakeup() == 0.0
+
+class FakeParser:
+    """Stands in for the browser parser: returns queued catalogs and writes the delta like the real one"""
+    outcomes = []
+
+    def __init__(self, address, categories, delta, rate_limiter, **options):
+        self.address = address
+        self.delta = delta
+        self.failed_pages = []
+
+    async def parse_in_browser(self, browser):
+        catalog = FakeParser.outcomes.pop(0)
+        if catalog is not None and self.delta is not None:
+            self.delta.observe_page(PageKey("beer", 1), catalog)
+            self.delta.write()
+        return catalog
+
+    def _save_results(self, catalog, address):
+        path = delta_module.results_path() / f"lenta_products_{address}_20250101_000000.json"
+        with open(path, "w", encoding="utf-8") as f:
+            write_results_json(f, address, "20250101_000000", catalog, [])
+
+def beers(price_kopecks):
+    return [Product.from_dict({"name": name, "type": "Пиво", "volume": "0,5 л", "price_kopecks": price_kopecks, "category": "beer"})
+            for name in ("Жигулевское", "Охота")]
+
+@pytest.fixture
+def results_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(delta_module, "results_path", lambda: tmp_path)
+    monkeypatch.setattr(scheduler, "AsyncLentaProductParse", FakeParser)
+    # Дельты одного теста пишутся в разные секунды
+    times = iter(datetime(2025, 1, 2) + timedelta(hours=n) for n in range(100))
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return next(times)
+
+    monkeypatch.setattr(delta_module, "datetime", Clock)
+    FakeParser.outcomes = []
+    return tmp_path
+
+def test_failed_job_requeued_with_backoff(results_dir):
+    refresher = RefreshScheduler(["A"], ["beer"], state_path=results_dir / "state.json")
+    job = refresher.queue.jobs["A|beer"]
+    FakeParser.outcomes = [None, None, beers(5990)]
+
+    asyncio.run(refresher._run_job(None, job))
+    assert job.failures == 1 and job.last_error == "parser failed" and job.runs == 0
+    delay = job.next_attempt - job.last_attempt
+    assert 0.8 * SCHEDULER_RETRY_BASE - 1 <= delay <= 1.2 * SCHEDULER_RETRY_BASE + 1
+    # До срока повтора задание не выдается, даже если данных нет
+    assert refresher.queue.ready(job.last_attempt, set(), set()) == []
+    assert refresher.queue.ready(job.next_attempt, set(), set()) == [job]
+
+    asyncio.run(refresher._run_job(None, job))
+    assert job.failures == 2
+    assert job.next_attempt - job.last_attempt >= 0.8 * 2 * SCHEDULER_RETRY_BASE - 1
+    refresher.queue.save()
+    assert JobQueue(results_dir / "state.json", ["A"], ["beer"]).jobs["A|beer"].failures == 2
+
+    asyncio.run(refresher._run_job(None, job))
+    assert job.failures == 0 and job.next_attempt == 0.0 and job.runs == 1 and job.last_error is None
+    assert job.staleness(job.last_success) == 0.0
+
+def test_refreshed_data_reaches_readers(results_dir):
+    refresher = RefreshScheduler(["A"], ["beer"], state_path=results_dir / "state.json", snapshot_every=2)
+    job = refresher.queue.jobs["A|beer"]
+    FakeParser.outcomes = [beers(5990), beers(6490), beers(6990), beers(7490)]
+
+    asyncio.run(refresher._run_job(None, job))
+    assert job.change_rate == 1.0
+    asyncio.run(refresher._run_job(None, job))
+    assert deltas_since_base("A", results_dir) == 1
+    timestamp, snapshot = load_snapshot("A", results_dir)
+    assert {record["price_kopecks"] for record in snapshot.values()} == {6490}
+
+    # Вторая дельта подряд: снимок сохраняется полным файлом, цепочка дельт обнуляется
+    asyncio.run(refresher._run_job(None, job))
+    assert deltas_since_base("A", results_dir) == 0
+    latest = sorted(results_dir.glob("lenta_products_A_*.json"))[-1]
+    assert latest.name == f"lenta_products_A_{load_snapshot('A', results_dir)[0]}.json"
+
+    asyncio.run(refresher._run_job(None, job))
+    assert deltas_since_base("A", results_dir) == 1
+    _, snapshot = load_snapshot("A", results_dir)
+    assert {record["price_kopecks"] for record in snapshot.values()} == {7490}
+    assert job.runs == 4
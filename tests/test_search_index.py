@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from analysis.search_index import SearchIndex, edit_distance
+
+CATALOGS = {
+    "Москва": [
+        {"name": "Балтика 7 Экспортное", "type": "Пиво", "volume": "0,45 л", "price_kopecks": 8999},
+        {"name": "Охота Крепкое", "type": "Пиво", "volume": "0,45 л", "price_kopecks": 7999},
+        {"name": "Жигули Барное Венское", "type": "Пиво", "volume": "0,5 л", "price_kopecks": 9499},
+        {"name": "Essa Ананас Грейпфрут", "type": "Пивной напиток", "volume": "0,45 л", "price_kopecks": 10999},
+        {"name": "Пиво Эль Янтарное", "type": "Пиво", "volume": "0,5 л", "price_kopecks": 11999},
+    ],
+}
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex.from_catalogs(CATALOGS)
+
+def names(index, query):
+    return [row["name"] for row in index.search(query, prefix=False)]
+
+@pytest.mark.parametrize("query, name", [
+    ("балтика", "Балтика 7 Экспортное"),
+    ("блатика", "Балтика 7 Экспортное"),
+    ("балтиак", "Балтика 7 Экспортное"),
+    ("охтоа", "Охота Крепкое"),
+    ("венксое", "Жигули Барное Венское"),
+    ("грейпфурт", "Essa Ананас Грейпфрут"),
+    ("вeнское", "Жигули Барное Венское"),
+    ("крепоке", "Охота Крепкое"),
+    # Перестановка в середине четырехбуквенного токена не оставляет общих триграмм
+    ("пвио", "Пиво Эль Янтарное"),
+    ("пивл", "Пиво Эль Янтарное"),
+])
+def test_single_typo_queries(index, query, name):
+    """Substitutions and adjacent transpositions within the typo limit are found"""
+    assert names(index, query) == [name]
+
+def test_too_many_typos(index):
+    assert names(index, "бтлаика") == []
+    # Короткие токены опечаток не допускают
+    assert names(index, "эль") == ["Пиво Эль Янтарное"]
+    assert names(index, "эла") == []
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("балтика", "блатика", 1),
+    ("охота", "охтоа", 1),
+    ("венское", "венксое", 1),
+    ("балтика", "бтлаика", 2),
+    ("пиво", "пиво", 0),
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b, 2) == distance
@@ -0,0 +1,38 @@
+import pytest
+
+from utils.session_cache import SessionCache, normalize_address, address_matches
+
+@pytest.mark.parametrize("first, second", [
+    ("Москва, ул. Тверская, д. 1", "Москва, улица Тверская, 1"),
+    ("Москва, Чонгарский бул., 7", "г. Москва, Чонгарский бульвар, дом 7"),
+    ("Москва, Чонгарский б-р, 7", "Москва, Чонгарский бульвар 7"),
+    ("Санкт-Петербург, пр-т Энгельса, 154", "Санкт-Петербург, проспект Энгельса, д.154"),
+    ("Москва, Варшавское ш., 87, корп. 2", "Москва, Варшавское шоссе, 87 корпус 2"),
+    ("Москва, Ёлочная ул., 3 стр. 1", "Москва, Елочная улица, 3, строение 1"),
+])
+def test_abbreviations_normalize_to_one_key(first, second):
+    assert normalize_address(first) == normalize_address(second)
+
+@pytest.mark.parametrize("displayed, address", [
+    ("Москва, улица Тверская, дом 1", "Москва, ул. Тверская, д. 1"),
+    ("г. Москва, Чонгарский бульвар, 7", "Москва, Чонгарский бул., 7"),
+    ("Санкт-Петербург, проспект Энгельса, 154", "Санкт-Петербург, пр-т Энгельса, 154"),
+])
+def test_displayed_address_matches_abbreviated(displayed, address):
+    assert address_matches(displayed, address)
+
+@pytest.mark.parametrize("displayed, address", [
+    ("Москва, улица Тверская, 1", "Москва, ул. Тверская, 11"),
+    ("Москва, проспект Мира, 1", "Москва, пер. Мира, 1"),
+    ("Москва, улица Тверская, 1", ""),
+])
+def test_different_addresses_do_not_match(displayed, address):
+    assert not address_matches(displayed, address)
+
+def test_cache_entry_shared_by_spellings(tmp_path):
+    cache = SessionCache(tmp_path)
+    cache.save("Москва, ул. Тверская, д. 1", {"cookies": []}, "https://lenta.com/catalog/pivo")
+    entry = cache.load_entry("Москва, улица Тверская, 1")
+    assert entry["catalog_url"] == "https://lenta.com/catalog/pivo"
+    cache.invalidate("г. Москва, улица Тверская, дом 1")
+    assert cache.load_entry("Москва, ул. Тверская, д. 1") is None
@@ -0,0 +1,228 @@
+from config.delta import DELTA_UNCHANGED_PAGES
+from typing import List, Dict, Optional, Set, Tuple, Any, Union
+from datetime import datetime
+from pathlib import Path
+import hashlib
+import json
+import re
+
+from models.product import Product
+from models.page_key import PageKey
+from utils.result_writer import results_path, safe_filename, write_results_json
+
+# Поля, которые не сравниваются: идентификатор товара и путь к изображению проставляются уже после парсинга
+_IGNORED_FIELDS = ("product_id", "image_path")
+_IDENTITY_FIELDS = ("name", "volume", "image")
+
+ProductLike = Union[Product, Dict[str, Any]]
+
+def fingerprint(product: ProductLike) -> str:
+    """Product identity within the store: hash of name, volume and image"""
+    get = product.get if isinstance(product, dict) else lambda field: getattr(product, field)
+    key = "\x1f".join(str(get(field) or "") for field in _IDENTITY_FIELDS)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def record_content(product: ProductLike) -> Dict[str, Any]:
+    """Comparable record in the current to_dict layout (also for records of older results files)"""
+    content = (product if isinstance(product, Product) else Product.from_dict(product)).to_dict()
+    for field in _IGNORED_FIELDS:
+        content.pop(field, None)
+    return content
+
+def _timestamped_files(directory: Path, prefix: str, address: str) -> List[Tuple[str, Path]]:
+    """(timestamp, path) of the store files named <prefix>_<address>_<timestamp>.json, oldest first"""
+    # Точное совпадение имени: у адресов "А" и "А Б" общий префикс
+    pattern = re.compile(rf"{re.escape(prefix)}_{re.escape(safe_filename(address))}_(\d{{8}}_\d{{6}})\.json")
+    files = []
+    for path in directory.glob(f"{prefix}_*.json"):
+        match = pattern.fullmatch(path.name)
+        if match:
+            files.append((match.group(1), path))
+    return sorted(files)
+
+def delta_path(address: str, timestamp: str, results_dir: Optional[Path] = None) -> Path:
+    return (results_dir or results_path()) / f"lenta_delta_{safe_filename(address)}_{timestamp}.json"
+
+def apply_delta(snapshot: Dict[str, Dict[str, Any]], delta: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Snapshot (fingerprint -> record, catalog order) after the delta"""
+    records = dict(snapshot)
+    for identity in delta["removed"]:
+        records.pop(fingerprint(identity), None)
+    for record in delta["added"] + delta["changed"]:
+        key = fingerprint(record)
+        previous = records.get(key)
+        # Записи дельты без идентификатора и пути к изображению, они переносятся из прежней записи
+        if previous is not None:
+            record = {**{field: previous[field] for field in _IGNORED_FIELDS if field in previous}, **record}
+        records[key] = record
+    # Обойденные страницы идут первыми в порядке обхода, необойденный хвост - в прежнем порядке
+    visited = delta["order"]
+    visited_set = set(visited)
+    order = visited + [key for key in snapshot if key not in visited_set]
+    return {key: records[key] for key in order if key in records}
+
+def load_snapshot(
+    address: str,
+    results_dir: Optional[Path] = None,
+    until: Optional[str] = None,
+    full: bool = False
+) -> Optional[Tuple[str, Dict[str, Dict[str, Any]]]]:
+    """Latest full results of the store with the later delta files applied: (timestamp, fingerprint -> record).
+    until limits the files to the timestamp, full keeps product_id and image_path of the records"""
+    directory = results_dir or results_path()
+    bases = [(ts, path) for ts, path in _timestamped_files(directory, "lenta_products", address) if until is None or ts <= until]
+    if not bases:
+        return None
+    timestamp, path = bases[-1]
+    with open(path, encoding='utf-8') as f:
+        products = json.load(f).get("products") or []
+    snapshot: Dict[str, Dict[str, Any]] = {}
+    for record in products:
+        key = fingerprint(record)
+        if key not in snapshot:
+            snapshot[key] = Product.from_dict(record).to_dict() if full else record_content(record)
+
+    for delta_timestamp, delta_file in _timestamped_files(directory, "lenta_delta", address):
+        if delta_timestamp <= timestamp or (until is not None and delta_timestamp > until):
+            continue
+        with open(delta_file, encoding='utf-8') as f:
+            snapshot = apply_delta(snapshot, json.load(f))
+        timestamp = delta_timestamp
+    return timestamp, snapshot
+
+def deltas_since_base(address: str, results_dir: Optional[Path] = None) -> int:
+    """Number of delta files applied on top of the latest full results file of the store"""
+    directory = results_dir or results_path()
+    bases = _timestamped_files(directory, "lenta_products", address)
+    if not bases:
+        return 0
+    return sum(1 for timestamp, _ in _timestamped_files(directory, "lenta_delta", address) if timestamp > bases[-1][0])
+
+def write_snapshot(address: str, results_dir: Optional[Path] = None) -> Optional[Path]:
+    """Save the snapshot of the store as a full results file with the time of its latest delta"""
+    directory = results_dir or results_path()
+    snapshot = load_snapshot(address, directory, full=True)
+    if snapshot is None:
+        return None
+    timestamp, records = snapshot
+    path = directory / f"lenta_products_{safe_filename(address)}_{timestamp}.json"
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        write_results_json(f, address, timestamp, [Product.from_dict(record) for record in records.values()], [])
+    tmp_path.replace(path)
+    return path
+
+class DeltaTracker:
+    """Compares parsed pages with the previous snapshot of the store and collects added, removed and changed records.
+    After unchanged_pages consecutive pages without changes the rest of the category is assumed unchanged too
+    (valid while the catalog keeps its sort order between runs). Runs of unchanged pages are counted per category."""
+
+    def __init__(
+        self,
+        address: str,
+        unchanged_pages: int = DELTA_UNCHANGED_PAGES,
+        results_dir: Optional[Path] = None
+    ) -> None:
+        self.address = address
+        self.unchanged_pages = unchanged_pages
+        self.results_dir = results_dir or results_path()
+        snapshot = load_snapshot(address, self.results_dir)
+        self.base_timestamp, self.previous = snapshot if snapshot else (None, {})
+        self.position = {key: idx for idx, key in enumerate(self.previous)}
+        self.pages: Dict[PageKey, List[Tuple[str, Dict[str, Any]]]] = {}
+        self.unchanged: Set[PageKey] = set()
+        # Категория -> страница, после которой категория не обходится
+        self.stop_pages: Dict[str, int] = {}
+
+    @property
+    def has_snapshot(self) -> bool:
+        return self.base_timestamp is not None
+
+    def observe_page(self, page_number: PageKey, products: List[Product]) -> bool:
+        """Record parsed page; returns whether it matches the snapshot"""
+        entries = []
+        unchanged = self.has_snapshot and bool(products)
+        for product in products:
+            content = record_content(product)
+            key = fingerprint(content)
+            entries.append((key, content))
+            if unchanged and self.previous.get(key) != content:
+                unchanged = False
+        self.pages[page_number] = entries
+        if unchanged:
+            self.unchanged.add(page_number)
+            self._check_stop(page_number)
+        return unchanged
+
+    def _check_stop(self, page_number: PageKey) -> None:
+        if self.unchanged_pages <= 0:
+            return
+        category, page = page_number
+        # Страницы обрабатываются не по порядку, проверяются все окна с этой страницей
+        for start in range(max(1, page - self.unchanged_pages + 1), page + 1):
+            end = start + self.unchanged_pages - 1
+            if all(PageKey(category, n) in self.unchanged for n in range(start, end + 1)):
+                if end < self.stop_pages.get(category, end + 1):
+                    self.stop_pages[category] = end
+
+    def past_stop(self, page_number: PageKey) -> bool:
+        """Page lies after the run of unchanged pages of its category and does not have to be parsed"""
+        stop_page = self.stop_pages.get(page_number.category)
+        return stop_page is not None and page_number.page > stop_page
+
+    def build(self, failed_pages: bool = False) -> Dict[str, Any]:
+        """Delta of the parsed pages against the snapshot"""
+        seen: Dict[str, Dict[str, Any]] = {}
+        for page_number in sorted(self.pages):
+            for key, content in self.pages[page_number]:
+                seen.setdefault(key, content)
+
+        removed: Set[str] = set()
+        if not failed_pages:
+            # Товары неудачных страниц не видны, но не удалены
+            for category in {page_number.category for page_number in self.pages}:
+                removed.update(self._removed_in(category, seen))
+
+        return {
+            "address": self.address,
+            "base": self.base_timestamp,
+            "stopped_at_pages": sorted(PageKey(category, page) for category, page in self.stop_pages.items()),
+            "pages": len(self.pages),
+            "added": [content for key, content in seen.items() if key not in self.previous],
+            "changed": [content for key, content in seen.items() if key in self.previous and self.previous[key] != content],
+            "removed": [{field: self.previous[key][field] for field in _IDENTITY_FIELDS} for key in self.previous if key in removed],
+            "order": list(seen),
+        }
+
+    def _removed_in(self, category: str, seen: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Snapshot products of the category missing from its parsed pages"""
+        pages = [page_number for page_number in self.pages if page_number.category == category]
+        categories = {content["category"] for page_number in pages for _, content in self.pages[page_number]}
+        # Категория товаров прежних результатов без нее неизвестна, такие товары не удаляются
+        candidates = [
+            key for key, content in self.previous.items()
+            if key not in seen and content.get("category") in categories
+        ]
+        stop_page = self.stop_pages.get(category)
+        if stop_page is None:
+            return candidates
+        # Удалены только товары, стоявшие в прежнем порядке до последней неизмененной страницы
+        window = [PageKey(category, n) for n in range(stop_page - self.unchanged_pages + 1, stop_page + 1)]
+        frontier = max(
+            (self.position[key] for n in window for key, _ in self.pages.get(n, ()) if key in self.position),
+            default=-1
+        )
+        return [key for key in candidates if self.position[key] <= frontier]
+
+    def write(self, failed_pages: bool = False) -> Tuple[Path, Dict[str, Any]]:
+        """Save the delta file next to the results"""
+        delta = self.build(failed_pages)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        delta["timestamp"] = timestamp
+        path = delta_path(self.address, timestamp, self.results_dir)
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(delta, f, ensure_ascii=False)
+        tmp_path.replace(path)
+        return path, delta
@@ -0,0 +1,214 @@
+from config.browser import BASE_URL, USER_AGENT, TIMEOUT
+from config.images import (
+    IMAGE_CACHE_DIR,
+    IMAGE_FETCH_CONCURRENCY,
+    IMAGE_REVALIDATE_HOURS
+)
+from typing import Dict, Optional, Iterable, Tuple, Any
+from urllib.parse import urljoin, urlsplit
+from pathlib import Path
+import mimetypes
+import hashlib
+import logging
+import threading
+import sqlite3
+import asyncio
+import time
+
+import aiohttp
+
+from models.product import Product, EMPTY_IMAGE
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+def content_path(cache_dir: Path, digest: str, extension: str) -> Path:
+    """Sharded location of the image content: ab/cd/abcd...<extension>"""
+    return cache_dir / digest[:2] / digest[2:4] / f"{digest}{extension}"
+
+def image_extension(content_type: Optional[str], url: str) -> str:
+    """File extension by the Content-Type of the response, else by the URL"""
+    extension = None
+    if content_type:
+        extension = mimetypes.guess_extension(content_type.split(";")[0].strip())
+    if not extension:
+        extension = Path(urlsplit(url).path).suffix.lower()
+    # Без расширения файл все равно адресуется хешем
+    return extension if extension and len(extension) <= 6 else ""
+
+class ImageFetcher:
+    """Downloads product images over a pooled HTTP client into a content-addressed cache.
+    A URL is fetched once per run (concurrent requests share the download), identical content is stored once,
+    known URLs are revalidated with If-None-Match / If-Modified-Since after revalidate_hours.
+    Index queries and file writes run in worker threads so that the event loop keeps parsing pages."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        concurrency: int = IMAGE_FETCH_CONCURRENCY,
+        revalidate_hours: float = IMAGE_REVALIDATE_HOURS,
+        base_url: str = BASE_URL
+    ) -> None:
+        self.cache_dir = cache_dir or PROJECT_ROOT / IMAGE_CACHE_DIR
+        self.concurrency = concurrency
+        self.revalidate_seconds = revalidate_hours * 3600
+        self.base_url = base_url
+        self.hits = 0
+        self.revalidated = 0
+        self.downloaded = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.bytes_loaded = 0
+        # URL -> локальный путь (None - загрузить не удалось) и загрузки в процессе
+        self._paths: Dict[str, Optional[str]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Соединение используется из рабочих потоков asyncio.to_thread по очереди, под блокировкой
+        self.conn = sqlite3.connect(self.cache_dir / "index.sqlite3", timeout=10, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._store_lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        # Потерянная при сбое запись индекса означает лишь повторную загрузку
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            "url TEXT PRIMARY KEY, digest TEXT NOT NULL, path TEXT NOT NULL, "
+            "etag TEXT, last_modified TEXT, checked_at REAL NOT NULL) WITHOUT ROWID"
+        )
+
+    def _client(self) -> aiohttp.ClientSession:
+        # Сессия создается внутри event loop при первой загрузке
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+            timeout = aiohttp.ClientTimeout(total=TIMEOUT / 1000)
+            self._session = aiohttp.ClientSession(connector=connector, headers={"User-Agent": USER_AGENT}, timeout=timeout)
+        return self._session
+
+    def _relative(self, path: Path) -> str:
+        """Path stored on products: relative to the project when the cache is inside it"""
+        try:
+            return str(path.relative_to(PROJECT_ROOT))
+        except ValueError:
+            return str(path)
+
+    def _store(self, body: bytes, extension: str) -> Path:
+        """Write the content once under its hash"""
+        digest = hashlib.sha256(body).hexdigest()
+        path = content_path(self.cache_dir, digest, extension)
+        # Проверка и запись под одной блокировкой: одинаковое содержимое с разных URL приходит параллельно
+        with self._store_lock:
+            if path.exists():
+                self.duplicates += 1
+                return path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            tmp_path.write_bytes(body)
+            tmp_path.replace(path)
+        return path
+
+    def _lookup(self, url: str) -> Tuple[Optional[Path], Optional[tuple]]:
+        """Cached file of the URL (None when it is unknown or the file is gone) and its index row"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT path, etag, last_modified, checked_at FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+        cached = self.cache_dir / row[0] if row and (self.cache_dir / row[0]).exists() else None
+        return cached, row
+
+    def _touch(self, url: str) -> None:
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE urls SET checked_at = ? WHERE url = ?", (time.time(), url))
+
+    def _save(self, url: str, body: bytes, extension: str, etag: Optional[str], last_modified: Optional[str]) -> Path:
+        """Store the downloaded content and index it by URL"""
+        path = self._store(body, extension)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?, ?)",
+                (url, path.stem, str(path.relative_to(self.cache_dir)), etag, last_modified, time.time())
+            )
+        return path
+
+    async def _download(self, url: str) -> Optional[str]:
+        cached, row = await asyncio.to_thread(self._lookup, url)
+        if cached is not None and time.time() - row[3] < self.revalidate_seconds:
+            self.hits += 1
+            return self._relative(cached)
+
+        headers = {}
+        if cached is not None:
+            if row[1]:
+                headers["If-None-Match"] = row[1]
+            if row[2]:
+                headers["If-Modified-Since"] = row[2]
+        try:
+            async with self._client().get(url, headers=headers) as response:
+                if response.status == 304 and cached is not None:
+                    await asyncio.to_thread(self._touch, url)
+                    self.revalidated += 1
+                    return self._relative(cached)
+                response.raise_for_status()
+                body = await response.read()
+                content_type = response.headers.get("Content-Type")
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.failed += 1
+            logging.warning("Image %s not loaded: %s", url, e)
+            # Устаревшая копия лучше, чем никакой
+            return self._relative(cached) if cached is not None else None
+
+        self.downloaded += 1
+        self.bytes_loaded += len(body)
+        path = await asyncio.to_thread(self._save, url, body, image_extension(content_type, url), etag, last_modified)
+        return self._relative(path)
+
+    async def fetch(self, image: Optional[str]) -> Optional[str]:
+        """Local path of the image (relative to the project when possible), None without an image or on failure"""
+        if not image or image == EMPTY_IMAGE:
+            return None
+        url = urljoin(self.base_url, image)
+        if url in self._paths:
+            return self._paths[url]
+        future = self._inflight.get(url)
+        if future is None:
+            future = self._inflight[url] = asyncio.ensure_future(self._download(url))
+            future.add_done_callback(lambda done: self._finish(url, done))
+        return await asyncio.shield(future)
+
+    def _finish(self, url: str, future: asyncio.Future) -> None:
+        self._inflight.pop(url, None)
+        if not future.cancelled() and future.exception() is None:
+            self._paths[url] = future.result()
+
+    async def fetch_products(self, products: Iterable[Product]) -> None:
+        """Download images of the products and record their local paths"""
+        products = list(products)
+        paths = await asyncio.gather(*(self.fetch(product.image) for product in products), return_exceptions=True)
+        for product, path in zip(products, paths):
+            if isinstance(path, Exception):
+                # Ошибка записи в кеш не должна прерывать парсинг
+                logging.warning("Image %s not saved: %s", product.image, path)
+                path = None
+            product.image_path = path
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "downloaded": self.downloaded,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "bytes_loaded": self.bytes_loaded,
+        }
+
+    async def close(self) -> None:
+        for future in list(self._inflight.values()):
+            future.cancel()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        # Отмененная загрузка может еще писать индекс в рабочем потоке
+        with self._lock:
+            self.conn.close()
@@ -1,36 +1,142 @@
-from config.browser import LOG_MAX_SIZE_MB
-from datetime import datetime
+from config.browser import LOG_MAX_SIZE_MB, LOG_BACKUP_COUNT, LOG_ROTATION, LOG_ROTATION_WHEN, LOG_LEVEL, LOG_QUEUE
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from typing import Optional, List, Any
 from pathlib import Path
+import multiprocessing
+import threading
 import logging
+import atexit
+import queue
 import sys
+import os
+import re
 
-def setup_logging() -> logging.Logger:
-    """Logging system setup"""
-    log_dir = Path(__file__).parent.parent / "logs"
-    log_dir.mkdir(exist_ok=True)
-
-    clean_logs_if_needed(log_dir, max_size_mb=LOG_MAX_SIZE_MB)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        datefmt="%Y-%m-%d %H:%M:%S",
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(log_dir / f"lenta_parser_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"),
-            logging.StreamHandler(sys.stdout)
-        ]
+LOGGER_NAME = "LentaParser"
+LOG_FILE_PREFIX = "lenta_parser"
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_lock = threading.Lock()
+_handlers: List[logging.Handler] = []
+_targets: List[logging.Handler] = []
+_listener: Optional[QueueListener] = None
+_worker_queue: Optional[Any] = None
+_worker_listener: Optional[QueueListener] = None
+
+def log_dir_path() -> Path:
+    return Path(__file__).parent.parent / "logs"
+
+def log_file_name(role: str) -> str:
+    """Log file of the process: rotation is not safe across processes, so each one writes its own file"""
+    return f"{LOG_FILE_PREFIX}.{role}.{os.getpid()}.log"
+
+def _file_handler(path: Path) -> logging.Handler:
+    """Log file handler with size or time based rotation"""
+    if LOG_ROTATION == "time":
+        return TimedRotatingFileHandler(
+            path, when=LOG_ROTATION_WHEN, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    return RotatingFileHandler(
+        path, maxBytes=int(LOG_MAX_SIZE_MB * 1024 * 1024),
+        backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
     )
-    return logging.getLogger("LentaParser")
 
-def clean_logs_if_needed(log_dir: Path, max_size_mb: float):
-    """Clearing logs if necessary"""
+def _configure(role: str) -> None:
+    """Attach handlers to the root logger once per process"""
+    global _listener
+    with _lock:
+        if _handlers:
+            return
+        log_dir = log_dir_path()
+        log_dir.mkdir(parents=True, exist_ok=True)
+        file_name = log_file_name(role)
+        clean_logs_if_needed(log_dir, max_size_mb=LOG_MAX_SIZE_MB * (LOG_BACKUP_COUNT + 1), keep=file_name)
+
+        formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+        targets = [_file_handler(log_dir / file_name), logging.StreamHandler(sys.stdout)]
+        for handler in targets:
+            handler.setFormatter(formatter)
+        _targets.extend(targets)
+
+        root = logging.getLogger()
+        root.setLevel(LOG_LEVEL)
+        if LOG_QUEUE:
+            # Запись на диск и в консоль идет в потоке слушателя, event loop не блокируется
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            _handlers.append(QueueHandler(log_queue))
+            _listener = QueueListener(log_queue, *targets, respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown_logging)
+        else:
+            _handlers.extend(targets)
+        for handler in _handlers:
+            root.addHandler(handler)
+
+def worker_log_queue() -> Optional[Any]:
+    """Queue for records of pool worker processes, None while logging is not configured"""
+    global _worker_queue, _worker_listener
+    with _lock:
+        if not _targets:
+            return None
+        if _worker_queue is None:
+            # Очередь multiprocessing передается процессам пула при их создании
+            _worker_queue = multiprocessing.Queue()
+            _worker_listener = QueueListener(_worker_queue, *_targets, respect_handler_level=True)
+            _worker_listener.start()
+            atexit.register(shutdown_logging)
+        return _worker_queue
+
+def init_worker_logging(log_queue: Optional[Any]) -> None:
+    """Process pool initializer: route records of the worker to the parent process"""
+    if log_queue is None:
+        return
+    root = logging.getLogger()
+    # Унаследованные при fork обработчики пишут мимо слушателя родителя
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    with _lock:
+        _handlers[:] = [QueueHandler(log_queue)]
+        _targets.clear()
+    root.addHandler(_handlers[0])
+    root.setLevel(LOG_LEVEL)
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener threads"""
+    global _listener, _worker_listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+        if _worker_listener is not None:
+            _worker_listener.stop()
+            _worker_listener = None
+
+def store_logger_name(address: str) -> str:
+    """Logger name of the store: dots would nest loggers, so they are replaced"""
+    return re.sub(r"[\s.]+", "_", address.strip()) or "store"
+
+def setup_logging(store: Optional[str] = None, role: str = "parser") -> logging.Logger:
+    """Logging system setup, returns the parser logger or the child logger of the store.
+    The first call of the process names its log file after the role (parser, multi_store, scheduler, browser_pool)"""
+    _configure(role)
+    logger = logging.getLogger(LOGGER_NAME)
+    return logger.getChild(store_logger_name(store)) if store else logger
+
+def clean_logs_if_needed(log_dir: Path, max_size_mb: float, keep: Optional[str] = None):
+    """Removing the oldest log files while the directory exceeds the limit"""
     try:
-        total_size = sum(f.stat().st_size for f in log_dir.glob('*') if f.is_file())
-        if total_size > max_size_mb * 1024 * 1024:
-            for log_file in log_dir.glob('*'):
-                try:
-                    log_file.unlink()
-                except Exception as e:
-                    logging.warning(f"Failed to delete log file {log_file}: {str(e)}")
+        files = sorted((f for f in log_dir.glob('*') if f.is_file()), key=lambda f: f.stat().st_mtime)
+        total_size = sum(f.stat().st_size for f in files)
+        for log_file in files:
+            if total_size <= max_size_mb * 1024 * 1024:
+                break
+            if log_file.name == keep:
+                continue
+            try:
+                size = log_file.stat().st_size
+                log_file.unlink()
+                total_size -= size
+            except Exception as e:
+                logging.warning("Failed to delete log file %s: %s", log_file, e)
     except Exception as e:
-        logging.error(f"Error during log cleanup: {str(e)}") 
\ No newline at end of file
+        logging.error("Error during log cleanup: %s", e)
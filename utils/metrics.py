@@ -0,0 +1,150 @@
+from typing import Dict, List, Iterable, Optional, Any
+from datetime import datetime
+import time
+
+PROMETHEUS_PREFIX = "lenta_parser"
+
+class PhaseStats:
+    """Count, total, min and max of the phase durations"""
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, seconds: float, count: int = 1) -> None:
+        self.count += count
+        self.total += seconds * count
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "min": round(self.min, 6) if self.count else None,
+            "max": round(self.max, 6),
+            "mean": round(self.total / self.count, 6) if self.count else None,
+        }
+
+class _PhaseTimer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "RunMetrics", name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> "_PhaseTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.metrics.count(f"{self.name}_failures")
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+class NullMetrics:
+    """Disabled metrics: every hook is a no-op"""
+    enabled = False
+
+    def phase(self, name: str) -> _NullTimer:
+        return _NULL_TIMER
+
+    def observe(self, name: str, seconds: float, count: int = 1) -> None:
+        pass
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def report(self) -> Dict[str, Any]:
+        return {}
+
+    def prometheus(self) -> str:
+        return ""
+
+NULL_METRICS = NullMetrics()
+
+class RunMetrics:
+    """Phase timings and event counters of one parser run"""
+    enabled = True
+
+    def __init__(self, labels: Optional[Dict[str, str]] = None) -> None:
+        self.labels = dict(labels or {})
+        self.started_at = datetime.now()
+        self.phases: Dict[str, PhaseStats] = {}
+        self.counters: Dict[str, int] = {}
+
+    def phase(self, name: str) -> _PhaseTimer:
+        """Context manager timing one execution of the phase; failures are counted as <phase>_failures"""
+        return _PhaseTimer(self, name)
+
+    def observe(self, name: str, seconds: float, count: int = 1) -> None:
+        """Record the phase duration (count observations of the same value)"""
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats()
+        stats.add(seconds, count)
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self) -> Dict[str, Any]:
+        """JSON run report"""
+        return {
+            "labels": self.labels,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "phases": {name: stats.to_dict() for name, stats in sorted(self.phases.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+        return prometheus_text([self])
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels: Dict[str, Any]) -> str:
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+def prometheus_text(runs: Iterable[Any]) -> str:
+    """Render metrics of several runs (e.g. stores of one multi-store crawl) as one Prometheus text"""
+    runs = [run for run in runs if run.enabled]
+    seconds: List[str] = []
+    maxima: List[str] = []
+    events: List[str] = []
+    for run in runs:
+        for name, stats in sorted(run.phases.items()):
+            labels = _labels({**run.labels, "phase": name})
+            seconds.append(f"{PROMETHEUS_PREFIX}_phase_seconds_sum{labels} {stats.total:.6f}")
+            seconds.append(f"{PROMETHEUS_PREFIX}_phase_seconds_count{labels} {stats.count}")
+            maxima.append(f"{PROMETHEUS_PREFIX}_phase_seconds_max{labels} {stats.max:.6f}")
+        for name, value in sorted(run.counters.items()):
+            events.append(f"{PROMETHEUS_PREFIX}_events_total{_labels({**run.labels, 'event': name})} {value}")
+
+    lines: List[str] = []
+    for metric, kind, help_text, samples in (
+        ("phase_seconds", "summary", "Time spent in parser phases", seconds),
+        ("phase_seconds_max", "gauge", "Longest single execution of the phase", maxima),
+        ("events_total", "counter", "Parser events: round trips, pages, cards, failures", events),
+    ):
+        if samples:
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{metric} {help_text}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{metric} {kind}")
+            lines.extend(samples)
+    return "\n".join(lines) + "\n" if lines else ""
@@ -0,0 +1,168 @@
+from config.normalization import NAME_CACHE_SIZE, NAME_CACHE_DISK, NAME_CACHE_PATH
+from collections import OrderedDict
+from typing import Dict, List, Iterable, Optional, Any
+from pathlib import Path
+import threading
+import hashlib
+import sqlite3
+import logging
+import atexit
+import json
+
+import config.product_types as product_types
+from utils.name_processor import NameProcessor, ProcessedName
+
+# Записи на диск сбрасываются пачками
+FLUSH_EVERY = 500
+
+def rules_fingerprint() -> str:
+    """Hash of the config/product_types.py rule tables: cached results of other rules are not reused"""
+    tables = [
+        [name, getattr(product_types, name)]
+        for name in sorted(dir(product_types)) if name.isupper()
+    ]
+    # Порядок ключей в таблицах важен для разбора, поэтому словари не сортируются
+    return hashlib.sha1(json.dumps(tables, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+class NameCache:
+    """Memoizing layer in front of the name processor: bounded in-process LRU and an optional SQLite store"""
+
+    def __init__(
+        self,
+        processor: Optional[NameProcessor] = None,
+        maxsize: int = NAME_CACHE_SIZE,
+        disk_path: Optional[Path] = None
+    ) -> None:
+        self.processor = processor or NameProcessor()
+        self.maxsize = maxsize
+        self.fingerprint = rules_fingerprint()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[str, ProcessedName]" = OrderedDict()
+        # Еще не записанные на диск результаты: название -> JSON
+        self._pending: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+        if disk_path is not None:
+            self._open(disk_path)
+
+    def _open(self, path: Path) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS names ("
+                "rules TEXT NOT NULL, name TEXT NOT NULL, result TEXT NOT NULL, "
+                "PRIMARY KEY (rules, name)) WITHOUT ROWID"
+            )
+            with self.conn:
+                # Правила изменились - записи старых правил больше не нужны
+                self.conn.execute("DELETE FROM names WHERE rules != ?", (self.fingerprint,))
+        except sqlite3.Error as e:
+            logging.warning("Name cache store %s is not available: %s", path, e)
+            self.conn = None
+
+    def _load(self, name: str) -> Optional[ProcessedName]:
+        result = self._pending.get(name)
+        if result is None:
+            # Поиск по первичному ключу, память под множество сохраненных названий не нужна
+            row = self.conn.execute(
+                "SELECT result FROM names WHERE rules = ? AND name = ?", (self.fingerprint, name)
+            ).fetchone()
+            if row is None:
+                return None
+            result = row[0]
+        return tuple(json.loads(result))
+
+    def process(self, name: str) -> ProcessedName:
+        """Cached process_product_name"""
+        with self._lock:
+            result = self._lru.get(name)
+            if result is not None:
+                self._lru.move_to_end(name)
+                self.hits += 1
+                return result
+
+            result = self._load(name) if self.conn is not None else None
+            if result is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                result = self.processor.process(name)
+                if self.conn is not None:
+                    self._pending[name] = json.dumps(result, ensure_ascii=False)
+                    if len(self._pending) >= FLUSH_EVERY:
+                        self._flush()
+
+            self._lru[name] = result
+            if len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+            return result
+
+    def process_many(self, names: Iterable[str]) -> List[ProcessedName]:
+        process = self.process
+        return [process(name) for name in names]
+
+    def _flush(self) -> None:
+        if not self._pending or self.conn is None:
+            return
+        try:
+            with self.conn:
+                # Название могло быть записано другим процессом пула с теми же правилами
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO names VALUES (?, ?, ?)",
+                    ((self.fingerprint, name, result) for name, result in self._pending.items())
+                )
+        except sqlite3.Error as e:
+            logging.warning("Failed to write name cache: %s", e)
+        self._pending = {}
+
+    def flush(self) -> None:
+        """Write pending results to the disk store"""
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def clear(self) -> None:
+        """Drop the in-process entries and reset stats"""
+        with self._lock:
+            self._lru.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else None,
+            "size": len(self._lru),
+            "maxsize": self.maxsize,
+            "disk": self.conn is not None,
+        }
+
+_cache: Optional[NameCache] = None
+_cache_lock = threading.Lock()
+
+def get_name_cache() -> NameCache:
+    """Process-wide name cache shared by all parsers"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            disk_path = Path(__file__).parent.parent / NAME_CACHE_PATH if NAME_CACHE_DISK else None
+            _cache = NameCache(disk_path=disk_path)
+            atexit.register(_cache.close)
+        return _cache
+
+def process_product_name(name: str) -> ProcessedName:
+    """process_product_name through the process-wide cache"""
+    return get_name_cache().process(name)
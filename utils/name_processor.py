@@ -1,4 +1,5 @@
-from typing import Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict, List, Iterable, Pattern
+import logging
 import re
 from config.product_types import (
     PRODUCT_TYPES,
@@ -12,154 +13,189 @@ from config.product_types import (
     ALCOHOL_PERCENTAGE_PATTERNS
 )
 
-def process_product_name(name: str) -> Tuple[str, str, Optional[str], bool, Optional[str], Optional[str], Optional[Dict[str, float]], Optional[str], str, Optional[str]]:
-    """
-    Process product name to extract product type, color, alcohol status, filtering and pasteurization status.
-    Returns tuple of (product_type, cleaned_name, color_type, is_alcoholic, filtering_type, pasteurization_type, alcohol_percentage, sweetness_type, packaging_type, clarification_type)
-    """
-    try:
-        # Split name by spaces and check first word
-        words = name.split()
-        if not words:
-            return "Неизвестный тип", name, None, True, None, None, None, None, PACKAGING_TYPES["с/б"], None
-
-        first_word = words[0].lower()
-        color_type = None
-        is_alcoholic = True  # По умолчанию все товары алкогольные
-        filtering_type = None
-        pasteurization_type = None
-        alcohol_percentage = None
-        sweetness_type = None
-        packaging_type = PACKAGING_TYPES["с/б"]  # По умолчанию стеклянная бутылка
-        clarification_type = None
-        
-        # Проверяем, является ли первое слово названием бренда (начинается с заглавной буквы)
-        if first_word[0].isupper():
-            # Если первое слово - бренд, ищем тип товара в следующих словах
-            for i, word in enumerate(words[1:], 1):
-                if word.lower() in [t.lower() for t in PRODUCT_TYPES.values()]:
-                    product_type = word
-                    cleaned_name = " ".join(words[:i] + words[i+1:]).strip()
+ProcessedName = Tuple[str, str, Optional[str], bool, Optional[str], Optional[str], Optional[float], Optional[str], str, Optional[str]]
+
+# Порядок категорий важен: он совпадает с порядком удаления атрибутов из названия
+_WORD_CATEGORIES = (
+    ("color", BEER_COLOR_TYPES),
+    ("clarification", CLARIFICATION_TYPES),
+    ("alcohol", ALCOHOL_TYPES),
+    ("filtering", FILTERING_TYPES),
+    ("pasteurization", PASTEURIZATION_TYPES),
+    ("sweetness", SWEETNESS_TYPES),
+)
+
+_WORD_RE = re.compile(r'\w+')
+_SUFFIX_RE = re.compile(r'[а-я]*')
+
+_PERCENT_RE = re.compile(r'\d+[,.]?\d*%')
+_PERCENT_CONTEXT_RES = (
+    re.compile(r'не\s+менее\s+\d+[,.]?\d*%'),
+    re.compile(r'не\s+более\s+\d+[,.]?\d*%'),
+    re.compile(r'от\s+\d+[,.]?\d*%'),
+    re.compile(r'до\s+\d+[,.]?\d*%'),
+)
+_PERCENT_WORDS_RES = (
+    re.compile(r'\bне\s+менее\b', re.IGNORECASE),
+    re.compile(r'\bне\s+более\b', re.IGNORECASE),
+    re.compile(r'\bот\b', re.IGNORECASE),
+    re.compile(r'\bдо\b', re.IGNORECASE),
+)
+_SEPARATORS_RE = re.compile(r'[\s,.]+')
+_TRAILING_ZERO_RE = re.compile(r'\s*0\s*$')
+_ALK_RE = re.compile(r'\bалк\b', re.IGNORECASE)
+
+
+class NameProcessor:
+    """Product name attribute extractor compiled once from the product type tables"""
+
+    def __init__(self) -> None:
+        self.default_packaging = PACKAGING_TYPES["с/б"]
+        self._unknown_tail = (None, True, None, None, None, None, self.default_packaging, None)
+
+        self._product_types: Dict[str, str] = {}
+        for product_type in PRODUCT_TYPES.values():
+            self._product_types.setdefault(product_type.lower(), product_type)
+
+        # Префиксы атрибутов: слово классифицируется одним проходом по его префиксам
+        self._prefixes: Dict[str, List[Tuple[int, int]]] = {}
+        self._pattern_keys: List[Tuple[int, int, Pattern]] = []
+        self._removers: List[List[Pattern]] = []
+        self._values: List[list] = []
+        for category_idx, (_, table) in enumerate(_WORD_CATEGORIES):
+            removers, values = [], []
+            for key_idx, (key, value) in enumerate(table.items()):
+                if _WORD_RE.fullmatch(key):
+                    self._prefixes.setdefault(key, []).append((category_idx, key_idx))
+                else:
+                    # Ключи с пунктуацией не ложатся на разбиение по словам
+                    self._pattern_keys.append((category_idx, key_idx, re.compile(rf'\b{key}[а-я]*\b')))
+                removers.append(re.compile(rf'\b{key}[а-я]*\b', re.IGNORECASE))
+                values.append(value)
+            self._removers.append(removers)
+            self._values.append(values)
+        self._prefix_lengths = sorted({len(key) for key in self._prefixes})
+
+        self._packaging = [
+            (key, value, re.compile(rf'\b{key}\b'), re.compile(rf'\b{key}\b', re.IGNORECASE))
+            for key, value in PACKAGING_TYPES.items()
+        ]
+        self._percentage_res = [re.compile(pattern) for pattern in ALCOHOL_PERCENTAGE_PATTERNS]
+
+    def _classify(self, name_lower: str) -> List[Optional[int]]:
+        """Find the first matching key of every attribute category in one pass over the words"""
+        best: List[Optional[int]] = [None] * len(_WORD_CATEGORIES)
+        prefixes = self._prefixes
+        for match in _WORD_RE.finditer(name_lower):
+            word = match.group()
+            for length in self._prefix_lengths:
+                if length > len(word):
                     break
-            else:
-                # Если тип не найден, считаем что это пиво
-                product_type = "Пиво"
-                cleaned_name = name
-        else:
-            # Check for "Напиток" type
-            if first_word == "напиток" and len(words) >= 2:
-                # Get the next word as the drink type
-                drink_type = words[1].lower()
-                # Remove both words from name
+                entries = prefixes.get(word[:length])
+                if entries and _SUFFIX_RE.fullmatch(word, length):
+                    for category_idx, key_idx in entries:
+                        current = best[category_idx]
+                        if current is None or key_idx < current:
+                            best[category_idx] = key_idx
+        for category_idx, key_idx, pattern in self._pattern_keys:
+            current = best[category_idx]
+            if (current is None or key_idx < current) and pattern.search(name_lower):
+                best[category_idx] = key_idx
+        return best
+
+    def process(self, name: str) -> ProcessedName:
+        """
+        Process product name to extract product type, color, alcohol status, filtering and pasteurization status.
+        Returns tuple of (product_type, cleaned_name, color_type, is_alcoholic, filtering_type, pasteurization_type, alcohol_percentage, sweetness_type, packaging_type, clarification_type)
+        """
+        try:
+            words = name.split()
+            if not words:
+                return ("Неизвестный тип", name) + self._unknown_tail
+
+            first_word = words[0].lower()
+
+            # Проверяем, является ли первое слово названием бренда (начинается с заглавной буквы)
+            if first_word[0].isupper():
+                for i, word in enumerate(words[1:], 1):
+                    if word.lower() in self._product_types:
+                        product_type = word
+                        cleaned_name = " ".join(words[:i] + words[i+1:]).strip()
+                        break
+                else:
+                    product_type = "Пиво"
+                    cleaned_name = name
+            elif first_word == "напиток" and len(words) >= 2:
+                product_type = f"Напиток {words[1].lower()}"
                 cleaned_name = " ".join(words[2:]).strip()
-                product_type = f"Напиток {drink_type}"
+            elif first_word in self._product_types:
+                product_type = self._product_types[first_word]
+                cleaned_name = " ".join(words[1:]).strip()
             else:
-                # Check other product types
-                for product_type in PRODUCT_TYPES.values():
-                    if first_word == product_type.lower():
-                        # Remove product type from name and clean up
-                        cleaned_name = " ".join(words[1:]).strip()
+                return ("Неизвестный тип", name) + self._unknown_tail
+
+            name_lower = cleaned_name.lower()
+            attributes: List = [None] * len(_WORD_CATEGORIES)
+            for category_idx, key_idx in enumerate(self._classify(name_lower)):
+                if key_idx is not None:
+                    attributes[category_idx] = self._values[category_idx][key_idx]
+                    cleaned_name = self._removers[category_idx][key_idx].sub('', cleaned_name).strip()
+            color_type, clarification_type, alcohol_type, filtering_type, pasteurization_type, sweetness_type = attributes
+            is_alcoholic = True if alcohol_type is None else alcohol_type
+
+            packaging_type = self.default_packaging
+            for key, value, search_re, remove_re in self._packaging:
+                if key in name_lower and search_re.search(name_lower):
+                    packaging_type = value
+                    cleaned_name = remove_re.sub('', cleaned_name).strip()
+                    break
+
+            alcohol_percentage = None
+            if '%' in name_lower:
+                for pattern in self._percentage_res:
+                    match = pattern.search(name_lower)
+                    if match:
+                        alcohol_percentage = float(match.group(1).replace(',', '.'))
                         break
-                else:
-                    return "Неизвестный тип", name, None, True, None, None, None, None, PACKAGING_TYPES["с/б"], None
-
-        # Check for color type in the cleaned name
-        name_lower = cleaned_name.lower()
-        for color_key, color_value in BEER_COLOR_TYPES.items():
-            if re.search(rf'\b{color_key}[а-я]*\b', name_lower):
-                color_type = color_value
-                # Remove color type from name
-                cleaned_name = re.sub(rf'\b{color_key}[а-я]*\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-                break
-
-        # Check for clarification type in the cleaned name
-        for clarification_key, clarification_value in CLARIFICATION_TYPES.items():
-            if re.search(rf'\b{clarification_key}[а-я]*\b', name_lower):
-                clarification_type = clarification_value
-                # Remove clarification type from name
-                cleaned_name = re.sub(rf'\b{clarification_key}[а-я]*\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-                break
-
-        # Check for alcohol type in the cleaned name
-        for alcohol_key, alcohol_value in ALCOHOL_TYPES.items():
-            if re.search(rf'\b{alcohol_key}[а-я]*\b', name_lower):
-                is_alcoholic = alcohol_value
-                # Remove alcohol type from name
-                cleaned_name = re.sub(rf'\b{alcohol_key}[а-я]*\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-                break
-
-        # Check for filtering type in the cleaned name
-        for filter_key, filter_value in FILTERING_TYPES.items():
-            if re.search(rf'\b{filter_key}[а-я]*\b', name_lower):
-                filtering_type = filter_value
-                # Remove filtering type from name
-                cleaned_name = re.sub(rf'\b{filter_key}[а-я]*\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-                break
-
-        # Check for pasteurization type in the cleaned name
-        for pasteur_key, pasteur_value in PASTEURIZATION_TYPES.items():
-            if re.search(rf'\b{pasteur_key}[а-я]*\b', name_lower):
-                pasteurization_type = pasteur_value
-                # Remove pasteurization type from name
-                cleaned_name = re.sub(rf'\b{pasteur_key}[а-я]*\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-                break
-
-        # Check for sweetness type in the cleaned name
-        for sweetness_key, sweetness_value in SWEETNESS_TYPES.items():
-            if re.search(rf'\b{sweetness_key}[а-я]*\b', name_lower):
-                sweetness_type = sweetness_value
-                # Remove sweetness type from name
-                cleaned_name = re.sub(rf'\b{sweetness_key}[а-я]*\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-                break
-
-        # Check for packaging type in the cleaned name
-        for packaging_key, packaging_value in PACKAGING_TYPES.items():
-            if re.search(rf'\b{packaging_key}\b', name_lower):
-                packaging_type = packaging_value
-                # Remove packaging type from name
-                cleaned_name = re.sub(rf'\b{packaging_key}\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-                break
-
-        # Extract alcohol percentage
-        for pattern in ALCOHOL_PERCENTAGE_PATTERNS:
-            match = re.search(pattern, name_lower)
-            if match:
-                percentage = float(match.group(1).replace(',', '.'))
-                alcohol_percentage = percentage
-                break
-
-        # Remove alcohol percentage and related words from name
-        cleaned_name = re.sub(r'\d+[,.]?\d*%', '', cleaned_name).strip()
-        cleaned_name = re.sub(r'не\s+менее\s+\d+[,.]?\d*%', '', cleaned_name).strip()
-        cleaned_name = re.sub(r'не\s+более\s+\d+[,.]?\d*%', '', cleaned_name).strip()
-        cleaned_name = re.sub(r'от\s+\d+[,.]?\d*%', '', cleaned_name).strip()
-        cleaned_name = re.sub(r'до\s+\d+[,.]?\d*%', '', cleaned_name).strip()
-        
-        # Remove remaining words related to alcohol percentage
-        cleaned_name = re.sub(r'\bне\s+менее\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-        cleaned_name = re.sub(r'\bне\s+более\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-        cleaned_name = re.sub(r'\bот\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-        cleaned_name = re.sub(r'\bдо\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-
-        # Удаляем лишние запятые и пробелы
-        # Заменяем все запятые и точки на пробелы
-        cleaned_name = re.sub(r'[,.]', ' ', cleaned_name)
-        # Нормализуем все пробелы (удаляем множественные пробелы)
-        cleaned_name = re.sub(r'\s+', ' ', cleaned_name).strip()
-
-        # Удаляем цифру 0 в конце названия
-        cleaned_name = re.sub(r'\s*0\s*$', '', cleaned_name).strip()
-
-        # Удаляем "алк" из названия
-        cleaned_name = re.sub(r'\bалк\b', '', cleaned_name, flags=re.IGNORECASE).strip()
-        
-        # Удаляем множественные точки
-        cleaned_name = re.sub(r'\.+', '.', cleaned_name).strip()
-        # Удаляем точку в конце названия
-        cleaned_name = re.sub(r'\.$', '', cleaned_name).strip()
-
-        return product_type, cleaned_name, color_type, is_alcoholic, filtering_type, pasteurization_type, alcohol_percentage, sweetness_type, packaging_type, clarification_type
-        
-    except Exception as e:
-        logging.warning(f"Error processing product name: {str(e)}") # type: ignore
-        return "Неизвестный тип", name, None, True, None, None, None, None, PACKAGING_TYPES["с/б"], None 
\ No newline at end of file
+
+            # Remove alcohol percentage and related words from name
+            if '%' in cleaned_name:
+                cleaned_name = _PERCENT_RE.sub('', cleaned_name).strip()
+                for pattern in _PERCENT_CONTEXT_RES:
+                    cleaned_name = pattern.sub('', cleaned_name).strip()
+            for pattern in _PERCENT_WORDS_RES:
+                cleaned_name = pattern.sub('', cleaned_name).strip()
+
+            # Заменяем запятые и точки на пробелы и нормализуем пробелы
+            cleaned_name = _SEPARATORS_RE.sub(' ', cleaned_name).strip()
+            # Удаляем цифру 0 в конце названия
+            cleaned_name = _TRAILING_ZERO_RE.sub('', cleaned_name).strip()
+            # Удаляем "алк" из названия
+            cleaned_name = _ALK_RE.sub('', cleaned_name).strip()
+
+            return product_type, cleaned_name, color_type, is_alcoholic, filtering_type, pasteurization_type, alcohol_percentage, sweetness_type, packaging_type, clarification_type
+
+        except Exception as e:
+            logging.warning("Error processing product name: %s", e)
+            return ("Неизвестный тип", name) + self._unknown_tail
+
+    def process_many(self, names: Iterable[str]) -> List[ProcessedName]:
+        """Process a batch of product names"""
+        process = self.process
+        return [process(name) for name in names]
+
+
+_processor = NameProcessor()
+
+
+def process_product_name(name: str) -> ProcessedName:
+    """
+    Process product name to extract product type, color, alcohol status, filtering and pasteurization status.
+    Returns tuple of (product_type, cleaned_name, color_type, is_alcoholic, filtering_type, pasteurization_type, alcohol_percentage, sweetness_type, packaging_type, clarification_type)
+    """
+    return _processor.process(name)
+
+
+def process_many(names: Iterable[str]) -> List[ProcessedName]:
+    """Process a batch of product names"""
+    return _processor.process_many(names)
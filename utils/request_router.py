@@ -0,0 +1,99 @@
+from playwright.async_api import BrowserContext, Route, Response
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+import asyncio
+import time
+
+from config.browser import (
+    ROUTING_PROFILE,
+    ROUTING_PROFILES,
+    BLOCKED_DOMAINS,
+    ESTIMATED_RESOURCE_BYTES,
+    DEFAULT_RESOURCE_BYTES,
+    RATE_LIMITED_TYPES
+)
+
+class HostRateLimiter:
+    """Token bucket per host shared by all contexts of the process: rate requests per second, bursts up to burst"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.waited = 0.0
+        # Хост -> [токены, время последнего пополнения]
+        self._buckets: Dict[str, List[float]] = {}
+
+    async def acquire(self, host: str) -> None:
+        """Wait for a request token of the host"""
+        bucket = self._buckets.setdefault(host, [float(self.burst), time.monotonic()])
+        while True:
+            now = time.monotonic()
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return
+            delay = (1 - bucket[0]) / self.rate
+            self.waited += delay
+            await asyncio.sleep(delay)
+
+class ResourceRouter:
+    """Context router aborting requests by resource type and domain blocklist"""
+
+    def __init__(self, profile: str = ROUTING_PROFILE, limiter: Optional[HostRateLimiter] = None) -> None:
+        if profile not in ROUTING_PROFILES:
+            raise ValueError(f"Unknown routing profile: {profile}")
+        self.profile = profile
+        self.limiter = limiter
+        settings = ROUTING_PROFILES[profile]
+        self.blocked_types = frozenset(settings["resource_types"])
+        self.blocked_domains = tuple(BLOCKED_DOMAINS) if settings["block_domains"] else ()
+        self.blocked = 0
+        self.allowed = 0
+        self.bytes_loaded = 0
+        self.bytes_saved = 0
+        self.blocked_by_type: Dict[str, int] = {}
+
+    def _is_blocked_domain(self, url: str) -> bool:
+        host = urlsplit(url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in self.blocked_domains)
+
+    async def _handle(self, route: Route) -> None:
+        request = route.request
+        resource_type = request.resource_type
+        if resource_type in self.blocked_types or (self.blocked_domains and self._is_blocked_domain(request.url)):
+            self.blocked += 1
+            self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+            self.bytes_saved += ESTIMATED_RESOURCE_BYTES.get(resource_type, DEFAULT_RESOURCE_BYTES)
+            await route.abort()
+        else:
+            self.allowed += 1
+            # Ограничиваются только запросы к серверу сайта: документы и API, не статика
+            if self.limiter is not None and resource_type in RATE_LIMITED_TYPES:
+                await self.limiter.acquire(urlsplit(request.url).hostname or "")
+            await route.continue_()
+
+    def _on_response(self, response: Response) -> None:
+        content_length = response.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            self.bytes_loaded += int(content_length)
+
+    async def install(self, context: BrowserContext) -> None:
+        """Install the router on the browser context"""
+        if self.blocked_types or self.blocked_domains or self.limiter is not None:
+            await context.route("**/*", self._handle)
+        context.on("response", self._on_response)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Blocked / allowed request counters of the run"""
+        return {
+            "profile": self.profile,
+            "blocked": self.blocked,
+            "allowed": self.allowed,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "bytes_loaded": self.bytes_loaded,
+            "bytes_saved_estimate": self.bytes_saved,
+        }
@@ -0,0 +1,161 @@
+from config.browser import RESULTS_DIR
+from typing import List, Dict, Optional, Iterator, Set, TextIO
+from datetime import datetime
+from pathlib import Path
+import importlib.util
+import gzip
+import json
+import io
+import os
+
+from models.product import Product
+from models.page_key import PageKey
+
+COMPRESSION_EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+def safe_filename(address: str) -> str:
+    """Clean address from characters not allowed in file names"""
+    return "".join(c if c.isalnum() or c in (' ', '-', '_') else '_' for c in address)
+
+def results_path() -> Path:
+    """Results directory of the project"""
+    return Path(__file__).parent.parent / RESULTS_DIR
+
+def write_results_json(f: TextIO, address: str, timestamp: str, products: List[Product], failed_pages: List[PageKey]) -> None:
+    """Write results file layout, serializing products one by one"""
+    f.write('{\n  "address": ' + json.dumps(address, ensure_ascii=False))
+    f.write(',\n  "timestamp": ' + json.dumps(timestamp))
+    f.write(',\n  "failed_pages": ' + json.dumps(failed_pages))
+    f.write(',\n  "products": [')
+    for idx, product in enumerate(products):
+        f.write(',\n    ' if idx else '\n    ')
+        f.write(product.to_json())
+    f.write('\n  ]\n}\n' if products else ']\n}\n')
+
+def available_compressions() -> List[str]:
+    """NDJSON compressions usable here: zstd needs the optional zstandard package"""
+    return [name for name in COMPRESSION_EXTENSIONS if name == "gzip" or (
+        name == "zstd" and importlib.util.find_spec("zstandard") is not None
+    )]
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd compression requires the 'zstandard' package")
+    return zstandard
+
+class NDJSONResultSink:
+    """Streaming NDJSON writer flushing every parsed page, with a crash-resumable checkpoint"""
+
+    def __init__(
+        self,
+        address: str,
+        compression: Optional[str] = None,
+        resume: bool = False,
+        results_dir: Optional[Path] = None
+    ) -> None:
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd":
+            self._compressor = _zstd().ZstdCompressor()
+        self.address = address
+        self.compression = compression
+        self.results_dir = results_dir or results_path()
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_path = self.results_dir / f"lenta_products_{safe_filename(address)}.checkpoint.json"
+
+        checkpoint = self.read_checkpoint() if resume else None
+        if checkpoint and not checkpoint["completed"] and checkpoint["compression"] == compression \
+                and Path(checkpoint["path"]).exists():
+            self.path = Path(checkpoint["path"])
+            self.timestamp = checkpoint["timestamp"]
+            self.completed_pages: Set[PageKey] = {PageKey.parse(value) for value in checkpoint["completed_pages"]}
+            self.product_count = checkpoint["product_count"]
+            self.size = checkpoint["size"]
+            # Отбрасываем недописанный хвост страницы, на которой произошел сбой
+            with open(self.path, 'r+b') as f:
+                f.truncate(self.size)
+            self.resumed = True
+        else:
+            self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.path = self.results_dir / (
+                f"lenta_products_{safe_filename(address)}_{self.timestamp}.ndjson"
+                f"{COMPRESSION_EXTENSIONS[compression]}"
+            )
+            self.path.write_bytes(b"")
+            self.completed_pages = set()
+            self.product_count = 0
+            self.size = 0
+            self.resumed = False
+            self._write_checkpoint(completed=False)
+
+    def read_checkpoint(self) -> Optional[Dict]:
+        """Read checkpoint of the address if it exists"""
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_checkpoint(self, completed: bool) -> None:
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "address": self.address,
+                "path": str(self.path),
+                "timestamp": self.timestamp,
+                "compression": self.compression,
+                "completed_pages": sorted(self.completed_pages),
+                "product_count": self.product_count,
+                "size": self.size,
+                "completed": completed,
+            }, f, ensure_ascii=False)
+        tmp_path.replace(self.checkpoint_path)
+
+    def _encode(self, data: bytes) -> bytes:
+        # Каждая страница пишется отдельным gzip-членом / zstd-фреймом, поэтому файл можно дописывать
+        if self.compression == "gzip":
+            return gzip.compress(data)
+        if self.compression == "zstd":
+            return self._compressor.compress(data)
+        return data
+
+    def write_page(self, page_number: PageKey, products: List[Product]) -> None:
+        """Append page products and update the checkpoint"""
+        prefix = f'{{"page": {json.dumps(page_number)}, '
+        data = "".join(prefix + product.to_json()[1:] + "\n" for product in products).encode("utf-8")
+        chunk = self._encode(data) if data else b""
+        with open(self.path, 'ab') as f:
+            f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        self.size += len(chunk)
+        self.completed_pages.add(page_number)
+        self.product_count += len(products)
+        self._write_checkpoint(completed=False)
+
+    def finish(self) -> None:
+        """Mark the run as completed"""
+        self._write_checkpoint(completed=True)
+
+    def _open_text(self):
+        if self.compression == "gzip":
+            return gzip.open(self.path, 'rt', encoding='utf-8')
+        if self.compression == "zstd":
+            raw = open(self.path, 'rb')
+            reader = _zstd().ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+            return io.TextIOWrapper(reader, encoding='utf-8')
+        return open(self.path, encoding='utf-8')
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Iterate over written records (with their page numbers)"""
+        with self._open_text() as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def read_products(self) -> List[Product]:
+        """Read products in page order"""
+        records = sorted(self.iter_records(), key=lambda record: PageKey.parse(record["page"]))
+        return [Product.from_dict(record) for record in records]
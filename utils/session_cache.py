@@ -0,0 +1,105 @@
+from config.browser import SESSION_CACHE_DIR, SESSION_CACHE_TTL_HOURS
+from typing import Dict, Optional, List
+from pathlib import Path
+import hashlib
+import logging
+import json
+import time
+import re
+
+# Сокращения с дефисом раскрываются до разбиения на слова
+_HYPHENATED = {"пр-кт": "проспект", "пр-т": "проспект", "б-р": "бульвар", "пр-д": "проезд", "р-н": "район"}
+_HYPHENATED_RE = re.compile(r'(?<!\w)(' + "|".join(map(re.escape, _HYPHENATED)) + r')(?!\w)')
+
+# Слово адреса -> общая форма: "улица" и "ул." - один адрес
+_ABBREVIATIONS = {
+    "улица": "ул",
+    "проспект": "пр", "просп": "пр",
+    "бульвар": "бул",
+    "шоссе": "ш",
+    "переулок": "пер",
+    "площадь": "пл",
+    "набережная": "наб",
+    "микрорайон": "мкр", "мкрн": "мкр",
+    "корпус": "к", "корп": "к",
+    "строение": "стр",
+    "область": "обл",
+    "район": "рн",
+}
+# Слова без отличительного смысла: "д. 1" и "1", "г. Москва" и "Москва"
+_NOISE_WORDS = {"д", "дом", "г", "город"}
+
+def normalize_address(address: str) -> str:
+    """Normalize address for cache keys and comparisons: case, punctuation and common abbreviations"""
+    text = _HYPHENATED_RE.sub(lambda match: _HYPHENATED[match.group(1)], address.lower().replace('ё', 'е'))
+    words = re.sub(r'[^\w]+', ' ', text).split()
+    return " ".join(_ABBREVIATIONS.get(word, word) for word in words if word not in _NOISE_WORDS)
+
+def address_tokens(address: str) -> List[str]:
+    """Tokens identifying the store: street and house part of the address"""
+    street = address.split(",", 1)[1] if "," in address else address
+    return normalize_address(street).split()
+
+def address_matches(displayed: str, address: str) -> bool:
+    """Check that the displayed store address corresponds to the requested one"""
+    displayed_tokens = set(normalize_address(displayed).split())
+    tokens = address_tokens(address)
+    return bool(tokens) and all(token in displayed_tokens for token in tokens)
+
+class SessionCache:
+    """Storage state (cookies and localStorage) cache keyed by normalized address"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, ttl_hours: float = SESSION_CACHE_TTL_HOURS) -> None:
+        self.cache_dir = cache_dir or Path(__file__).parent.parent / SESSION_CACHE_DIR
+        self.ttl_seconds = ttl_hours * 3600
+
+    def _path(self, address: str) -> Path:
+        key = hashlib.sha1(normalize_address(address).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.json"
+
+    def load_entry(self, address: str) -> Optional[Dict]:
+        """Get cached session entry (storage state and catalog URL) if it exists and is not expired"""
+        path = self._path(address)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Failed to read session cache {path}: {str(e)}")
+            return None
+
+        if time.time() - entry.get("saved_at", 0) > self.ttl_seconds:
+            self.invalidate(address)
+            return None
+        return entry
+
+    def load(self, address: str) -> Optional[Dict]:
+        """Get cached storage state if it exists and is not expired"""
+        entry = self.load_entry(address)
+        return entry.get("storage_state") if entry else None
+
+    def save(
+        self,
+        address: str,
+        storage_state: Dict,
+        catalog_url: Optional[str] = None,
+        category_urls: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Save storage state of the selected store with the catalog URLs found in it"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(address)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "address": address,
+                "saved_at": time.time(),
+                "storage_state": storage_state,
+                "catalog_url": catalog_url,
+                "category_urls": category_urls or {}
+            }, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    def invalidate(self, address: str) -> None:
+        """Remove cached storage state"""
+        self._path(address).unlink(missing_ok=True)